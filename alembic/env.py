@@ -11,7 +11,7 @@ from sqlalchemy import create_engine, engine_from_config, pool
 from alembic import context
 from app.core.config import settings
 from app.db.postgres_client import Base
-from app.models import job, resume, user
+from app.models import job, job_embedding, resume, resume_embedding, user
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,79 @@
+"""Unique resume mongo_id
+
+Revision ID: 7c1f4a9d2b36
+Revises: 2e5b5e3839a5
+Create Date: 2026-10-18 10:12:44.318205
+
+"""
+
+import logging
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1f4a9d2b36"
+down_revision: str | None = "2e5b5e3839a5"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _dedupe_resumes():
+    """Keep the lowest id per mongo_id; retried pipelines inserted the rest"""
+    bind = op.get_bind()
+    duplicates = bind.execute(
+        sa.text(
+            "SELECT r.id, keep.id AS keep_id, r.mongo_id FROM resumes r "
+            "JOIN (SELECT mongo_id, min(id) AS id FROM resumes "
+            "WHERE mongo_id IS NOT NULL GROUP BY mongo_id HAVING count(*) > 1) keep "
+            "ON r.mongo_id = keep.mongo_id AND r.id <> keep.id"
+        )
+    ).all()
+    if not duplicates:
+        return
+
+    # Repoint anything referencing a duplicate at the row that is kept
+    inspector = sa.inspect(bind)
+    for table in inspector.get_table_names():
+        for fk in inspector.get_foreign_keys(table):
+            if fk["referred_table"] != "resumes" or fk["referred_columns"] != ["id"]:
+                continue
+            column = fk["constrained_columns"][0]
+            bind.execute(
+                sa.text(f"UPDATE {table} SET {column} = :keep_id WHERE {column} = :id"),
+                [{"id": row.id, "keep_id": row.keep_id} for row in duplicates],
+            )
+    bind.execute(
+        sa.text("DELETE FROM resumes WHERE id = ANY(:ids)"),
+        {"ids": [row.id for row in duplicates]},
+    )
+
+    # Mongo documents record the resume id their last attempt produced
+    try:
+        from app.db.mongo_client import get_resume_collection
+
+        collection = get_resume_collection()
+        for row in duplicates:
+            collection.update_many(
+                {"resume_id": row.id}, {"$set": {"resume_id": row.keep_id}}
+            )
+    except Exception as e:
+        logger.warning(f"Could not repoint Mongo resume_id references: {str(e)}")
+    logger.info(f"Removed {len(duplicates)} duplicate resume rows")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _dedupe_resumes()
+    # Resume rows are upserted by mongo_id, so it has to identify one row
+    op.create_index(op.f("ix_resumes_mongo_id"), "resumes", ["mongo_id"], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_resumes_mongo_id"), table_name="resumes")
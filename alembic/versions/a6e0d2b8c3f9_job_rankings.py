@@ -0,0 +1,48 @@
+"""Precomputed job rankings
+
+Revision ID: a6e0d2b8c3f9
+Revises: f3b7c9a1d4e8
+Create Date: 2026-10-18 17:11:58.240173
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a6e0d2b8c3f9"
+down_revision: str | None = "f3b7c9a1d4e8"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "job_rankings",
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("resume_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["resume_id"], ["resumes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("job_id", "resume_id"),
+    )
+    op.create_index(
+        "ix_job_rankings_job_score", "job_rankings", ["job_id", "score"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_job_rankings_job_score", table_name="job_rankings")
+    op.drop_table("job_rankings")
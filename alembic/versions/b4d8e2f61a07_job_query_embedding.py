@@ -0,0 +1,36 @@
+"""Job query embedding
+
+Revision ID: b4d8e2f61a07
+Revises: 7c1f4a9d2b36
+Create Date: 2026-10-18 14:02:17.550913
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b4d8e2f61a07"
+down_revision: str | None = "7c1f4a9d2b36"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "jobs",
+        sa.Column("query_embedding", postgresql.ARRAY(sa.Float()), nullable=True),
+    )
+    op.add_column("jobs", sa.Column("query_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("jobs", "query_hash")
+    op.drop_column("jobs", "query_embedding")
@@ -0,0 +1,72 @@
+"""Job embeddings for matching jobs to a resume
+
+Revision ID: c5e8a2f4b9d1
+Revises: a6e0d2b8c3f9
+Create Date: 2026-10-18 19:02:13.584920
+
+"""
+
+import logging
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+from alembic import op
+from app.core.config import settings
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e8a2f4b9d1"
+down_revision: str | None = "a6e0d2b8c3f9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def _pgvector_available() -> bool:
+    """
+    Chroma-only deployments may run on a Postgres without the vector
+    extension; the table is only required when VECTOR_STORE is pgvector
+    """
+    if settings.VECTOR_STORE == "pgvector":
+        return True
+    available = (
+        op.get_bind()
+        .execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'vector'"))
+        .first()
+    )
+    if available is None:
+        logger.warning("pgvector is not installed; skipping job_embeddings")
+    return available is not None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _pgvector_available():
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.create_table(
+        "job_embeddings",
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("embedding", Vector(settings.EMBEDDING_DIMENSIONS), nullable=False),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("job_id"),
+    )
+    op.create_index(
+        "ix_job_embeddings_embedding",
+        "job_embeddings",
+        ["embedding"],
+        unique=False,
+        postgresql_using="hnsw",
+        postgresql_ops={"embedding": "vector_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if "job_embeddings" not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.drop_index("ix_job_embeddings_embedding", table_name="job_embeddings")
+    op.drop_table("job_embeddings")
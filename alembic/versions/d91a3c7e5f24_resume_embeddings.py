@@ -0,0 +1,86 @@
+"""Resume embeddings for the pgvector store
+
+Revision ID: d91a3c7e5f24
+Revises: b4d8e2f61a07
+Create Date: 2026-10-18 15:21:40.118274
+
+"""
+
+import logging
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+from alembic import op
+from app.core.config import settings
+
+# revision identifiers, used by Alembic.
+revision: str = "d91a3c7e5f24"
+down_revision: str | None = "b4d8e2f61a07"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def _pgvector_available() -> bool:
+    """
+    Chroma-only deployments may run on a Postgres without the vector
+    extension; the table is only required when VECTOR_STORE is pgvector
+    """
+    if settings.VECTOR_STORE == "pgvector":
+        return True
+    available = (
+        op.get_bind()
+        .execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'vector'"))
+        .first()
+    )
+    if available is None:
+        logger.warning("pgvector is not installed; skipping resume_embeddings")
+    return available is not None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _pgvector_available():
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.create_table(
+        "resume_embeddings",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("resume_id", sa.Integer(), nullable=True),
+        sa.Column("candidate_id", sa.Integer(), nullable=False),
+        sa.Column("chunk", sa.Integer(), nullable=True),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("embedding", Vector(settings.EMBEDDING_DIMENSIONS), nullable=False),
+        sa.ForeignKeyConstraint(["candidate_id"], ["candidates.id"]),
+        sa.ForeignKeyConstraint(["resume_id"], ["resumes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_resume_embeddings_resume_id"),
+        "resume_embeddings",
+        ["resume_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_resume_embeddings_embedding",
+        "resume_embeddings",
+        ["embedding"],
+        unique=False,
+        postgresql_using="hnsw",
+        postgresql_ops={"embedding": "vector_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if "resume_embeddings" not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.drop_index("ix_resume_embeddings_embedding", table_name="resume_embeddings")
+    op.drop_index(
+        op.f("ix_resume_embeddings_resume_id"), table_name="resume_embeddings"
+    )
+    op.drop_table("resume_embeddings")
@@ -0,0 +1,73 @@
+"""Filterable resume embedding metadata
+
+Revision ID: f3b7c9a1d4e8
+Revises: d91a3c7e5f24
+Create Date: 2026-10-18 16:05:12.902631
+
+"""
+
+import logging
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f3b7c9a1d4e8"
+down_revision: str | None = "d91a3c7e5f24"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def _embeddings_table_exists() -> bool:
+    """d91a3c7e5f24 skips resume_embeddings where pgvector is unavailable"""
+    exists = "resume_embeddings" in sa.inspect(op.get_bind()).get_table_names()
+    if not exists:
+        logger.warning("resume_embeddings does not exist; skipping its filters")
+    return exists
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _embeddings_table_exists():
+        return
+    op.add_column(
+        "resume_embeddings", sa.Column("experience", sa.Float(), nullable=True)
+    )
+    op.add_column(
+        "resume_embeddings", sa.Column("location", sa.String(), nullable=True)
+    )
+    op.add_column(
+        "resume_embeddings",
+        sa.Column("skills", postgresql.ARRAY(sa.String()), nullable=True),
+    )
+    op.add_column(
+        "resume_embeddings",
+        sa.Column("active", sa.Boolean(), server_default=sa.true(), nullable=True),
+    )
+    op.create_index(
+        op.f("ix_resume_embeddings_active"), "resume_embeddings", ["active"]
+    )
+    op.create_index(
+        "ix_resume_embeddings_skills",
+        "resume_embeddings",
+        ["skills"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not _embeddings_table_exists():
+        return
+    op.drop_index("ix_resume_embeddings_skills", table_name="resume_embeddings")
+    op.drop_index(op.f("ix_resume_embeddings_active"), table_name="resume_embeddings")
+    op.drop_column("resume_embeddings", "active")
+    op.drop_column("resume_embeddings", "skills")
+    op.drop_column("resume_embeddings", "location")
+    op.drop_column("resume_embeddings", "experience")
@@ -1,14 +1,20 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.api.endpoints.auth import UserRole, get_current_user, require_role
+from app.celery_app import rebuild_job_rankings_task
+from app.core.config import settings
 from app.db.postgres_client import get_db
 from app.models.job import Job
+from app.models.resume import Candidate
 from app.models.user import User
 from app.schemas.job import Job as JobSchema
-from app.schemas.job import JobCreate, JobUpdate
+from app.schemas.job import JobCreate, JobMatch, JobUpdate
+from app.services.job_matches import matching_jobs, sync_job_index
+from app.services.job_queries import job_query_changed, refresh_job_embedding
+from app.services.job_rankings import invalidate_job_ranking
 from app.services.skill_extractor import (  # We'll reuse the skill extraction
     SkillExtractor,
 )
@@ -33,10 +39,15 @@ def create_job(
         **job.model_dump(),
         skills_required=skills,
     )
+    refresh_job_embedding(db_job)
 
     db.add(db_job)
     db.commit()
     db.refresh(db_job)
+    sync_job_index(db_job)
+
+    if settings.JOB_RANKINGS_ENABLED:
+        rebuild_job_rankings_task.delay([db_job.id])
     return db_job
 
 
@@ -56,6 +67,45 @@ def get_jobs(
     return jobs
 
 
+@router.get("/recommended", response_model=list[JobMatch])
+def get_recommended_jobs(
+    candidate_id: int | None = Query(
+        None, description="Required for recruiters; candidates get their own"
+    ),
+    limit: int = 10,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Active jobs ranked by relevance to a candidate's latest resume"""
+    if current_user.role == UserRole.CANDIDATE:
+        candidate = (
+            db.query(Candidate).filter(Candidate.email == current_user.email).first()
+        )
+        if candidate is None:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+        if candidate_id is not None and candidate_id != candidate.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Insufficient permissions",
+            )
+        candidate_id = candidate.id
+    elif candidate_id is None:
+        raise HTTPException(status_code=400, detail="candidate_id is required")
+
+    matches = matching_jobs(db, candidate_id, limit)
+    if matches is None:
+        raise HTTPException(status_code=404, detail="No indexed resume found")
+    return [{"score": score, "job": job} for score, job in matches]
+
+
+@router.get("/stats/skill-extraction")
+def skill_extraction_stats(
+    current_user: User = Depends(require_role(UserRole.RECRUITER)),
+):
+    """How this API process has parsed skill extraction output"""
+    return skill_extractor.parse_stats.summary()
+
+
 @router.get("/{job_id}", response_model=JobSchema)
 def get_job(
     job_id: int,
@@ -101,8 +151,22 @@ def update_job(
     for key, value in update_data.items():
         setattr(db_job, key, value)
 
+    # Re-embeds only if the ranking query text actually changed
+    query_changed = job_query_changed(db_job)
+    refresh_job_embedding(db_job)
+
+    # A stale ranking is dropped now and rebuilt in the background
+    rerank = query_changed or "is_active" in update_data
+    if rerank:
+        invalidate_job_ranking(db, db_job.id)
+
     db.commit()
     db.refresh(db_job)
+    if rerank:
+        sync_job_index(db_job)
+
+    if rerank and db_job.is_active and settings.JOB_RANKINGS_ENABLED:
+        rebuild_job_rankings_task.delay([db_job.id])
     return db_job
 
 
@@ -118,6 +182,8 @@ def delete_job(
         raise HTTPException(status_code=404, detail="Job not found")
 
     db_job.is_active = False
+    invalidate_job_ranking(db, db_job.id)
     db.commit()
     db.refresh(db_job)
+    sync_job_index(db_job)
     return db_job
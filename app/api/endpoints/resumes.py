@@ -1,12 +1,17 @@
 import logging
 import os
+import uuid
+import zipfile
 
 from bson import ObjectId
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 
 from app.api.endpoints.auth import UserRole, require_role
-from app.celery_app import process_resume_task
+from app.celery_app import enqueue_resumes
+from app.core.config import settings
 from app.db.mongo_client import get_resume_collection
 from app.db.postgres_client import get_db
 from app.models.resume import Resume
@@ -14,6 +19,16 @@ from app.models.user import User
 from app.schemas.resume import ResumeResponse
 from app.services.llm_parser import LLMParser
 from app.services.pdf_parser import ResumeParser
+from app.services.resume_storage import (
+    StoredFile,
+    UploadTooLargeError,
+    delete_resume_blob,
+    find_by_content_hash,
+    hash_stream,
+    hash_upload,
+    store_stream,
+    store_upload,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +36,36 @@ resume_parser = ResumeParser()
 router = APIRouter()
 llm_parser = LLMParser()
 
+ALLOWED_EXTENSIONS = (".pdf", ".docx")
+BULK_INSERT_CHUNK = 100
+STATUS_PROJECTION = {"processed": 1, "error": 1, "resume_id": 1, "candidate_id": 1}
+DEDUP_PROJECTION = {"processed": 1, "error": 1, "resume_id": 1}
+DUPLICATE_KEY_ERROR = 11000
+
+
+def _reuse_existing(doc: dict, batch_id: str | None = None) -> dict:
+    """Point a repeat upload at the document already holding the same file"""
+    mongo_id = str(doc["_id"])
+    if batch_id:
+        # Counted in the batch's status without being reprocessed
+        get_resume_collection().update_one(
+            {"_id": doc["_id"]}, {"$addToSet": {"batch_ids": batch_id}}
+        )
+    if doc.get("error") and not doc.get("processed"):
+        # An earlier attempt failed; retry it rather than pinning the upload to it
+        get_resume_collection().update_one(
+            {"_id": doc["_id"]}, {"$set": {"error": None, "claimed_at": None}}
+        )
+        enqueue_resumes([mongo_id])
+        return {"task_id": mongo_id, "status": "processing", "duplicate": True}
+
+    return {
+        "task_id": mongo_id,
+        "status": "processed" if doc.get("processed") else "processing",
+        "duplicate": True,
+        "resume_id": doc.get("resume_id"),
+    }
+
 
 @router.post("/upload", status_code=status.HTTP_202_ACCEPTED)
 async def upload_resume(
@@ -28,39 +73,258 @@ async def upload_resume(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(UserRole.CANDIDATE)),
 ):
+    ext = os.path.splitext(file.filename)[1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(400, "Unsupported file type")
+
+    # What has been written so far, for cleanup if a later step fails
+    stored = mongo_id = None
     try:
-        # Validate file type first
-        contents = await file.read()
-        ext = os.path.splitext(file.filename)[1].lower()
-        if ext not in (".pdf", ".docx"):
-            raise HTTPException(400, "Unsupported file type")
+        # Fingerprint first so repeat uploads cost only the hash check
+        content_hash = await hash_upload(file)
+        existing = find_by_content_hash(content_hash, DEDUP_PROJECTION)
+        if existing:
+            return _reuse_existing(existing)
+
+        # Stream the file into GridFS, keeping the metadata document small
+        stored = await store_upload(file)
 
-        # Store raw data in MongoDB
         mongo_collection = get_resume_collection()
         mongo_doc = {
             "filename": file.filename,
-            "raw_data": contents,
+            "file_id": stored.file_id,
+            "size": stored.size,
+            "content_hash": stored.content_hash,
             "processed": False,
             "error": None,
         }
-        mongo_id = str(mongo_collection.insert_one(mongo_doc).inserted_id)
+        try:
+            mongo_id = str(mongo_collection.insert_one(mongo_doc).inserted_id)
+        except DuplicateKeyError:
+            # A concurrent upload of the same file got there first
+            delete_resume_blob(stored.file_id)
+            stored = None  # Keeps the cleanup below from deleting it twice
+            existing = find_by_content_hash(content_hash, DEDUP_PROJECTION)
+            if existing is None:
+                # The winner was deleted (or is not visible yet) in between
+                raise HTTPException(409, "Concurrent upload of this file, retry")
+            return _reuse_existing(existing)
 
         # Start background task
-        process_resume_task.delay(mongo_id)
+        enqueue_resumes([mongo_id])
         return {"task_id": mongo_id, "status": "processing"}
 
-    except HTTPException as he:
+    except HTTPException:
         raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except Exception as e:
+        # Cleanup MongoDB entry and stored file if creation failed
+        if mongo_id is not None:
+            get_resume_collection().delete_one({"_id": ObjectId(mongo_id)})
+        if stored is not None:
+            delete_resume_blob(stored.file_id)
+        raise HTTPException(500, detail=str(e))
+
+
+@router.post("/upload/bulk", status_code=status.HTTP_202_ACCEPTED)
+async def upload_resumes_bulk(
+    files: list[UploadFile] = File(...),
+    current_user: User = Depends(require_role(UserRole.RECRUITER)),
+):
+    """
+    Upload many resumes at once, either as individual files or ZIP archives.
+    Documents are inserted in chunks and each chunk is enqueued as one group.
+    Files already uploaded before (same SHA-256) are not stored or reprocessed.
+    """
+    mongo_collection = get_resume_collection()
+    batch_id = uuid.uuid4().hex
+    seen_hashes: set[str] = set()
+    pending: list[dict] = []
+    accepted: list[dict] = []
+    rejected: list[dict] = []
+
+    def flush():
+        if not pending:
+            return
+        errors = {}
+        try:
+            mongo_collection.insert_many(pending, ordered=False)
+        except BulkWriteError as e:
+            # Unordered inserts still write every document not reported here
+            errors = {err["index"]: err for err in e.details["writeErrors"]}
+        except Exception:
+            # Unknown which documents were written; keep every file they
+            # may point at rather than leave documents without a blob
+            pending.clear()
+            raise
+
+        mongo_ids = []
+        for index, doc in enumerate(pending):
+            if index in errors:
+                delete_resume_blob(doc["file_id"])
+                existing = None
+                if errors[index]["code"] == DUPLICATE_KEY_ERROR:
+                    existing = find_by_content_hash(
+                        doc["content_hash"], DEDUP_PROJECTION
+                    )
+                if existing is None:
+                    rejected.append(
+                        {"filename": doc["filename"], "error": "Could not be stored"}
+                    )
+                else:
+                    accepted.append(
+                        {
+                            "filename": doc["filename"],
+                            **_reuse_existing(existing, batch_id),
+                        }
+                    )
+            else:
+                mongo_ids.append(str(doc["_id"]))
+                accepted.append({"filename": doc["filename"], "task_id": mongo_ids[-1]})
+        enqueue_resumes(mongo_ids)
+        pending.clear()
+
+    def is_new(filename: str, content_hash: str) -> bool:
+        if content_hash in seen_hashes:
+            rejected.append({"filename": filename, "error": "Duplicate file in batch"})
+            return False
+        seen_hashes.add(content_hash)
+
+        existing = find_by_content_hash(content_hash, DEDUP_PROJECTION)
+        if existing:
+            accepted.append(
+                {"filename": filename, **_reuse_existing(existing, batch_id)}
+            )
+            return False
+        return True
+
+    def has_capacity(filename: str) -> bool:
+        if len(accepted) + len(pending) < settings.MAX_BULK_FILES:
+            return True
+        rejected.append({"filename": filename, "error": "Batch file limit exceeded"})
+        return False
+
+    def add(filename: str, stored: StoredFile):
+        pending.append(
+            {
+                "filename": filename,
+                "file_id": stored.file_id,
+                "size": stored.size,
+                "content_hash": stored.content_hash,
+                "batch_id": batch_id,
+                "processed": False,
+                "error": None,
+            }
+        )
+        if len(pending) >= BULK_INSERT_CHUNK:
+            flush()
+
+    async def add_archive_entry(archive: zipfile.ZipFile, info: zipfile.ZipInfo):
+        name = os.path.basename(info.filename)
+        if os.path.splitext(name)[1].lower() not in ALLOWED_EXTENSIONS:
+            rejected.append({"filename": name, "error": "Unsupported file type"})
+            return
+        if info.file_size > settings.MAX_UPLOAD_SIZE:
+            rejected.append({"filename": name, "error": "File too large"})
+            return
+        if not has_capacity(name):
+            return
+
+        try:
+            # ZIP entries cannot be rewound, so hash and store are two passes
+            with archive.open(info) as entry:
+                content_hash = await run_in_threadpool(hash_stream, entry)
+            if not is_new(name, content_hash):
+                return
+            with archive.open(info) as entry:
+                stored = await run_in_threadpool(store_stream, entry, name)
+        except UploadTooLargeError:
+            rejected.append({"filename": name, "error": "File too large"})
+            return
+        add(name, stored)
+
+    async def add_upload(upload: UploadFile):
+        if not has_capacity(upload.filename):
+            return
+        try:
+            if not is_new(upload.filename, await hash_upload(upload)):
+                return
+            stored = await store_upload(upload)
+        except UploadTooLargeError:
+            rejected.append({"filename": upload.filename, "error": "File too large"})
+            return
+        add(upload.filename, stored)
+
+    try:
+        for upload in files:
+            ext = os.path.splitext(upload.filename)[1].lower()
+            if ext == ".zip":
+                try:
+                    archive = await run_in_threadpool(zipfile.ZipFile, upload.file)
+                except zipfile.BadZipFile:
+                    rejected.append(
+                        {"filename": upload.filename, "error": "Invalid ZIP archive"}
+                    )
+                    continue
+                with archive:
+                    for info in archive.infolist():
+                        if not info.is_dir():
+                            await add_archive_entry(archive, info)
+            elif ext in ALLOWED_EXTENSIONS:
+                await add_upload(upload)
+            else:
+                rejected.append(
+                    {"filename": upload.filename, "error": "Unsupported file type"}
+                )
+        flush()
+
     except Exception as e:
-        # Cleanup MongoDB entry if creation failed
-        if "mongo_id" in locals():
-            mongo_collection.delete_one({"_id": ObjectId(mongo_id)})
+        logger.error(f"Bulk upload failed: {str(e)}", exc_info=True)
+        for doc in pending:
+            delete_resume_blob(doc["file_id"])
         raise HTTPException(500, detail=str(e))
 
+    if not accepted:
+        raise HTTPException(
+            400, detail={"error": "No valid resumes", "rejected": rejected}
+        )
+
+    return {
+        "batch_id": batch_id,
+        "status": "processing",
+        "files": accepted,
+        "rejected": rejected,
+    }
+
+
+@router.get("/upload/batch/{batch_id}")
+async def check_batch_status(batch_id: str):
+    mongo_collection = get_resume_collection()
+    # Files deduplicated against earlier uploads are tagged via batch_ids
+    in_batch = {"$or": [{"batch_id": batch_id}, {"batch_ids": batch_id}]}
+    total = mongo_collection.count_documents(in_batch)
+    if not total:
+        raise HTTPException(404, "Batch not found")
+
+    processed = mongo_collection.count_documents({**in_batch, "processed": True})
+    failed = mongo_collection.count_documents(
+        {**in_batch, "processed": False, "error": {"$ne": None}}
+    )
+    return {
+        "batch_id": batch_id,
+        "total": total,
+        "processed": processed,
+        "failed": failed,
+        "pending": total - processed - failed,
+    }
+
 
 @router.get("/upload/status/{mongo_id}")
 async def check_upload_status(mongo_id: str):
-    doc = get_resume_collection().find_one({"_id": ObjectId(mongo_id)})
+    doc = get_resume_collection().find_one(
+        {"_id": ObjectId(mongo_id)}, STATUS_PROJECTION
+    )
     if not doc:
         raise HTTPException(404, "Resume not found")
 
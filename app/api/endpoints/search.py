@@ -8,13 +8,23 @@ from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.sql import func
 
 from app.api.endpoints.auth import UserRole, get_current_user, require_role
+from app.core.config import settings
 from app.db.postgres_client import get_db
 from app.models.job import Job
 from app.models.user import User
 from app.models.resume import Resume
 from app.models.resume import Candidate
+from app.schemas.job import BatchRankRequest
 from app.schemas.resume import CandidateResponse, ResumeResponse
 from app.services.candidates import CandidateService
+from app.services.job_queries import ensure_job_embedding, job_query_text
+from app.services.job_rankings import ranked_candidates, ranked_candidates_many
+from app.services.vector_store import (
+    SearchFilters,
+    get_vector_store,
+    hydrate_hit_lists,
+    hydrate_hits,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,82 +38,179 @@ async def rank_candidates(
     job_id: int,
     db: Session = Depends(get_db),
     limit: int = 10,
+    min_experience: float | None = None,
+    max_experience: float | None = None,
+    location: str | None = None,
+    skills: str | None = Query(None, description="Comma-separated skills"),
+    active_only: bool = False,
     current_user: User = Depends(require_role(UserRole.RECRUITER)),
 ):
+    # Pushed into the vector store query instead of dropping hits afterwards
+    filters = SearchFilters(
+        min_experience=min_experience,
+        max_experience=max_experience,
+        location=location,
+        skills=[s.strip() for s in (skills or "").split(",") if s.strip()],
+        active_only=active_only,
+    )
     try:
-        # Get job details - single query
-        job = db.query(Job).filter(Job.id == job_id).first()
-        if not job:
-            raise HTTPException(404, "Job not found")
-
-        # Create search query
-        query_parts = [
-            job.description or "",
-            job.requirements or "",
-            *job.skills_required,
-        ]
-        query_text = " ".join(query_parts).strip()
+        # Unfiltered rankings of active jobs are precomputed (dense only;
+        # hybrid fusion applies to live rankings)
+        rows = []
+        if (
+            settings.JOB_RANKINGS_ENABLED
+            and filters.is_empty
+            and limit <= settings.JOB_RANKING_SIZE
+        ):
+            rows = ranked_candidates(db, job_id, limit)
 
-        if not query_text:
-            raise HTTPException(400, "Job has no searchable content")
+        if not rows:
+            rows = _rank_live(db, job_id, limit, filters)
+        return _ranking_response(rows)
 
-        # Get vector results
-        vector_results = candidate_service.vector_search(query_text, limit * 2)
-        if not vector_results:
-            return []
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Ranking error: {str(e)}", exc_info=True)
+        raise HTTPException(500, "Ranking failed")
 
-        # Single optimized query for all candidates with their resumes
-        candidate_ids = [res["metadata"]["candidate_id"] for res in vector_results]
-        resume_ids = [res["resume_id"] for res in vector_results]
 
-        candidates = (
-            db.query(Candidate)
-            .options(joinedload(Candidate.resumes))
-            .filter(Candidate.id.in_(candidate_ids))
-            .all()
+@router.post("/rank_candidates/batch", response_model=list[dict])
+def rank_candidates_batch(
+    request: BatchRankRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role(UserRole.RECRUITER)),
+):
+    """
+    rank_candidates for many jobs at once: one ranking-table read, one
+    vector store query for the jobs it does not cover, one hydration query
+    """
+    job_ids = list(dict.fromkeys(request.job_ids))
+    if not job_ids:
+        raise HTTPException(400, "At least one job_id required")
+    if len(job_ids) > settings.BATCH_RANK_MAX_JOBS:
+        raise HTTPException(
+            400, f"At most {settings.BATCH_RANK_MAX_JOBS} jobs per request"
         )
+    filters = SearchFilters(
+        min_experience=request.min_experience,
+        max_experience=request.max_experience,
+        location=request.location,
+        skills=[s.strip() for s in request.skills if s.strip()],
+        active_only=request.active_only,
+    )
+    try:
+        rankings = {}
+        if (
+            settings.JOB_RANKINGS_ENABLED
+            and filters.is_empty
+            and request.limit <= settings.JOB_RANKING_SIZE
+        ):
+            rankings = ranked_candidates_many(db, job_ids, request.limit)
 
-        # Create lookup dictionaries in single passes
-        candidate_map = {c.id: c for c in candidates}
-        resume_map = {r.id: r for c in candidates for r in c.resumes}
-
-        # Build ranked results in one pass
-        ranked = []
-        for res in vector_results:
-            candidate = candidate_map.get(res["metadata"]["candidate_id"])
-            if not candidate:
-                continue
-
-            matching_resume = resume_map.get(int(res["resume_id"]))
-            if not matching_resume:
-                continue
-
-            # Convert resume data
-            resume_dict = ResumeResponse.model_validate(matching_resume).model_dump()
-            resume_dict["education"] = [
-                e if isinstance(e, dict) else {"degree": e}
-                for e in resume_dict.get("education", [])
-            ]
-
-            ranked.append(
-                {
-                    "score": res["score"],
-                    "candidate": CandidateResponse.model_validate(
-                        candidate
-                    ).model_dump(),
-                    "matching_resume": resume_dict,
-                }
-            )
+        live = [job_id for job_id in job_ids if not rankings.get(job_id)]
+        if live:
+            rankings.update(_rank_live_many(db, live, request.limit, filters))
 
-        # Sort and limit results
-        ranked.sort(key=lambda x: x["score"], reverse=True)
-        return ranked[:limit]
+        return [
+            {"job_id": job_id, "rankings": _ranking_response(rankings[job_id])}
+            for job_id in job_ids
+        ]
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Ranking error: {str(e)}", exc_info=True)
+        logger.error(f"Batch ranking error: {str(e)}", exc_info=True)
         raise HTTPException(500, "Ranking failed")
 
 
+def _ranking_response(rows) -> list[dict]:
+    ranked = []
+    for score, candidate, resume in rows:
+        # Convert resume data
+        resume_dict = ResumeResponse.model_validate(resume).model_dump()
+        resume_dict["education"] = [
+            e if isinstance(e, dict) else {"degree": e}
+            for e in resume_dict.get("education", [])
+        ]
+
+        ranked.append(
+            {
+                "score": score,
+                "candidate": CandidateResponse.model_validate(candidate).model_dump(),
+                "matching_resume": resume_dict,
+            }
+        )
+    return ranked
+
+
+def _use_candidate_search(filters: SearchFilters) -> bool:
+    """
+    Hybrid retrieval and the matrix index only serve unfiltered queries; on
+    pgvector, the store's own ranking query beats a search through them
+    """
+    return (
+        (settings.HYBRID_SEARCH or settings.MATRIX_SEARCH)
+        and filters.is_empty
+        and settings.VECTOR_STORE != "pgvector"
+    )
+
+
+def _rank_live(db: Session, job_id: int, limit: int, filters: SearchFilters):
+    """Query the vector store directly for jobs without a usable ranking"""
+    # Get job details - single query
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(404, "Job not found")
+
+    # Stored query embedding; only computed if the job text changed
+    query_embedding, changed = ensure_job_embedding(job)
+    if query_embedding is None:
+        raise HTTPException(400, "Job has no searchable content")
+    if changed:
+        db.commit()
+
+    if _use_candidate_search(filters):
+        hits = candidate_service.vector_search(
+            job_query_text(job), limit, query_embedding, include_content=False
+        )
+        return hydrate_hits(db, hits)
+
+    # Vector search joined to candidates and resumes; one query on pgvector
+    return get_vector_store().rank(db, query_embedding, limit, filters)
+
+
+def _rank_live_many(
+    db: Session, job_ids: list[int], limit: int, filters: SearchFilters
+) -> dict[int, list]:
+    """_rank_live for several jobs: one search call and one hydration query"""
+    jobs = {job.id: job for job in db.query(Job).filter(Job.id.in_(job_ids)).all()}
+    missing = [job_id for job_id in job_ids if job_id not in jobs]
+    if missing:
+        raise HTTPException(404, f"Jobs not found: {missing}")
+
+    searchable, embeddings, changed_any = [], [], False
+    for job_id in job_ids:
+        query_embedding, changed = ensure_job_embedding(jobs[job_id])
+        changed_any |= changed
+        if query_embedding is not None:
+            searchable.append(jobs[job_id])
+            embeddings.append(query_embedding)
+    if changed_any:
+        db.commit()
+
+    if _use_candidate_search(filters):
+        hits = candidate_service.vector_search_many(
+            [job_query_text(job) for job in searchable], embeddings, limit
+        )
+    else:
+        # Every job's ANN search in one store call; one statement on pgvector
+        hits = get_vector_store().search_many(embeddings, limit, filters)
+    rankings = dict.fromkeys(job_ids, [])
+    rankings.update(zip([job.id for job in searchable], hydrate_hit_lists(db, hits)))
+    return rankings
+
+
 @router.get("/candidates", response_model=list[CandidateResponse])
 def filter_candidates_by_skill(
     skills: str = Query(..., description="Comma-separated skills"),
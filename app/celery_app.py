@@ -1,10 +1,26 @@
 # app/celery_app.py
+import asyncio
+import fcntl
+import hashlib
 import logging
 import os
-from tempfile import NamedTemporaryFile
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 
 from bson import ObjectId
-from celery import Celery
+from celery import Celery, chain, group
+from celery.signals import (
+    task_postrun,
+    task_prerun,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_ready,
+)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 # Initialize Celery first to avoid circular imports
@@ -14,112 +30,667 @@ celery = Celery(
     backend=os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0"),
 )
 
+# Each pipeline stage has its own queue so pools can be sized per stage, e.g.
+#   celery -A app.celery_app worker -Q extract --pool=prefork --concurrency=<cores>
+#   celery -A app.celery_app worker -Q llm --pool=threads --concurrency=32
+#   celery -A app.celery_app worker -Q persist,index,celery
+celery.conf.task_routes = {
+    "extract_resume_task": {"queue": "extract"},
+    "parse_resume_task": {"queue": "llm"},
+    "persist_resume_task": {"queue": "persist"},
+    "index_resume_task": {"queue": "index"},
+    "flush_resume_index_task": {"queue": "index"},
+    "rebuild_job_rankings_task": {"queue": "index"},
+    "update_job_rankings_task": {"queue": "index"},
+    "rebuild_matrix_index_task": {"queue": "index"},
+    "rebuild_job_index_task": {"queue": "index"},
+    "reindex_resumes_task": {"queue": "index"},
+    "backfill_resume_locations_task": {"queue": "index"},
+    "rebuild_sparse_index_task": {"queue": "index"},
+}
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
 # Late imports to avoid circular dependencies
-from app.db import get_db, get_resume_collection
-from app.db.chroma_client import chroma_client
+from app.core.config import settings
+from app.db import engine, get_db_session, get_resume_collection
 from app.models.resume import Candidate, Resume
+from app.services.llm_cache import extraction_cache
+from app.services.fast_extractor import FastExtractor
 from app.services.llm_parser import LLMParser
 from app.services.pdf_parser import ResumeParser
+from app.services.job_matches import rebuild_job_index
+from app.services.job_rankings import (
+    rebuild_job_rankings,
+    update_rankings_for_resumes,
+)
+from app.services.matrix_index import matrix_index
+from app.services.resume_indexer import resume_indexer
+from app.services.resume_storage import open_resume_blob
+from app.services.sparse_index import sparse_index
+from app.services.vector_store import get_vector_store
 
+# Only the fields the stages need; raw_data is kept for pre-GridFS documents
+CHECKPOINT_PROJECTION = {
+    "filename": 1,
+    "file_id": 1,
+    "raw_data": 1,
+    "extracted_text": 1,
+    "text_hash": 1,
+    "parsed_data": 1,
+    "parsed_text_hash": 1,
+    "resume_id": 1,
+    "candidate_id": 1,
+    "indexed": 1,
+}
 
-@celery.task(name="process_resume_task", max_retries=3)
-def process_resume_task(mongo_id: str):
-    """Background task that replicates original parsing logic"""
-    mongo_collection = get_resume_collection()
-    db_gen = get_db()
-    db: Session = next(db_gen)
+# Transient failures (LLM, database, Chroma) back off and retry from the first
+# incomplete stage; ValueError marks data problems that a retry cannot fix.
+STAGE_RETRY_OPTIONS = {
+    "bind": True,
+    "autoretry_for": (Exception,),
+    "dont_autoretry_for": (ValueError,),
+    "retry_backoff": True,
+    "retry_backoff_max": 600,
+    "retry_jitter": True,
+    "max_retries": 3,
+}
+
+
+class WorkerResources:
+    """Parsers and clients built once per worker process and reused by tasks"""
+
+    def __init__(self):
+        self.resume_parser = ResumeParser()
+        self.llm_parser = LLMParser()
+
+
+_worker_resources: WorkerResources | None = None
+
+
+def get_worker_resources() -> WorkerResources:
+    # Built lazily too, for solo/threaded pools and eager mode
+    global _worker_resources
+    if _worker_resources is None:
+        _worker_resources = WorkerResources()
+    return _worker_resources
+
+
+# Per-process task timings: name -> [runs, total seconds, max seconds]
+_task_timings: dict[str, list[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+_task_started: dict[str, float] = {}
+TIMING_REPORT_EVERY = 100
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """
+    Build per-process resources before the first task arrives. Must stay
+    cheap: prefork children that take longer than worker_proc_alive_timeout
+    to report UP are killed.
+    """
+    # Connections inherited from the parent process must not be shared
+    engine.dispose(close=False)
+    get_worker_resources()
+
+
+def _llm_queues() -> set[str]:
+    queues = {"llm"}
+    if settings.LLM_BATCH_MODE:
+        # The batch poller runs on the default queue and calls the LLM
+        queues.add(celery.conf.task_default_queue)
+    return queues
 
+
+@worker_ready.connect
+def warm_up_llm(sender=None, **kwargs):
+    """
+    Load the extraction model once the worker is up, in the background and
+    only on workers that consume an LLM queue. A host-wide lock keeps
+    several workers on one machine from warming the model concurrently.
+    """
+    consume_from = celery.amqp.queues.consume_from
+    queues = set(consume_from) if consume_from else set(celery.amqp.queues)
+    if not queues & _llm_queues():
+        return
+
+    def run():
+        lock_path = os.path.join(tempfile.gettempdir(), "resume-llm-warmup.lock")
+        with open(lock_path, "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            started = time.perf_counter()
+            if LLMParser(cache=None).warm_up(timeout=settings.LLM_WARMUP_TIMEOUT):
+                logger.info(f"LLM warmed up in {time.perf_counter() - started:.2f}s")
+
+    threading.Thread(target=run, name="llm-warm-up", daemon=True).start()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    _report_task_timings()
+    # Anything left unflushed stays flagged and is drained by the beat task
     try:
-        # Retrieve file from MongoDB
-        doc = mongo_collection.find_one({"_id": ObjectId(mongo_id)})
-        if not doc or not doc.get("raw_data"):
-            raise ValueError("No resume data found in MongoDB")
-
-        # Original text extraction logic
-        resume_parser = ResumeParser()
-        raw_text = resume_parser.extract_text_from_bytes(
-            doc["raw_data"], os.path.splitext(doc["filename"])[1].lower()
+        resume_indexer.flush(get_resume_collection())
+    except Exception as e:
+        logger.warning(f"Index flush on shutdown failed: {str(e)}")
+
+
+@task_prerun.connect
+def _start_task_timer(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _stop_task_timer(task_id=None, task=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is None or task is None:
+        return
+    elapsed = time.perf_counter() - started
+    timing = _task_timings[task.name]
+    timing[0] += 1
+    timing[1] += elapsed
+    timing[2] = max(timing[2], elapsed)
+    if sum(t[0] for t in _task_timings.values()) % TIMING_REPORT_EVERY == 0:
+        _report_task_timings()
+
+
+def task_timing_stats() -> dict[str, dict[str, float]]:
+    return {
+        name: {"runs": runs, "avg_seconds": total / runs, "max_seconds": peak}
+        for name, (runs, total, peak) in _task_timings.items()
+        if runs
+    }
+
+
+def _report_task_timings():
+    for name, stats in task_timing_stats().items():
+        logger.info(
+            f"Task timings [{os.getpid()}] {name}: {stats['runs']} runs, "
+            f"avg {stats['avg_seconds'] * 1000:.1f}ms, "
+            f"max {stats['max_seconds'] * 1000:.1f}ms"
         )
+    for name, stats in pipeline_stats().items():
+        logger.info(f"Pipeline stats [{os.getpid()}] {name}: {stats}")
+
+
+def pipeline_stats() -> dict[str, dict[str, float]]:
+    """Per-process counters of the parsing pipeline, reported with timings"""
+    stats = {"llm_cache": extraction_cache.stats()}
+    if _worker_resources is not None:
+        stats["llm_stream"] = _worker_resources.llm_parser.stream_metrics.summary()
+        stats["llm_parse"] = _worker_resources.llm_parser.parse_stats.summary()
+        if (compactor := _worker_resources.llm_parser.compactor) is not None:
+            stats["compaction"] = compactor.summary()
+    return stats
+
+
+def resume_pipeline(mongo_id: str):
+    """Build the extract -> parse -> persist -> index chain for one resume"""
+    return chain(
+        extract_resume_task.s(mongo_id),
+        parse_resume_task.s(),
+        persist_resume_task.s(),
+        index_resume_task.s(),
+    )
 
-        # Original LLM parsing logic
-        llm_parser = LLMParser()
-        parsed_data = llm_parser.extract_entities(raw_text)
-        if "error" in parsed_data:
-            raise ValueError(parsed_data["error"])
 
-        # Original candidate handling
-        existing_candidate = (
-            db.query(Candidate).filter(Candidate.email == parsed_data["email"]).first()
+def enqueue_resumes(mongo_ids: list[str]):
+    """
+    Schedule processing for newly stored resumes. In batch mode nothing is
+    enqueued; the pending-resume poller claims them instead.
+    """
+    if settings.LLM_BATCH_MODE or not mongo_ids:
+        return
+    group(resume_pipeline(mongo_id) for mongo_id in mongo_ids).apply_async()
+
+
+def _load_checkpoint(mongo_collection, mongo_id: str) -> dict:
+    doc = mongo_collection.find_one({"_id": ObjectId(mongo_id)}, CHECKPOINT_PROJECTION)
+    if not doc:
+        raise ValueError("No resume data found in MongoDB")
+    return doc
+
+
+def _checkpoint(mongo_collection, doc: dict, **fields):
+    """Record stage output on the Mongo document and the in-memory copy"""
+    mongo_collection.update_one({"_id": doc["_id"]}, {"$set": fields})
+    doc.update(fields)
+
+
+def _extract_stage(mongo_collection, doc: dict) -> str:
+    """Extract the resume text once; later attempts reuse the checkpoint"""
+    if doc.get("extracted_text") is not None:
+        return doc["extracted_text"]
+
+    # Stream the stored file back out of GridFS for text extraction
+    resume_parser = get_worker_resources().resume_parser
+    with open_resume_blob(doc) as blob:
+        raw_text = resume_parser.extract_text_from_stream(
+            blob, os.path.splitext(doc["filename"])[1].lower()
         )
+    _checkpoint(
+        mongo_collection,
+        doc,
+        extracted_text=raw_text,
+        text_hash=hashlib.sha256(raw_text.encode("utf-8")).hexdigest(),
+    )
+    return raw_text
 
-        if existing_candidate:
-            candidate = existing_candidate
-            action = "updated"
-        else:
-            candidate = Candidate(
-                name=parsed_data["name"],
-                email=parsed_data["email"],
-                phone=parsed_data.get("phone"),
-                location=parsed_data.get("location"),
-            )
-            db.add(candidate)
-            db.commit()
-            action = "created"
-
-        db.refresh(candidate)
-
-        # Original resume creation
-        resume = Resume(
-            candidate_id=candidate.id,
-            mongo_id=mongo_id,
-            filename=doc["filename"],
-            skills=parsed_data.get("skills", []),
-            experience=parsed_data.get("experience_years", 0),
-            education=parsed_data.get("education", []),
+
+def _parsed_checkpoint(doc: dict) -> dict | None:
+    """Parsed entities are only reusable if they came from the current text"""
+    if doc.get("parsed_data") and doc.get("parsed_text_hash") == doc.get("text_hash"):
+        return doc["parsed_data"]
+    return None
+
+
+def _save_parsed(mongo_collection, doc: dict, parsed_data: dict) -> dict:
+    if "error" in parsed_data:
+        _checkpoint(mongo_collection, doc, error_details=parsed_data)
+        # Only transport failures are retried; each retry is a full LLM call
+        if parsed_data.get("retryable"):
+            raise RuntimeError(f"LLM extraction failed: {parsed_data['error']}")
+        raise ValueError(f"LLM extraction failed: {parsed_data['error']}")
+    _checkpoint(
+        mongo_collection,
+        doc,
+        parsed_data=parsed_data,
+        parsed_text_hash=doc["text_hash"],
+    )
+    return parsed_data
+
+
+def _parse_stage(mongo_collection, doc: dict) -> dict:
+    """Run the LLM only if no parse of the current text has been checkpointed"""
+    parsed_data = _parsed_checkpoint(doc)
+    if parsed_data is not None:
+        return parsed_data
+
+    llm_parser = get_worker_resources().llm_parser
+    return _save_parsed(
+        mongo_collection, doc, llm_parser.extract_entities(doc["extracted_text"])
+    )
+
+
+def _get_or_create_candidate(db: Session, parsed_data: dict) -> tuple[Candidate, str]:
+    existing_candidate = (
+        db.query(Candidate).filter(Candidate.email == parsed_data["email"]).first()
+    )
+    if existing_candidate:
+        return existing_candidate, "updated"
+
+    candidate = Candidate(
+        name=parsed_data["name"],
+        email=parsed_data["email"],
+        phone=parsed_data.get("phone"),
+        location=parsed_data.get("location"),
+    )
+    db.add(candidate)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker created the same candidate concurrently
+        db.rollback()
+        candidate = (
+            db.query(Candidate).filter(Candidate.email == parsed_data["email"]).one()
         )
+        return candidate, "updated"
+    db.refresh(candidate)
+    return candidate, "created"
+
+
+def _persist_stage(db: Session, mongo_collection, doc: dict) -> str:
+    """Upsert the Candidate and Resume rows keyed by the resume's mongo_id"""
+    if doc.get("resume_id") is not None:
+        return "unchanged"
+
+    parsed_data = doc["parsed_data"]
+    candidate, action = _get_or_create_candidate(db, parsed_data)
+
+    # A previous attempt may have committed the row before failing
+    mongo_id = str(doc["_id"])
+    resume = db.query(Resume).filter(Resume.mongo_id == mongo_id).first()
+    if resume is None:
+        resume = Resume(mongo_id=mongo_id)
         db.add(resume)
-        db.commit()
-        db.refresh(resume)
+    resume.candidate_id = candidate.id
+    resume.filename = doc["filename"]
+    resume.skills = parsed_data.get("skills", [])
+    resume.experience = parsed_data.get("experience_years", 0)
+    resume.education = parsed_data.get("education", [])
+    db.commit()
+    db.refresh(resume)
 
-        # Original ChromaDB indexing
-        try:
-            collection = chroma_client.get_collection()
-            collection.add(
-                documents=[raw_text],
-                metadatas=[{"resume_id": resume.id, "candidate_id": candidate.id}],
-                ids=[str(resume.id)],
+    _checkpoint(mongo_collection, doc, resume_id=resume.id, candidate_id=candidate.id)
+    return action
+
+
+def _index_stage(mongo_collection, doc: dict):
+    """
+    Queue the resume for the buffered vector store indexer; the document is
+    marked processed when its batch is written.
+    """
+    if doc.get("indexed"):
+        _checkpoint(mongo_collection, doc, processed=True, error=None)
+        return
+    resume_indexer.enqueue(mongo_collection, doc)
+
+
+def _record_failure(mongo_collection, mongo_id: str, error: Exception):
+    logger.error(f"Processing failed: {str(error)}")
+    mongo_collection.update_one(
+        {"_id": ObjectId(mongo_id)},
+        {"$set": {"processed": False, "error": str(error)}},
+    )
+
+
+@contextmanager
+def _stage(task, mongo_collection, mongo_id: str):
+    """Record a failure on the document only once no retry will follow"""
+    try:
+        yield
+    except Exception as e:
+        if isinstance(e, ValueError) or task.request.retries >= task.max_retries:
+            _record_failure(mongo_collection, mongo_id, e)
+        else:
+            logger.warning(f"Stage {task.name} failed for {mongo_id}, retrying: {e}")
+        raise
+
+
+@celery.task(name="process_resume_task")
+def process_resume_task(mongo_id: str):
+    """Entry point kept for existing callers; dispatches the staged pipeline"""
+    return resume_pipeline(mongo_id).apply_async().id
+
+
+@celery.task(name="extract_resume_task", **STAGE_RETRY_OPTIONS)
+def extract_resume_task(self, mongo_id: str) -> str:
+    """Stage 1 (CPU-bound): pull the file from GridFS and extract its text"""
+    mongo_collection = get_resume_collection()
+    with _stage(self, mongo_collection, mongo_id):
+        _extract_stage(mongo_collection, _load_checkpoint(mongo_collection, mongo_id))
+    return mongo_id
+
+
+@celery.task(name="parse_resume_task", **STAGE_RETRY_OPTIONS)
+def parse_resume_task(self, mongo_id: str) -> str:
+    """Stage 2 (slow I/O): extract structured entities with the LLM"""
+    mongo_collection = get_resume_collection()
+    with _stage(self, mongo_collection, mongo_id):
+        _parse_stage(mongo_collection, _load_checkpoint(mongo_collection, mongo_id))
+    return mongo_id
+
+
+@celery.task(name="persist_resume_task", **STAGE_RETRY_OPTIONS)
+def persist_resume_task(self, mongo_id: str) -> str:
+    """Stage 3: upsert the Candidate and Resume rows in Postgres"""
+    mongo_collection = get_resume_collection()
+    db = get_db_session()
+    try:
+        with _stage(self, mongo_collection, mongo_id):
+            _persist_stage(
+                db, mongo_collection, _load_checkpoint(mongo_collection, mongo_id)
             )
-        except Exception as e:
-            db.rollback()
-            raise RuntimeError(f"ChromaDB error: {str(e)}")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return mongo_id
+
+
+@celery.task(name="index_resume_task", **STAGE_RETRY_OPTIONS)
+def index_resume_task(self, mongo_id: str) -> dict:
+    """Stage 4: queue the resume text for batched vector indexing"""
+    mongo_collection = get_resume_collection()
+    with _stage(self, mongo_collection, mongo_id):
+        doc = _load_checkpoint(mongo_collection, mongo_id)
+        _index_stage(mongo_collection, doc)
+    return {"status": "success", "resume_id": str(doc["resume_id"])}
+
+
+@celery.task(name="flush_resume_index_task")
+def flush_resume_index_task() -> dict:
+    """Write every resume still waiting for the vector store, from any worker"""
+    return {"indexed": resume_indexer.flush_pending(get_resume_collection())}
+
+
+@celery.task(name="reindex_resumes_task")
+def reindex_resumes_task() -> dict:
+    """Queue every stored resume for re-embedding into the current collection"""
+    return {"queued": resume_indexer.requeue(get_resume_collection())}
+
+
+@celery.task(name="backfill_resume_locations_task")
+def backfill_resume_locations_task(batch_size: int = 500) -> dict:
+    """
+    Fill in the location of resumes parsed before it was extracted, then
+    re-index them so the location filter can match
+    """
+    mongo_collection = get_resume_collection()
+    extractor = get_worker_resources().llm_parser.fast_extractor or FastExtractor()
+    docs = mongo_collection.find(
+        {"parsed_data": {"$ne": None}, "parsed_data.location": {"$exists": False}},
+        {"extracted_text": 1, "candidate_id": 1},
+    )
+    scanned, located = 0, []
+    db = get_db_session()
+    try:
+        for doc in docs:
+            scanned += 1
+            location = extractor.extract_location(doc.get("extracted_text") or "")
+            # Stored even when None so the resume is not scanned again
+            mongo_collection.update_one(
+                {"_id": doc["_id"]}, {"$set": {"parsed_data.location": location}}
+            )
+            if location is None:
+                continue
+            located.append(doc["_id"])
+            if doc.get("candidate_id") is not None:
+                db.query(Candidate).filter(
+                    Candidate.id == doc["candidate_id"], Candidate.location.is_(None)
+                ).update({"location": location}, synchronize_session=False)
+            if len(located) % batch_size == 0:
+                db.commit()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
 
-        # Update MongoDB status
-        mongo_collection.update_one(
-            {"_id": ObjectId(mongo_id)}, {"$set": {"processed": True}}
+    queued = sum(
+        resume_indexer.requeue(
+            mongo_collection, {"_id": {"$in": located[start : start + batch_size]}}
         )
+        for start in range(0, len(located), batch_size)
+    )
+    return {"scanned": scanned, "located": len(located), "queued": queued}
 
-        return {"status": "success", "resume_id": str(resume.id), "action": action}
 
-    except Exception as e:
-        logger.error(f"Processing failed: {str(e)}")
-        mongo_collection.update_one(
-            {"_id": ObjectId(mongo_id)},
+@celery.task(name="rebuild_job_rankings_task")
+def rebuild_job_rankings_task(job_ids: list[int] | None = None) -> dict:
+    """Recompute precomputed job rankings (all active jobs by default)"""
+    db = get_db_session()
+    try:
+        return {"jobs": rebuild_job_rankings(db, job_ids)}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery.task(name="update_job_rankings_task")
+def update_job_rankings_task(resume_ids: list[int]) -> dict:
+    """Merge newly indexed resumes into the precomputed job rankings"""
+    db = get_db_session()
+    try:
+        return {"entries": update_rankings_for_resumes(db, resume_ids)}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery.task(name="rebuild_job_index_task")
+def rebuild_job_index_task() -> dict:
+    """Resync the job vector index with the active jobs in Postgres"""
+    db = get_db_session()
+    try:
+        return {"jobs": rebuild_job_index(db)}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery.task(name="rebuild_matrix_index_task")
+def rebuild_matrix_index_task() -> dict:
+    """Reload the quantized matrix index from every vector in the store"""
+    return {"rows": matrix_index.rebuild(get_vector_store().resume_embeddings())}
+
+
+@celery.task(name="rebuild_sparse_index_task")
+def rebuild_sparse_index_task(batch_size: int = 5000) -> dict:
+    """
+    Add every persisted resume to the keyword index, e.g. resumes indexed
+    before HYBRID_SEARCH was enabled; newer copies shadow older ones
+    """
+    docs = get_resume_collection().find(
+        {"resume_id": {"$exists": True}, "extracted_text": {"$exists": True}},
+        {"resume_id": 1, "extracted_text": 1},
+    )
+    resume_ids, texts, added = [], [], 0
+    for doc in docs:
+        resume_ids.append(doc["resume_id"])
+        texts.append(doc["extracted_text"])
+        if len(resume_ids) == batch_size:
+            sparse_index.add(resume_ids, texts)
+            added += len(resume_ids)
+            resume_ids, texts = [], []
+    sparse_index.add(resume_ids, texts)
+    return {"resumes": added + len(resume_ids)}
+
+
+if settings.JOB_RANKINGS_ENABLED:
+    resume_indexer.listeners.append(
+        lambda resume_ids: update_job_rankings_task.delay(resume_ids)
+    )
+
+
+def _claim_pending_resumes(mongo_collection, limit: int) -> list[str]:
+    """
+    Atomically claim up to `limit` unprocessed resumes. Claims older than
+    LLM_BATCH_CLAIM_TIMEOUT are considered abandoned and can be re-claimed.
+    """
+    now = datetime.now(timezone.utc)
+    stale = now - timedelta(seconds=settings.LLM_BATCH_CLAIM_TIMEOUT)
+    claimed = []
+    for _ in range(limit):
+        doc = mongo_collection.find_one_and_update(
             {
-                "$set": {
-                    "processed": False,
-                    "error": str(e),
-                    "parsed_data": parsed_data if "parsed_data" in locals() else None,
-                }
+                "processed": False,
+                "error": None,
+                "$or": [{"claimed_at": None}, {"claimed_at": {"$lt": stale}}],
             },
+            {"$set": {"claimed_at": now}},
+            projection={"_id": 1},
+            sort=[("_id", 1)],
         )
-        db.rollback()
-        raise  # Celery will handle retries
+        if not doc:
+            break
+        claimed.append(str(doc["_id"]))
+    return claimed
 
-    finally:
+
+@celery.task(name="process_pending_resumes_task")
+def process_pending_resumes_task(batch_size: int | None = None):
+    """
+    Claim a batch of pending resumes and run their LLM extractions
+    concurrently, so throughput follows the LLM backend rather than the
+    number of worker processes. Re-enqueues itself while the backlog is full.
+    """
+    batch_size = batch_size or settings.LLM_BATCH_SIZE
+    mongo_collection = get_resume_collection()
+    mongo_ids = _claim_pending_resumes(mongo_collection, batch_size)
+    if not mongo_ids:
+        return {"status": "idle", "processed": 0}
+
+    # Text extraction is CPU-bound and stays sequential
+    docs = {}
+    for mongo_id in mongo_ids:
         try:
-            next(db_gen)  # Close the database session
-        except StopIteration:
-            pass
+            doc = _load_checkpoint(mongo_collection, mongo_id)
+            _extract_stage(mongo_collection, doc)
+            docs[mongo_id] = doc
+        except Exception as e:
+            _record_failure(mongo_collection, mongo_id, e)
+
+    # Only resumes without a parse checkpoint go to the LLM, all at once
+    to_parse = [doc for doc in docs.values() if _parsed_checkpoint(doc) is None]
+    llm_parser = get_worker_resources().llm_parser
+    results = asyncio.run(
+        llm_parser.aextract_many([doc["extracted_text"] for doc in to_parse])
+    )
+    for doc, parsed_data in zip(to_parse, results):
+        try:
+            _save_parsed(mongo_collection, doc, parsed_data)
+        except Exception as e:
+            _record_failure(mongo_collection, str(doc["_id"]), e)
+            docs.pop(str(doc["_id"]))
+
+    succeeded = 0
+    db = get_db_session()
+    try:
+        for mongo_id, doc in docs.items():
+            try:
+                _persist_stage(db, mongo_collection, doc)
+                _index_stage(mongo_collection, doc)
+                succeeded += 1
+            except Exception as e:
+                db.rollback()
+                _record_failure(mongo_collection, mongo_id, e)
+    finally:
+        db.close()
+
+    # The whole batch goes to the vector store together; failures stay queued
+    try:
+        resume_indexer.flush(mongo_collection)
+    except Exception as e:
+        logger.warning(f"Batch index flush failed: {str(e)}")
+
+    if len(mongo_ids) == batch_size:
+        process_pending_resumes_task.delay(batch_size)
+
+    return {"status": "success", "processed": succeeded, "claimed": len(mongo_ids)}
+
+
+# Workers flush buffered index writes by size and after INDEX_FLUSH_INTERVAL;
+# this timer drains whatever a dead worker left flagged in Mongo
+celery.conf.beat_schedule = {
+    "flush-resume-index": {
+        "task": "flush_resume_index_task",
+        "schedule": settings.INDEX_FLUSH_INTERVAL,
+    },
+    "rebuild-job-index": {
+        "task": "rebuild_job_index_task",
+        "schedule": settings.JOB_INDEX_REFRESH_INTERVAL,
+    },
+}
+if settings.JOB_RANKINGS_ENABLED:
+    celery.conf.beat_schedule["rebuild-job-rankings"] = {
+        "task": "rebuild_job_rankings_task",
+        "schedule": settings.JOB_RANKING_REFRESH_INTERVAL,
+    }
+if settings.LLM_BATCH_MODE:
+    celery.conf.beat_schedule["process-pending-resumes"] = {
+        "task": "process_pending_resumes_task",
+        "schedule": settings.LLM_BATCH_INTERVAL,
+    }
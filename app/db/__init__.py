@@ -1,4 +1,4 @@
-from .mongo_client import get_resume_collection
+from .mongo_client import get_resume_bucket, get_resume_collection
 from .postgres_client import Base, SessionLocal, engine
 
 
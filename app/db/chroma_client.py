@@ -1,17 +1,60 @@
+import logging
+import re
+
 import chromadb
 
 from app.core.config import settings
+from app.services.embeddings import embedding_function
+
+logger = logging.getLogger(__name__)
+
+
+def collection_name(base: str, model: str = settings.EMBEDDING_MODEL) -> str:
+    """
+    Collections are named per embedding model: vectors from another model
+    have another dimension and cannot share an index
+    """
+    return f"{base}_{re.sub(r'[^a-zA-Z0-9._-]+', '-', model)}".strip("-._")[:63]
 
 
 class ChromaClient:
-    def __init__(self):
+    def __init__(self, embedding_function=embedding_function):
         self.client = chromadb.PersistentClient(path=settings.CHROMA_PERSIST_PATH)
+        # Vectors come from EMBEDDING_MODEL via Ollama, not Chroma's default
         self.collection = self.client.get_or_create_collection(
-            name=settings.CHROMA_COLLECTION, metadata={"hnsw:space": "cosine"}
+            name=collection_name(settings.CHROMA_COLLECTION),
+            metadata={"hnsw:space": "cosine"},
+            embedding_function=embedding_function,
         )
+        # Job query embeddings, for ranking jobs against a resume
+        self.job_collection = self.client.get_or_create_collection(
+            name=collection_name(settings.CHROMA_JOB_COLLECTION),
+            metadata={"hnsw:space": "cosine"},
+            embedding_function=embedding_function,
+        )
+        self._warn_if_unindexed()
+
+    def _warn_if_unindexed(self):
+        """Resumes indexed under the old unsuffixed name have to be re-embedded"""
+        if self.collection.count():
+            return
+        try:
+            legacy = self.client.get_collection(name=settings.CHROMA_COLLECTION)
+            count = legacy.count()
+        except Exception:
+            return
+        if count:
+            logger.warning(
+                f"Chroma collection {self.collection.name} is empty but "
+                f"{settings.CHROMA_COLLECTION} holds {count} entries from another "
+                "embedding model; run reindex_resumes_task to rebuild it from Mongo"
+            )
 
     def get_collection(self):
         return self.collection
 
+    def get_job_collection(self):
+        return self.job_collection
+
 
 chroma_client = ChromaClient()
@@ -1,4 +1,5 @@
 import certifi
+from gridfs import GridFSBucket
 from pymongo import MongoClient
 
 from app.core.config import settings
@@ -12,7 +13,29 @@ client = MongoClient(
 
 
 db = client[settings.MONGO_DB_NAME]
+resume_bucket = GridFSBucket(
+    db, bucket_name=f"{settings.MONGO_RESUME_COLLECTION}_files"
+)
 
 
 def get_resume_collection():
     return db[settings.MONGO_RESUME_COLLECTION]
+
+
+def get_resume_bucket():
+    return resume_bucket
+
+
+def ensure_indexes():
+    """Create the indexes the upload and status endpoints rely on"""
+    collection = get_resume_collection()
+    collection.create_index("batch_id", sparse=True)
+    collection.create_index("batch_ids", sparse=True)
+    collection.create_index([("processed", 1), ("error", 1), ("claimed_at", 1)])
+    collection.create_index([("index_pending", 1), ("index_queued_at", 1)], sparse=True)
+    # Documents stored before fingerprinting have no hash and stay unindexed
+    collection.create_index(
+        "content_hash",
+        unique=True,
+        partialFilterExpression={"content_hash": {"$exists": True}},
+    )
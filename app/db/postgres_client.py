@@ -3,7 +3,9 @@ from sqlalchemy.orm import declarative_base, sessionmaker
 
 from app.core.config import settings
 
-engine = create_engine(settings.POSTGRES_URL)
+engine = create_engine(
+    settings.POSTGRES_URL, pool_size=settings.POSTGRES_POOL_SIZE, pool_pre_ping=True
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
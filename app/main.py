@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 
 from app.api.endpoints import auth, jobs, resumes, search
 from app.core.config import settings
+from app.db.mongo_client import ensure_indexes
 from app.db.postgres_client import Base, engine, get_db
 
 # from app.models import job, resume
@@ -29,6 +30,7 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     initialize_firebase()  # Explicit initialization
+    ensure_indexes()
 
 
 def create_tables():
@@ -1,13 +1,17 @@
 from sqlalchemy import (
+    ARRAY,
     JSON,
     Boolean,
     Column,
     DateTime,
+    Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
 )
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 
 from app.db.postgres_client import Base
@@ -28,6 +32,29 @@ class Job(Base):
     experience_required = Column(Integer, nullable=True)
     education_required = Column(JSON, nullable=True)
 
+    # Embedding of the ranking query and the hash of the text it was built
+    # from; deferred so job listings do not load the vector
+    query_embedding = deferred(Column(ARRAY(Float), nullable=True))
+    query_hash = Column(String(64), nullable=True)
+
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class JobRanking(Base):
+    """Precomputed top candidates for an active job, best score first"""
+
+    __tablename__ = "job_rankings"
+    __table_args__ = (Index("ix_job_rankings_job_score", "job_id", "score"),)
+
+    job_id = Column(
+        Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True
+    )
+    resume_id = Column(
+        Integer, ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True
+    )
+    score = Column(Float, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
@@ -0,0 +1,24 @@
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Column, ForeignKey, Index, Integer
+
+from app.core.config import settings
+from app.db.postgres_client import Base
+
+
+class JobEmbedding(Base):
+    """Query embedding of an active job, for matching jobs to a resume"""
+
+    __tablename__ = "job_embeddings"
+    __table_args__ = (
+        Index(
+            "ix_job_embeddings_embedding",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
+
+    job_id = Column(
+        Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True
+    )
+    embedding = Column(Vector(settings.EMBEDDING_DIMENSIONS), nullable=False)
@@ -23,7 +23,7 @@ class Resume(Base):
 
     id = Column(Integer, primary_key=True)
     candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False)
-    mongo_id = Column(String)
+    mongo_id = Column(String, unique=True, index=True)
     filename = Column(String)
     skills = Column(ARRAY(String))
     experience = Column(JSON)
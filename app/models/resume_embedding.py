@@ -0,0 +1,45 @@
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import (
+    ARRAY,
+    Boolean,
+    Column,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+
+from app.core.config import settings
+from app.db.postgres_client import Base
+
+
+class ResumeEmbedding(Base):
+    """One embedded resume chunk (or whole resume) for the pgvector store"""
+
+    __tablename__ = "resume_embeddings"
+    __table_args__ = (
+        Index(
+            "ix_resume_embeddings_embedding",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+        Index("ix_resume_embeddings_skills", "skills", postgresql_using="gin"),
+    )
+
+    id = Column(String, primary_key=True)
+    resume_id = Column(
+        Integer, ForeignKey("resumes.id", ondelete="CASCADE"), index=True
+    )
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False)
+    chunk = Column(Integer, default=0)
+    content = Column(Text)
+    embedding = Column(Vector(settings.EMBEDDING_DIMENSIONS), nullable=False)
+
+    # Filterable copies of the parsed resume, normalized to lower case
+    experience = Column(Float, nullable=True)
+    location = Column(String, nullable=True)
+    skills = Column(ARRAY(String), nullable=True)
+    active = Column(Boolean, default=True, index=True)
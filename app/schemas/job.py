@@ -12,6 +12,12 @@ class JobBase(BaseModel):
     requirements: str | None = None
 
 
+class SkillList(BaseModel):
+    """Shape the skill extraction LLM is constrained to when producing JSON"""
+
+    skills: list[str] = []
+
+
 class JobCreate(JobBase):
     pass
 
@@ -28,6 +34,18 @@ class JobUpdate(BaseModel):
     is_active: bool | None = None
 
 
+class BatchRankRequest(BaseModel):
+    """Jobs to rank candidates for, with the filters of rank_candidates"""
+
+    job_ids: list[int]
+    limit: int = 10
+    min_experience: float | None = None
+    max_experience: float | None = None
+    location: str | None = None
+    skills: list[str] = []
+    active_only: bool = False
+
+
 class Job(JobBase):
     id: int
     skills_required: list[str] | None = None
@@ -39,3 +57,8 @@ class Job(JobBase):
 
     class Config:
         from_attributes = True
+
+
+class JobMatch(BaseModel):
+    score: float
+    job: Job
@@ -80,6 +80,18 @@ class EducationEntry(BaseModel):
     duration: str | None = None
 
 
+class ResumeExtraction(BaseModel):
+    """Shape the extraction LLM is constrained to when producing JSON"""
+
+    name: str | None = None
+    email: str | None = None
+    phone: str | None = None
+    location: str | None = None
+    skills: list[str] = []
+    experience_years: float = 0
+    education: list[EducationEntry] = []
+
+
 class ResumeResponse(BaseModel):
     id: int
     skills: list[str]
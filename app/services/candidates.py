@@ -1,39 +1,214 @@
+import logging
 from typing import Any, Dict, List
 
-from app.db.chroma_client import chroma_client
+import numpy as np
+
+from app.core.config import settings
 from app.models.resume import Resume
+from app.services.embeddings import embedding_function
+from app.services.matrix_index import matrix_index
+from app.services.rank_fusion import reciprocal_rank_fusion
+from app.services.sparse_index import sparse_index
+from app.services.vector_store import (
+    SearchFilters,
+    aggregate_chunk_scores,
+    get_vector_store,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class CandidateService:
-    def vector_search(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+    def vector_search(
+        self,
+        query: str | None = None,
+        limit: int = 10,
+        query_embedding: list[float] | None = None,
+        filters: SearchFilters | None = None,
+        include_content: bool = True,
+    ) -> list[dict[str, Any]]:
         try:
-            collection = chroma_client.get_collection()
-            results = collection.query(
-                query_texts=[query],
-                n_results=limit,
-                include=["documents", "metadatas", "distances"],
+            # The sparse index cannot apply metadata filters, so those stay dense
+            hybrid = (
+                settings.HYBRID_SEARCH and query and (not filters or filters.is_empty)
+            )
+            depth = limit * settings.HYBRID_DEPTH if hybrid else limit
+            if hybrid and query_embedding is None:
+                # Also needed to score keyword-only hits
+                query_embedding = embedding_function([query])[0]
+            dense = self._dense_search(
+                query, depth, query_embedding, filters, include_content
+            )
+            if not hybrid:
+                return dense
+            return self._fuse(
+                dense,
+                sparse_index.search(query, depth),
+                limit,
+                query_embedding,
+                include_content,
             )
-            return self._format_results(results) if results else []
-        except Exception as e:
-            print(f"Vector search error: {str(e)}")
+        except Exception:
+            logger.exception("Vector search error")
             return []
 
-    def _format_results(self, chroma_results) -> list[dict[str, Any]]:
-        formatted = []
-        # IDs are always returned even when not explicitly included
-        for ids, distances, metadatas, documents in zip(
-            chroma_results["ids"],  # Now directly accessed
-            chroma_results["distances"],
-            chroma_results["metadatas"],
-            chroma_results["documents"],
+    def vector_search_many(
+        self,
+        queries: list[str],
+        query_embeddings: list[list[float]],
+        limit: int = 10,
+        filters: SearchFilters | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """{resume_id, score} hits per query, one vector store call for all"""
+        try:
+            unfiltered = not filters or filters.is_empty
+            hybrid = settings.HYBRID_SEARCH and unfiltered
+            depth = limit * settings.HYBRID_DEPTH if hybrid else limit
+            dense = []
+            if settings.MATRIX_SEARCH and unfiltered:
+                dense = [matrix_index.search(e, depth) for e in query_embeddings]
+            if not any(dense):
+                dense = get_vector_store().search_many(query_embeddings, depth, filters)
+            if not hybrid:
+                return dense
+            return self._fuse_many(
+                dense,
+                [sparse_index.search(query, depth) for query in queries],
+                limit,
+                query_embeddings,
+            )
+        except Exception:
+            logger.exception("Vector search error")
+            return [[] for _ in queries]
+
+    def _dense_search(
+        self,
+        query: str | None,
+        limit: int,
+        query_embedding: list[float] | None,
+        filters: SearchFilters | None,
+        include_content: bool,
+    ) -> list[dict[str, Any]]:
+        """
+        The in-process matrix index answers unfiltered id/score lookups;
+        filters, document content and an unseeded index fall back to the
+        vector store
+        """
+        if (
+            settings.MATRIX_SEARCH
+            and not include_content
+            and (not filters or filters.is_empty)
         ):
-            for i in range(len(ids)):
-                formatted.append(
-                    {
-                        "resume_id": ids[i],
-                        "score": 1 - distances[i],
-                        "metadata": metadatas[i],
-                        "content": documents[i],
-                    }
+            if query_embedding is None:
+                query_embedding = embedding_function([query])[0]
+            hits = matrix_index.search(query_embedding, limit)
+            if hits:
+                return hits
+        return get_vector_store().search(
+            query, limit, query_embedding, filters, include_content
+        )
+
+    def _fuse(
+        self,
+        dense: list[dict[str, Any]],
+        sparse: list[tuple[int, float]],
+        limit: int,
+        query_embedding: list[float],
+        include_content: bool = False,
+    ) -> list[dict[str, Any]]:
+        """
+        Reciprocal rank fusion of dense hits with BM25 keyword hits. The
+        fused rank only orders the results and is returned as `rrf_score`;
+        `score` stays the dense similarity, so it reads the same as in
+        unfused and precomputed rankings.
+        """
+        return self._fuse_many(
+            [dense], [sparse], limit, [query_embedding], include_content
+        )[0]
+
+    def _fuse_many(
+        self,
+        dense: list[list[dict[str, Any]]],
+        sparse: list[list[tuple[int, float]]],
+        limit: int,
+        query_embeddings: list[list[float]],
+        include_content: bool = False,
+    ) -> list[list[dict[str, Any]]]:
+        """_fuse for several queries, fetching keyword-only vectors once"""
+        hits = [{hit["resume_id"]: hit for hit in query_hits} for query_hits in dense]
+        fused = [
+            reciprocal_rank_fusion(
+                [list(query_hits), [str(resume_id) for resume_id, _ in keyword_hits]],
+                settings.RRF_K,
+            )[:limit]
+            for query_hits, keyword_hits in zip(hits, sparse)
+        ]
+        keyword_only = {
+            resume_id
+            for query_hits, ranking in zip(hits, fused)
+            for resume_id, _ in ranking
+            if resume_id not in query_hits
+        }
+        if keyword_only:
+            scored = self._score_resumes(
+                sorted(keyword_only), query_embeddings, include_content
+            )
+            for query_hits, ranking, query_scores in zip(hits, fused, scored):
+                query_hits.update(
+                    (resume_id, query_scores[resume_id])
+                    for resume_id, _ in ranking
+                    if resume_id not in query_hits and resume_id in query_scores
                 )
-        return formatted
+        return [
+            [
+                {
+                    **query_hits.get(resume_id, {"resume_id": resume_id, "score": 0.0}),
+                    "rrf_score": rrf_score,
+                }
+                for resume_id, rrf_score in ranking
+            ]
+            for query_hits, ranking in zip(hits, fused)
+        ]
+
+    def _score_resumes(
+        self,
+        resume_ids: list[str],
+        query_embeddings: list[list[float]],
+        include_content: bool,
+    ) -> list[dict[str, dict[str, Any]]]:
+        """
+        Dense hits for resumes the vector search did not return, scored
+        against each query from one fetch of their stored vectors
+        """
+        store = get_vector_store()
+        batches = list(store.resume_embeddings([int(r) for r in resume_ids]))
+        if not batches:
+            return [{} for _ in query_embeddings]
+        chunk_ids = np.concatenate([ids for ids, _ in batches])
+        vectors = np.vstack([vectors for _, vectors in batches])
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        contents = {}
+        if include_content:
+            contents = store.resume_contents(sorted({int(i) for i in chunk_ids}))
+
+        results = []
+        for similarities in (vectors @ queries.T).T:
+            ids, scores, _ = aggregate_chunk_scores(
+                chunk_ids,
+                similarities,
+                settings.CHUNK_SCORE_AGGREGATION,
+                settings.CHUNK_SCORE_TOP_K,
+            )
+            results.append(
+                {
+                    str(resume_id): {
+                        "resume_id": str(resume_id),
+                        "score": float(score),
+                        **contents.get(int(resume_id), {}),
+                    }
+                    for resume_id, score in zip(ids, scores)
+                }
+            )
+        return results
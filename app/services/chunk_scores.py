@@ -0,0 +1,31 @@
+import numpy as np
+
+
+def aggregate_chunk_scores(
+    resume_ids: np.ndarray, scores: np.ndarray, method: str = "max", top_k: int = 3
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Collapse chunk scores to one score per resume without a Python loop.
+    Returns the unique resume ids, their scores and the index of each
+    resume's best chunk, ordered by descending score.
+    """
+    # Group-major, best-first order: each resume's chunks become contiguous
+    order = np.lexsort((-scores, resume_ids))
+    sorted_ids, sorted_scores = resume_ids[order], scores[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    best = order[starts]
+
+    if method == "max":
+        aggregated = sorted_scores[starts]
+    else:
+        # Rank of each chunk within its resume, then the mean of the first k
+        counts = np.diff(np.r_[starts, len(sorted_ids)])
+        rank = np.arange(len(sorted_ids)) - np.repeat(starts, counts)
+        kept = rank < top_k
+        group = np.repeat(np.arange(len(starts)), counts)
+        aggregated = np.bincount(
+            group[kept], weights=sorted_scores[kept], minlength=len(starts)
+        ) / np.minimum(counts, top_k)
+
+    ranking = np.argsort(-aggregated, kind="stable")
+    return sorted_ids[starts][ranking], aggregated[ranking], best[ranking]
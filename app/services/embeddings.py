@@ -0,0 +1,198 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import ollama
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Content-hash keyed embedding cache: an in-process LRU in front of a
+    SQLite file shared by every process on the host. Vectors are stored as
+    raw float32 bytes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.EMBEDDING_CACHE_MAX_ENTRIES,
+        path: str | None = settings.EMBEDDING_CACHE_PATH,
+    ):
+        self.max_entries = max_entries
+        self.path = path
+        self._lru: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._conn_pid: int | None = None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "errors": 0}
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        """Look up keys in memory, then on disk; returns only the hits"""
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    found[key] = vector
+            self._stats["memory_hits"] += len(found)
+
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        from_disk = self._disk_get(missing)
+        with self._lock:
+            for key, vector in from_disk.items():
+                self._remember(key, vector)
+            self._stats["disk_hits"] += len(from_disk)
+            self._stats["misses"] += len(missing) - len(from_disk)
+        found.update(from_disk)
+        return found
+
+    def set_many(self, items: dict[str, np.ndarray]):
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+        self._disk_set(items)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._lru)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        )
+        return stats
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """Insert into the LRU tier; caller must hold the lock"""
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def _connection(self) -> sqlite3.Connection | None:
+        """One connection per process; connections must not cross a fork"""
+        if not self.path:
+            return None
+        if self._conn is None or self._conn_pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+
+    def _disk_get(self, keys: list[str]) -> dict[str, np.ndarray]:
+        if not keys:
+            return {}
+        try:
+            with self._lock:
+                conn = self._connection()
+                if conn is None:
+                    return {}
+                rows = []
+                # Stay under SQLite's bound-parameter limit
+                for start in range(0, len(keys), 500):
+                    batch = keys[start : start + 500]
+                    rows += conn.execute(
+                        "SELECT key, vector FROM embeddings WHERE key IN "
+                        f"({','.join('?' * len(batch))})",
+                        batch,
+                    ).fetchall()
+            return {key: np.frombuffer(blob, dtype=np.float32) for key, blob in rows}
+        except Exception as e:
+            self._record_error(e)
+            return {}
+
+    def _disk_set(self, items: dict[str, np.ndarray]):
+        if not items:
+            return
+        try:
+            with self._lock:
+                conn = self._connection()
+                if conn is None:
+                    return
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                        [
+                            (key, np.asarray(vector, dtype=np.float32).tobytes())
+                            for key, vector in items.items()
+                        ],
+                    )
+        except Exception as e:
+            self._record_error(e)
+
+    def _record_error(self, error: Exception):
+        with self._lock:
+            self._stats["errors"] += 1
+        logger.warning(f"Embedding cache error: {str(error)}")
+
+
+class OllamaEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Chroma embedding function backed by Ollama's batch embed endpoint. Only
+    texts missing from the cache are sent, EMBEDDING_BATCH_SIZE at a time.
+    """
+
+    def __init__(
+        self,
+        model: str = settings.EMBEDDING_MODEL,
+        batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+        cache: EmbeddingCache | None = None,
+        client: ollama.Client | None = None,
+    ):
+        self.model = model
+        self.batch_size = batch_size
+        self.cache = cache
+        self.client = client or ollama.Client(host=settings.OLLAMA_HOST)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        keys = [EmbeddingCache.make_key(self.model, text) for text in input]
+        vectors = self.cache.get_many(keys) if self.cache else {}
+
+        # Identical texts in one call are embedded once
+        missing = {key: text for key, text in zip(keys, input) if key not in vectors}
+        if missing:
+            computed = self._embed(list(missing.keys()), list(missing.values()))
+            if self.cache:
+                self.cache.set_many(computed)
+            vectors.update(computed)
+        return [vectors[key] for key in keys]
+
+    def _embed(self, keys: list[str], texts: list[str]) -> dict[str, np.ndarray]:
+        vectors: dict[str, np.ndarray] = {}
+        for start in range(0, len(texts), self.batch_size):
+            response = self.client.embed(
+                model=self.model,
+                input=texts[start : start + self.batch_size],
+                keep_alive=settings.OLLAMA_KEEP_ALIVE,
+            )
+            for key, embedding in zip(
+                keys[start : start + self.batch_size], response["embeddings"]
+            ):
+                vectors[key] = np.asarray(embedding, dtype=np.float32)
+        return vectors
+
+    @staticmethod
+    def name() -> str:
+        return "ollama_cached"
+
+
+embedding_cache = EmbeddingCache()
+embedding_function = OllamaEmbeddingFunction(cache=embedding_cache)
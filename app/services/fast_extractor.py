@@ -0,0 +1,226 @@
+import re
+from typing import Any
+
+import spacy
+from spacy.matcher import PhraseMatcher
+
+from app.services.resume_sections import is_section_heading, split_sections
+
+# Canonical skill names matched case-insensitively against resume text
+# fmt: off
+SKILL_TAXONOMY = (
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Golang", "Rust",
+    "Ruby", "PHP", "Kotlin", "Swift", "Scala", "MATLAB", "Perl", "Bash",
+    "SQL", "NoSQL", "PostgreSQL", "MySQL", "SQLite", "Oracle", "MongoDB", "Redis",
+    "Cassandra", "Elasticsearch", "DynamoDB", "Snowflake", "BigQuery",
+    "HTML", "CSS", "React", "Angular", "Vue.js", "Next.js", "Node.js", "Express.js",
+    "Django", "Flask", "FastAPI", "Spring", "Spring Boot", ".NET", "ASP.NET",
+    "Ruby on Rails", "GraphQL", "REST API", "RESTful", "gRPC", "Streamlit",
+    "AWS", "Azure", "GCP", "Google Cloud", "Docker", "Kubernetes", "Terraform",
+    "Ansible", "Jenkins", "GitHub Actions", "CI/CD", "Linux", "Git", "Helm",
+    "Kafka", "RabbitMQ", "Celery", "Airflow", "Spark", "Hadoop", "Apache Hive", "dbt",
+    "Pandas", "NumPy", "SciPy", "scikit-learn", "TensorFlow", "PyTorch", "Keras",
+    "OpenCV", "spaCy", "NLTK", "Hugging Face", "LangChain",
+    "Machine Learning", "Deep Learning", "NLP", "Computer Vision",
+    "Data Analysis", "Data Engineering", "Statistics", "Tableau", "Power BI",
+    "Excel", "Agile", "Scrum", "JIRA", "Microservices", "System Design",
+    "Unit Testing", "Selenium", "Pytest", "JUnit", "Figma",
+)
+# fmt: on
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"(?<!\w)(\+?\d[\d\s().-]{8,}\d)(?!\w)")
+PHONE_LABEL_RE = re.compile(
+    r"\b(?:phone|mobile|mob|cell|tel|telephone|ph)\b", re.IGNORECASE
+)
+# Year ranges, dates and decimals that PHONE_RE would otherwise accept
+NOT_PHONE_RE = re.compile(
+    r"(?:19|20)\d{2}\s*[-–]\s*(?:(?:19|20)\d{2}|\d{1,2}(?!\d))"
+    r"|(?<!\d)\d{4}[./]\d{1,2}[./]\d{1,2}(?!\d)"
+    r"|(?<!\d)\d{1,2}[./]\d{1,2}[./]\d{2,4}(?!\d)"
+    r"|(?<!\d)\d\.\d(?!\d)"
+)
+EXPERIENCE_RE = re.compile(
+    r"(\d{1,2})\+?\s*(?:years?|yrs?)\s+(?:of\s+)?"
+    r"(?:professional\s+|work\s+|industry\s+|relevant\s+)?experience",
+    re.IGNORECASE,
+)
+DEGREE_RE = re.compile(
+    r"\b(Bachelor(?:'s)?(?: of [A-Z][\w ]+)?|Master(?:'s)?(?: of [A-Z][\w ]+)?"
+    r"|B\.?\s?Tech|M\.?\s?Tech|B\.?\s?Sc|M\.?\s?Sc|B\.E\.|M\.E\.|B\.A\.|M\.A\."
+    r"|MBA|Ph\.?\s?D|Doctor of [A-Z][\w ]+)(?!\w)"
+)
+INSTITUTE_RE = re.compile(
+    r"([A-Z][\w.&'-]*(?: [A-Z&][\w.&'-]*)*"
+    r" (?:University|Institute|College|School)(?: of [A-Z][\w.&' -]*)?"
+    r"|(?:University|Institute|College|School) of [A-Z][\w.&' -]*)"
+)
+LOCATION_LABEL_RE = re.compile(
+    r"\b(?:location|address|based in|lives in)\s*[:\-]?\s*"
+    r"([A-Z][\w .'-]*(?:,\s*[A-Z][\w .'-]*){0,2})"
+)
+# "City, State" or "City, Country" as one segment of the contact line
+PLACE_RE = re.compile(r"^[A-Z][a-zA-Z .'-]{1,30},\s*[A-Z][a-zA-Z .'-]{1,30}$")
+CONTACT_SEPARATOR_RE = re.compile(r"\s*[|•·]\s*")
+NAME_TOKEN_RE = re.compile(r"^[A-Z][a-zA-Z'.-]*$")
+NAME_STOPWORDS = {
+    "resume", "curriculum", "vitae", "cv", "profile", "summary", "contact",
+    "information", "details", "personal", "senior", "junior", "lead", "staff",
+    "principal", "engineer", "engineering", "developer", "software", "data",
+    "scientist", "analyst", "manager", "architect", "consultant", "intern",
+    "designer", "administrator", "specialist", "director", "full", "stack",
+    "frontend", "backend", "web", "cloud", "devops", "machine", "learning",
+}  # fmt: skip
+# A name line must sit this close to the line holding the email or phone
+NAME_CONTACT_DISTANCE = 2
+EDUCATION_HEADINGS = {"education", "academic background"}
+
+
+class FastExtractor:
+    """
+    Deterministic extraction of the fields regexes and a skill PhraseMatcher
+    can pull out reliably, so the LLM only has to fill in what is left.
+    """
+
+    def __init__(self, skills: tuple[str, ...] = SKILL_TAXONOMY):
+        self.nlp = spacy.blank("en")
+        self.matcher = PhraseMatcher(self.nlp.vocab, attr="LOWER")
+        self.canonical = {skill.lower(): skill for skill in skills}
+        self.matcher.add("SKILL", [self.nlp.make_doc(skill) for skill in skills])
+
+    def extract(self, text: str) -> dict[str, Any]:
+        """
+        Return only the fields found with confidence; anything uncertain is
+        left out so the LLM is asked for it
+        """
+        result: dict[str, Any] = {}
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+
+        contact_lines = []
+        if email := EMAIL_RE.search(text):
+            result["email"] = email.group().rstrip(".")
+            contact_lines += [
+                i for i, line in enumerate(lines) if EMAIL_RE.search(line)
+            ]
+        if phone := self._extract_phone(lines):
+            result["phone"], phone_line = phone
+            contact_lines.append(phone_line)
+        if name := self._extract_name(lines, contact_lines):
+            result["name"] = name
+        if location := self._extract_location(lines, contact_lines):
+            result["location"] = location
+        if skills := self.extract_skills(text):
+            result["skills"] = skills
+        if years := [int(m) for m in EXPERIENCE_RE.findall(text)]:
+            result["experience_years"] = max(years)
+        if education := self._extract_education(text, lines):
+            result["education"] = education
+        return result
+
+    def extract_skills(self, text: str) -> list[str]:
+        doc = self.nlp.make_doc(text)
+        skills: dict[str, None] = {}
+        for _, start, end in self.matcher(doc):
+            skills[self.canonical[doc[start:end].text.lower()]] = None
+        return list(skills)
+
+    def _extract_phone(self, lines: list[str]) -> tuple[str, int] | None:
+        """
+        A phone number is trusted only with a label on its line or at least
+        ten digits, and never when it is shaped like a date or year range
+        """
+        for i, line in enumerate(lines):
+            for match in PHONE_RE.finditer(line):
+                candidate = match.group(1)
+                if NOT_PHONE_RE.search(candidate):
+                    continue
+                digits = sum(c.isdigit() for c in candidate)
+                labelled = PHONE_LABEL_RE.search(line[: match.start()])
+                if digits > 15 or (digits < 10 and not labelled):
+                    continue
+                return re.sub(r"\s+", " ", candidate).strip(), i
+        return None
+
+    def _extract_name(self, lines: list[str], contact_lines: list[int]) -> str | None:
+        """
+        Resumes almost always open with the candidate's name on its own line,
+        right above the contact details; without that anchor a capitalised
+        line is as likely to be a job title
+        """
+        for i, line in enumerate(lines[:5]):
+            if not any(abs(i - j) <= NAME_CONTACT_DISTANCE for j in contact_lines):
+                continue
+            tokens = line.split()
+            if not 2 <= len(tokens) <= 4 or is_section_heading(line):
+                continue
+            if any(t.lower().strip(":,") in NAME_STOPWORDS for t in tokens):
+                continue
+            if all(NAME_TOKEN_RE.match(t) for t in tokens):
+                return " ".join(t.capitalize() if t.isupper() else t for t in tokens)
+        return None
+
+    def _extract_location(
+        self, lines: list[str], contact_lines: list[int]
+    ) -> str | None:
+        """A labelled location near the top, or a "City, Region" contact segment"""
+        for line in lines[:10]:
+            if match := LOCATION_LABEL_RE.search(line):
+                return match.group(1).strip(" ,.-")
+        for i in sorted(set(contact_lines)):
+            for segment in CONTACT_SEPARATOR_RE.split(lines[i]):
+                if PLACE_RE.match(segment) and not is_section_heading(segment):
+                    return segment
+        return None
+
+    def extract_location(self, text: str) -> str | None:
+        """Location alone, for backfilling resumes parsed before it was extracted"""
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        contact_lines = [
+            i
+            for i, line in enumerate(lines)
+            if EMAIL_RE.search(line) or PHONE_LABEL_RE.search(line)
+        ]
+        return self._extract_location(lines, contact_lines)
+
+    def _extract_education(self, text: str, lines: list[str]) -> list[dict[str, str]]:
+        """
+        Degree lines paired with an institute on the same or next line. The
+        result is only trusted when it accounts for every degree and
+        institute mentioned (in the education section, if there is one);
+        otherwise nothing is returned and the LLM extracts education.
+        """
+        sections = [
+            body.splitlines()
+            for heading, body in split_sections(text)
+            if heading in EDUCATION_HEADINGS
+        ]
+        if sections:
+            lines = [line.strip() for body in sections for line in body if line.strip()]
+
+        education, used = [], set()
+        for i, line in enumerate(lines):
+            degree = DEGREE_RE.search(line)
+            if not degree:
+                continue
+            institute_line = i
+            institute = INSTITUTE_RE.search(line)
+            if not institute and i + 1 < len(lines):
+                institute_line = i + 1
+                institute = INSTITUTE_RE.search(lines[i + 1])
+            if not institute:
+                return []
+            used.update({i, institute_line})
+            education.append(
+                {
+                    "degree": degree.group().strip(),
+                    "institute": institute.group().strip(" ,-"),
+                }
+            )
+
+        # An institute without a recognised degree means an entry was missed
+        unmatched = [
+            i
+            for i, line in enumerate(lines)
+            if INSTITUTE_RE.search(line) and i not in used
+        ]
+        return [] if unmatched else education
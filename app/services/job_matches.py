@@ -0,0 +1,87 @@
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.models.job import Job
+from app.models.resume import Resume
+from app.services.job_rankings import active_job_embeddings
+from app.services.vector_store import get_vector_store
+
+logger = logging.getLogger(__name__)
+
+
+def sync_job_index(job: Job):
+    """
+    Mirror one job into the job vector index after a commit: active jobs
+    with a query embedding are upserted, anything else is removed. Best
+    effort; rebuild_job_index repairs what a failure leaves behind.
+    """
+    try:
+        store = get_vector_store()
+        if job.is_active and job.query_embedding:
+            store.upsert_jobs([job.id], [list(job.query_embedding)])
+        else:
+            store.delete_jobs([job.id])
+    except Exception as e:
+        logger.warning(f"Job index update failed for job {job.id}: {str(e)}")
+
+
+def rebuild_job_index(db: Session) -> int:
+    """Upsert every active job and drop inactive ones from the job index"""
+    store = get_vector_store()
+    ids, job_matrix = active_job_embeddings(db)
+    store.upsert_jobs(ids, job_matrix.tolist())
+    inactive = db.query(Job.id).filter(Job.is_active == False)
+    store.delete_jobs([job_id for (job_id,) in inactive])
+    return len(ids)
+
+
+def latest_embedded_resume(
+    db: Session, candidate_id: int
+) -> tuple[int, list[list[float]]] | None:
+    """
+    The candidate's newest resume that has stored vectors, with those
+    vectors; a newer resume still in the pipeline is skipped
+    """
+    resume_ids = [
+        resume_id
+        for (resume_id,) in db.query(Resume.id)
+        .filter(Resume.candidate_id == candidate_id)
+        .order_by(Resume.id.desc())
+    ]
+    if not resume_ids:
+        return None
+    vectors: dict[int, list[list[float]]] = {}
+    for ids, embeddings in get_vector_store().resume_embeddings(resume_ids):
+        for resume_id, vector in zip(ids, embeddings):
+            vectors.setdefault(int(resume_id), []).append(vector.tolist())
+    return next(
+        (
+            (resume_id, vectors[resume_id])
+            for resume_id in resume_ids
+            if resume_id in vectors
+        ),
+        None,
+    )
+
+
+def matching_jobs(
+    db: Session, candidate_id: int, limit: int
+) -> list[tuple[float, Job]] | None:
+    """
+    Active jobs ranked for a candidate's latest resume, using the resume's
+    stored vectors as the query. None if the candidate has no indexed resume.
+    """
+    latest = latest_embedded_resume(db, candidate_id)
+    if latest is None:
+        return None
+    _, vectors = latest
+
+    hits = get_vector_store().search_jobs(vectors, limit)
+    jobs = {
+        job.id: job
+        for job in db.query(Job).filter(
+            Job.id.in_([job_id for job_id, _ in hits]), Job.is_active == True
+        )
+    }
+    return [(score, jobs[job_id]) for job_id, score in hits if job_id in jobs]
@@ -0,0 +1,58 @@
+import hashlib
+import logging
+
+from app.core.config import settings
+from app.models.job import Job
+from app.services.embeddings import embedding_function
+
+logger = logging.getLogger(__name__)
+
+
+def job_query_text(job: Job) -> str:
+    """The text a job is ranked against: description, requirements, skills"""
+    query_parts = [
+        job.description or "",
+        job.requirements or "",
+        *(job.skills_required or []),
+    ]
+    return " ".join(query_parts).strip()
+
+
+def job_query_hash(query_text: str) -> str:
+    # The model is part of the hash so switching EMBEDDING_MODEL re-embeds
+    return hashlib.sha256(
+        f"{settings.EMBEDDING_MODEL}\0{query_text}".encode("utf-8")
+    ).hexdigest()
+
+
+def ensure_job_embedding(job: Job) -> tuple[list[float] | None, bool]:
+    """
+    Return the job's query embedding, computing it only if the job's query
+    text changed since it was stored. The second value tells the caller
+    whether the job was modified and needs committing.
+    """
+    query_text = job_query_text(job)
+    if not query_text:
+        return None, False
+
+    query_hash = job_query_hash(query_text)
+    if job.query_hash == query_hash and job.query_embedding:
+        return list(job.query_embedding), False
+
+    embedding = [float(x) for x in embedding_function([query_text])[0]]
+    job.query_embedding = embedding
+    job.query_hash = query_hash
+    return embedding, True
+
+
+def refresh_job_embedding(job: Job):
+    """Best effort on create/update; ranking computes it lazily on failure"""
+    try:
+        ensure_job_embedding(job)
+    except Exception as e:
+        logger.warning(f"Job query embedding failed, deferring to ranking: {e}")
+
+
+def job_query_changed(job: Job) -> bool:
+    """Whether the stored embedding was built from different query text"""
+    return job.query_hash != job_query_hash(job_query_text(job))
@@ -0,0 +1,283 @@
+import logging
+from collections.abc import Iterable
+
+import numpy as np
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.job import Job, JobRanking
+from app.models.resume import Candidate, Resume
+from app.services.job_queries import ensure_job_embedding
+from app.services.vector_store import get_vector_store
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def _reduce_by_resume(
+    resume_ids: np.ndarray, scores: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Collapse chunk columns to one column per resume, keeping the best"""
+    order = np.argsort(resume_ids, kind="stable")
+    sorted_ids = resume_ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    return sorted_ids[starts], np.maximum.reduceat(scores[:, order], starts, axis=1)
+
+
+def score_resumes(
+    job_matrix: np.ndarray, batches: Iterable[tuple[np.ndarray, np.ndarray]]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cosine similarity of every job against every stored resume vector, one
+    matrix product per batch. Returns (resume ids, jobs x resumes scores),
+    with each resume scored by its best chunk.
+    """
+    jobs = _normalize(job_matrix)
+    ids, scores = [], []
+    for resume_ids, embeddings in batches:
+        if len(resume_ids):
+            batch_ids, batch_scores = _reduce_by_resume(
+                resume_ids, jobs @ _normalize(embeddings).T
+            )
+            ids.append(batch_ids)
+            scores.append(batch_scores)
+    if not ids:
+        return np.empty(0, dtype=np.int64), np.empty((len(jobs), 0), np.float32)
+    # A resume's chunks can straddle batches
+    return _reduce_by_resume(np.concatenate(ids), np.hstack(scores))
+
+
+def top_resumes(
+    job_matrix: np.ndarray,
+    batches: Iterable[tuple[np.ndarray, np.ndarray]],
+    n: int,
+) -> list[list[tuple[int, float]]]:
+    """
+    Best n (resume id, score) pairs for each job, highest first, without
+    materialising the jobs x resumes matrix: each batch is reduced per resume
+    and merged into a running top n per job, so memory stays at
+    jobs x (n + batch size)
+    """
+    jobs = _normalize(job_matrix)
+    best_ids = np.full((len(jobs), n), -1, dtype=np.int64)
+    best_scores = np.full((len(jobs), n), -np.inf, dtype=np.float32)
+    rows = np.arange(len(jobs))[:, None]
+    for resume_ids, embeddings in batches:
+        if not len(resume_ids) or n == 0:
+            continue
+        batch_ids, scores = _reduce_by_resume(
+            np.asarray(resume_ids, dtype=np.int64),
+            (jobs @ _normalize(embeddings).T).astype(np.float32),
+        )
+        # A resume's chunks can straddle batches: fold its running score into
+        # this batch's column and drop the running copy
+        position = np.minimum(np.searchsorted(batch_ids, best_ids), len(batch_ids) - 1)
+        seen = batch_ids[position] == best_ids
+        if seen.any():
+            seen_rows, seen_columns = np.nonzero(seen)
+            np.maximum.at(
+                scores,
+                (seen_rows, position[seen_rows, seen_columns]),
+                best_scores[seen_rows, seen_columns],
+            )
+            best_scores[seen] = -np.inf
+
+        ids = np.hstack([best_ids, np.broadcast_to(batch_ids, scores.shape)])
+        merged = np.hstack([best_scores, scores])
+        top = np.argpartition(-merged, n - 1, axis=1)[:, :n]
+        best_ids, best_scores = ids[rows, top], merged[rows, top]
+
+    order = np.argsort(-best_scores, axis=1)
+    best_ids = np.take_along_axis(best_ids, order, axis=1)
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    return [
+        [
+            (int(resume_id), float(score))
+            for resume_id, score in zip(row_ids, row_scores)
+            if np.isfinite(score)
+        ]
+        for row_ids, row_scores in zip(best_ids, best_scores)
+    ]
+
+
+def active_job_embeddings(
+    db: Session, job_ids: list[int] | None = None
+) -> tuple[list[int], np.ndarray]:
+    """Query embeddings of active jobs, computing any that are missing"""
+    query = db.query(Job).filter(Job.is_active == True)
+    if job_ids is not None:
+        query = query.filter(Job.id.in_(job_ids))
+
+    ids, vectors, changed_any = [], [], False
+    for job in query.all():
+        try:
+            embedding, changed = ensure_job_embedding(job)
+        except Exception as e:
+            logger.warning(f"Skipping job {job.id} in rankings: {str(e)}")
+            continue
+        if embedding is not None:
+            ids.append(job.id)
+            vectors.append(embedding)
+            changed_any |= changed
+    if changed_any:
+        db.commit()
+    return ids, np.asarray(vectors, dtype=np.float32)
+
+
+def rebuild_job_rankings(db: Session, job_ids: list[int] | None = None) -> int:
+    """Recompute the top JOB_RANKING_SIZE resumes for active jobs from scratch"""
+    ids, job_matrix = active_job_embeddings(db, job_ids)
+    if not ids:
+        return 0
+    rankings = top_resumes(
+        job_matrix, get_vector_store().resume_embeddings(), settings.JOB_RANKING_SIZE
+    )
+
+    db.query(JobRanking).filter(JobRanking.job_id.in_(ids)).delete(
+        synchronize_session=False
+    )
+    db.bulk_insert_mappings(
+        JobRanking,
+        [
+            {"job_id": job_id, "resume_id": resume_id, "score": score}
+            for job_id, ranking in zip(ids, rankings)
+            for resume_id, score in ranking
+        ],
+    )
+    db.commit()
+    return len(ids)
+
+
+def update_rankings_for_resumes(db: Session, resume_ids: list[int]) -> int:
+    """
+    Merge newly indexed resumes into every active job's ranking: a resume
+    enters where it beats the job's current last place, then each affected
+    ranking is trimmed back to JOB_RANKING_SIZE.
+    """
+    ids, job_matrix = active_job_embeddings(db)
+    if not ids or not resume_ids:
+        return 0
+    new_ids, scores = score_resumes(
+        job_matrix, get_vector_store().resume_embeddings(resume_ids)
+    )
+    if not len(new_ids):
+        return 0
+
+    # Current size and last-place score of each job's ranking, one query
+    floors = dict.fromkeys(ids, (0, -np.inf))
+    for job_id, count, lowest in (
+        db.query(JobRanking.job_id, func.count(), func.min(JobRanking.score))
+        .filter(JobRanking.job_id.in_(ids))
+        .group_by(JobRanking.job_id)
+    ):
+        floors[job_id] = (count, lowest)
+    counts = np.array([floors[job_id][0] for job_id in ids])
+    lowest = np.array([floors[job_id][1] for job_id in ids], dtype=np.float32)
+    qualifies = (counts[:, None] < settings.JOB_RANKING_SIZE) | (
+        scores > lowest[:, None]
+    )
+
+    # Re-indexed resumes are rescored from scratch
+    db.query(JobRanking).filter(
+        JobRanking.resume_id.in_([int(i) for i in new_ids])
+    ).delete(synchronize_session=False)
+
+    rows, columns = np.nonzero(qualifies)
+    values = [
+        {
+            "job_id": ids[row],
+            "resume_id": int(new_ids[column]),
+            "score": float(scores[row, column]),
+        }
+        for row, column in zip(rows, columns)
+    ]
+    if values:
+        statement = insert(JobRanking).values(values)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["job_id", "resume_id"],
+                set_={"score": statement.excluded.score},
+            )
+        )
+        _trim(db, sorted({value["job_id"] for value in values}))
+    db.commit()
+    return len(values)
+
+
+def _trim(db: Session, job_ids: list[int]):
+    """Drop rows that fell below JOB_RANKING_SIZE for these jobs"""
+    position = (
+        func.row_number()
+        .over(partition_by=JobRanking.job_id, order_by=JobRanking.score.desc())
+        .label("position")
+    )
+    ranked = (
+        select(JobRanking.job_id, JobRanking.resume_id, position)
+        .where(JobRanking.job_id.in_(job_ids))
+        .subquery()
+    )
+    overflow = select(ranked.c.job_id, ranked.c.resume_id).where(
+        ranked.c.position > settings.JOB_RANKING_SIZE
+    )
+    db.query(JobRanking).filter(
+        tuple_(JobRanking.job_id, JobRanking.resume_id).in_(overflow)
+    ).delete(synchronize_session=False)
+
+
+def invalidate_job_ranking(db: Session, job_id: int):
+    """Forget a job's ranking; the endpoint falls back to a live query"""
+    db.query(JobRanking).filter(JobRanking.job_id == job_id).delete(
+        synchronize_session=False
+    )
+
+
+def ranked_candidates(
+    db: Session, job_id: int, limit: int
+) -> list[tuple[float, Candidate, Resume]]:
+    """Serve a job's precomputed ranking in one indexed read"""
+    rows = (
+        db.query(JobRanking.score, Candidate, Resume)
+        .select_from(JobRanking)
+        .join(Resume, Resume.id == JobRanking.resume_id)
+        .join(Candidate, Candidate.id == Resume.candidate_id)
+        .filter(JobRanking.job_id == job_id)
+        .order_by(JobRanking.score.desc())
+        .limit(limit)
+        .all()
+    )
+    return [(float(score), candidate, resume) for score, candidate, resume in rows]
+
+
+def ranked_candidates_many(
+    db: Session, job_ids: list[int], limit: int
+) -> dict[int, list[tuple[float, Candidate, Resume]]]:
+    """ranked_candidates for several jobs in one query; unranked jobs are absent"""
+    position = (
+        func.row_number()
+        .over(partition_by=JobRanking.job_id, order_by=JobRanking.score.desc())
+        .label("position")
+    )
+    ranked = (
+        select(JobRanking.job_id, JobRanking.resume_id, JobRanking.score, position)
+        .where(JobRanking.job_id.in_(job_ids))
+        .subquery()
+    )
+    rows = (
+        db.query(ranked.c.job_id, ranked.c.score, Candidate, Resume)
+        .select_from(ranked)
+        .join(Resume, Resume.id == ranked.c.resume_id)
+        .join(Candidate, Candidate.id == Resume.candidate_id)
+        .filter(ranked.c.position <= limit)
+        .order_by(ranked.c.job_id, ranked.c.score.desc())
+        .all()
+    )
+    rankings: dict[int, list[tuple[float, Candidate, Resume]]] = {}
+    for job_id, score, candidate, resume in rows:
+        rankings.setdefault(job_id, []).append((float(score), candidate, resume))
+    return rankings
@@ -0,0 +1,59 @@
+class IncrementalJSONObject:
+    """
+    Follows a streamed LLM response character by character and captures the
+    first top-level JSON object, so generation can be stopped the moment it
+    closes instead of waiting for whatever the model writes afterwards.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.complete = False
+        # Top-level key/value pairs whose value has been fully received
+        self.fields_completed = 0
+        self._raw: list[str] = []
+        self._object: list[str] = []
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> bool:
+        """Consume the next piece of the response; returns True once closed"""
+        self._raw.append(chunk)
+        if self.complete:
+            return True
+
+        start = 0 if self.started else chunk.find("{")
+        if start == -1:
+            return False
+
+        for index in range(start, len(chunk)):
+            char = chunk[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self.started = True
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.fields_completed += 1
+                    self.complete = True
+                    self._object.append(chunk[start : index + 1])
+                    return True
+            elif char == "," and self.depth == 1:
+                self.fields_completed += 1
+
+        self._object.append(chunk[start:])
+        return False
+
+    @property
+    def text(self) -> str:
+        """The captured object if it closed, otherwise everything received"""
+        return "".join(self._object) if self.complete else "".join(self._raw)
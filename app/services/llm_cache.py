@@ -0,0 +1,129 @@
+import copy
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionCache:
+    """
+    Two-tier cache for LLM extraction results: an in-process LRU in front of
+    a shared Redis tier with a TTL and a bounded number of entries.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.LLM_CACHE_MAX_ENTRIES,
+        redis_url: str | None = settings.LLM_CACHE_REDIS_URL,
+        ttl: int = settings.LLM_CACHE_TTL,
+        redis_max_entries: int = settings.LLM_CACHE_REDIS_MAX_ENTRIES,
+        namespace: str = "llm:extract",
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.redis_max_entries = redis_max_entries
+        self.namespace = namespace
+        self.index_key = f"{namespace}:index"
+        self.redis = redis.Redis.from_url(redis_url) if redis_url else None
+
+        self._lru: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "errors": 0}
+
+    def make_key(self, model: str, prompt_version: str, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{model}:{prompt_version}:{digest}"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            value = self._lru.get(key)
+            if value is not None:
+                self._lru.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return copy.deepcopy(value)
+
+        value = self._redis_get(key)
+        with self._lock:
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["redis_hits"] += 1
+            self._remember(key, value)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: dict[str, Any]):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, value)
+        self._redis_set(key, value)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._lru)
+        lookups = stats["memory_hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            (stats["memory_hits"] + stats["redis_hits"]) / lookups if lookups else 0.0
+        )
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+
+    def _remember(self, key: str, value: dict[str, Any]):
+        """Insert into the LRU tier; caller must hold the lock"""
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def _redis_get(self, key: str) -> dict[str, Any] | None:
+        if self.redis is None:
+            return None
+        try:
+            raw = self.redis.get(key)
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            self._record_error(e)
+            return None
+
+    def _redis_set(self, key: str, value: dict[str, Any]):
+        if self.redis is None:
+            return
+        try:
+            now = time.time()
+            pipe = self.redis.pipeline()
+            pipe.set(key, json.dumps(value), ex=self.ttl)
+            pipe.zadd(self.index_key, {key: now})
+            # Members scored before now - ttl point at keys Redis already expired
+            pipe.zremrangebyscore(self.index_key, "-inf", now - self.ttl)
+            pipe.zcard(self.index_key)
+            size = pipe.execute()[-1]
+
+            # Evict the oldest entries once the shared tier is over its bound
+            if size > self.redis_max_entries:
+                evicted = self.redis.zpopmin(
+                    self.index_key, size - self.redis_max_entries
+                )
+                if evicted:
+                    self.redis.delete(*(member for member, _ in evicted))
+        except Exception as e:
+            self._record_error(e)
+
+    def _record_error(self, error: Exception):
+        with self._lock:
+            self._stats["errors"] += 1
+        logger.warning(f"LLM cache Redis error: {str(error)}")
+
+
+extraction_cache = ExtractionCache()
@@ -1,74 +1,593 @@
+import asyncio
+import json
 import logging
 import re
+import threading
+import time
+import weakref
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from typing import Any, Dict
 
+import httpx
 import json5
 import ollama
 
 from app.core.config import settings
+from app.schemas.resume import ResumeExtraction
+from app.services.fast_extractor import FastExtractor
+from app.services.json_stream import IncrementalJSONObject
+from app.services.llm_cache import ExtractionCache, extraction_cache
+from app.services.resume_sections import chunk_sections
+from app.services.text_compactor import TextCompactor
 
 logger = logging.getLogger(__name__)
 
 
+def is_transient_error(error: Exception) -> bool:
+    """Transport failures and overloaded servers, which a later retry can fix"""
+    if isinstance(error, (ConnectionError, TimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(error, ollama.ResponseError):
+        return error.status_code >= 500 or error.status_code == 429
+    return False
+
+
+def _chunk_failure(error: Exception) -> dict[str, Any]:
+    logger.error(f"LLM chunk extraction error: {str(error)}")
+    failure = {"error": f"Processing error: {str(error)}"}
+    if is_transient_error(error):
+        # Retrying the task may succeed; bad input or output would not
+        failure["retryable"] = True
+    return failure
+
+
+class ParseStats:
+    """Counts how LLM JSON output was parsed, to track wasted calls"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Counter[str] = Counter()
+
+    def record(self, outcome: str):
+        """outcome is one of: strict, repaired, failed"""
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def record_retry(self):
+        with self._lock:
+            self.counts["retries"] += 1
+
+    def record_truncation(self):
+        """A resume too long for LLM_MAX_CHUNKS was only partly extracted"""
+        with self._lock:
+            self.counts["truncated"] += 1
+
+    def summary(self) -> dict[str, float]:
+        with self._lock:
+            counts = dict(self.counts)
+        parses = sum(counts.get(k, 0) for k in ("strict", "repaired", "failed"))
+        return {
+            **counts,
+            "failure_rate": counts.get("failed", 0) / parses if parses else 0.0,
+            "repair_rate": counts.get("repaired", 0) / parses if parses else 0.0,
+            "retry_rate": counts.get("retries", 0) / parses if parses else 0.0,
+        }
+
+
+@lru_cache(maxsize=64)
+def _output_schema(fields: tuple[str, ...]) -> dict[str, Any]:
+    """JSON schema for the requested subset of ResumeExtraction fields"""
+    schema = ResumeExtraction.model_json_schema()
+    output = {
+        "type": "object",
+        "properties": {field: schema["properties"][field] for field in fields},
+        "required": list(fields),
+    }
+    if "$defs" in schema:
+        output["$defs"] = schema["$defs"]
+    return output
+
+
+class StreamMetrics:
+    """Aggregate timings for streamed extractions (shared across threads)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.early_stops = 0
+        self.budget_stops = 0
+        self.tokens = 0
+        self.total_seconds = 0.0
+        self.first_field_requests = 0
+        self.first_field_seconds = 0.0
+
+    def record(
+        self,
+        tokens: int,
+        first_field: float | None,
+        total: float,
+        scanner: IncrementalJSONObject,
+        done: bool,
+    ):
+        with self._lock:
+            self.requests += 1
+            self.tokens += tokens
+            self.total_seconds += total
+            if first_field is not None:
+                self.first_field_requests += 1
+                self.first_field_seconds += first_field
+            if scanner.complete and not done:
+                self.early_stops += 1
+            elif not scanner.complete and not done:
+                self.budget_stops += 1
+
+    def summary(self) -> dict[str, float]:
+        with self._lock:
+            requests = self.requests or 1
+            return {
+                "requests": self.requests,
+                "early_stops": self.early_stops,
+                "budget_stops": self.budget_stops,
+                "avg_tokens": self.tokens / requests,
+                "avg_seconds": self.total_seconds / requests,
+                "avg_time_to_first_field": (
+                    self.first_field_seconds / self.first_field_requests
+                    if self.first_field_requests
+                    else 0.0
+                ),
+            }
+
+
+class _LoopState:
+    """
+    Async client and per-model semaphores for one event loop. Both are bound
+    to the loop they were created on, so each loop gets its own set.
+    """
+
+    def __init__(self):
+        self.client = ollama.AsyncClient(host=settings.OLLAMA_HOST)
+        self.semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def semaphore(self, model: str) -> asyncio.Semaphore:
+        if model not in self.semaphores:
+            limit = settings.LLM_MAX_IN_FLIGHT_PER_MODEL.get(
+                model, settings.LLM_MAX_IN_FLIGHT
+            )
+            self.semaphores[model] = asyncio.Semaphore(limit)
+        return self.semaphores[model]
+
+
+_loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _loop_state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+    if loop not in _loop_states:
+        _loop_states[loop] = _LoopState()
+    return _loop_states[loop]
+
+
 class LLMParser:
     """
     Handles resume parsing using LLM models via Ollama with robust JSON handling
     """
 
+    # Bump whenever EXTRACTION_PROMPT changes so cached results are not reused
+    PROMPT_VERSION = "2"
+
     EXTRACTION_PROMPT = """Return VALID JSON with these rules:
 - Use double quotes for all strings
 - Escape internal double quotes with \\
 - No trailing commas
 - experience_years must be a number
 Structure:
-{{
-  "name": "Full Name",
-  "email": "email",
-  "phone": "phone",
-  "skills": ["skill1", "skill2"],
-  "experience_years": 2,
-  "education": [{{"degree": "...", "institute": "..."}}]
-}}
+{structure}
 
 Resume content: {text}"""
 
-    def __init__(self):
+    # Fields the prompt can ask for, with the example value shown to the model
+    FIELD_EXAMPLES = {
+        "name": '"Full Name"',
+        "email": '"email"',
+        "phone": '"phone"',
+        "location": '"City, Country"',
+        "skills": '["skill1", "skill2"]',
+        "experience_years": "2",
+        "education": '[{"degree": "...", "institute": "..."}]',
+    }
+
+    def __init__(
+        self,
+        cache: ExtractionCache | None = extraction_cache,
+        client: ollama.Client | None = None,
+        fast_extractor: FastExtractor | None = None,
+    ):
         self.extraction_model = settings.EXTRACTION_MODEL
         self.embedding_model = settings.EMBEDDING_MODEL
+        self.cache = cache
+        # One client per parser keeps the HTTP connection to Ollama alive
+        self.client = client or ollama.Client(host=settings.OLLAMA_HOST)
+        if fast_extractor is None and settings.FAST_PATH_ENABLED:
+            fast_extractor = FastExtractor()
+        self.fast_extractor = fast_extractor
+        # How each extraction was answered: fast_path, hybrid, llm or degraded
+        self.mode_counts: Counter[str] = Counter()
+        self.stream_metrics = StreamMetrics()
+        self.parse_stats = ParseStats()
+        self.compactor = TextCompactor() if settings.PROMPT_COMPACTION else None
+
+    def warm_up(self, timeout: float | None = None) -> bool:
+        """Load the extraction model into memory ahead of the first request"""
+        client = self.client
+        if timeout is not None:
+            client = ollama.Client(host=settings.OLLAMA_HOST, timeout=timeout)
+        try:
+            client.generate(
+                model=self.extraction_model,
+                prompt="",
+                keep_alive=settings.OLLAMA_KEEP_ALIVE,
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"LLM warm-up failed: {str(e)}")
+            return False
 
     def extract_entities(self, text: str) -> dict[str, Any]:
         """Extract structured data from resume text with error resilience"""
+        fast: dict[str, Any] = {}
         try:
             if not text.strip():
                 return {"error": "Empty resume content"}
 
-            # Clean input text
-            clean_text = self._sanitize_input(text[:4000])
+            # Strip extraction artifacts before anything reads the text
+            text = self._compact(text)
 
-            response = ollama.chat(
-                model=self.extraction_model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": self.EXTRACTION_PROMPT.format(text=clean_text),
-                    }
-                ],
-                options={"timeout": 300},
-            )
+            # Deterministic fields first; the LLM is only asked for the rest
+            fast, fields = self._plan(text)
+            if not fields:
+                return self._merge(fast, {})
+            if settings.LLM_DEGRADED_MODE:
+                return self._degraded(fast, "LLM extraction disabled")
 
-            parsed_data = self._parse_llm_response(response["message"]["content"])
+            # Long resumes are split into sections and extracted concurrently,
+            # in waves of at most LLM_MAX_IN_FLIGHT chunks
+            chunks, truncated = self._chunks(self._sanitize_input(text))
+            if len(chunks) == 1:
+                llm_data = self._extract_chunk(chunks[0], fields)
+            else:
+                workers = min(len(chunks), self._in_flight_limit())
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    llm_data = self._reduce_chunks(
+                        list(pool.map(self._extract_chunk, chunks, repeat(fields)))
+                    )
+            if "error" in llm_data:
+                return self._degraded(fast, llm_data["error"], llm_data)
+            return self._mark_truncated(self._merge(fast, llm_data), truncated)
 
-            if "education" in parsed_data:
-                if isinstance(parsed_data["education"], list):
-                    parsed_data["education"] = [
-                        e if isinstance(e, dict) else {"degree": str(e)}
-                        for e in parsed_data["education"]
-                    ]
-            return parsed_data
+        except Exception as e:
+            logger.error(f"LLM Parser error: {str(e)}", exc_info=True)
+            return self._degraded(fast, f"Processing error: {str(e)}")
+
+    async def aextract_entities(self, text: str) -> dict[str, Any]:
+        """
+        Async variant of extract_entities. Requests wait on a per-model
+        semaphore so at most the configured number are in flight at once.
+        """
+        fast: dict[str, Any] = {}
+        try:
+            if not text.strip():
+                return {"error": "Empty resume content"}
+
+            text = self._compact(text)
+            fast, fields = self._plan(text)
+            if not fields:
+                return self._merge(fast, {})
+            if settings.LLM_DEGRADED_MODE:
+                return self._degraded(fast, "LLM extraction disabled")
+
+            chunks, truncated = self._chunks(self._sanitize_input(text))
+            results = await asyncio.gather(
+                *(self._aextract_chunk(chunk, fields) for chunk in chunks)
+            )
+            llm_data = results[0] if len(results) == 1 else self._reduce_chunks(results)
+            if "error" in llm_data:
+                return self._degraded(fast, llm_data["error"], llm_data)
+            return self._mark_truncated(self._merge(fast, llm_data), truncated)
 
         except Exception as e:
             logger.error(f"LLM Parser error: {str(e)}", exc_info=True)
-            return {"error": f"Processing error: {str(e)}"}
+            return self._degraded(fast, f"Processing error: {str(e)}")
+
+    def _extract_chunk(self, clean_text: str, fields: list[str]) -> dict[str, Any]:
+        """One cached LLM extraction over a single chunk of resume text"""
+        try:
+            cache_key, llm_data = self._cache_lookup(clean_text, fields)
+            if llm_data is not None:
+                return llm_data
+            request = self._chat_request(clean_text, fields)
+            for attempt in range(settings.LLM_PARSE_RETRIES + 1):
+                if settings.LLM_STREAMING:
+                    content = self._stream_chat(request)
+                else:
+                    content = self.client.chat(**request)["message"]["content"]
+                llm_data = self._finalize(content, cache_key)
+                if "error" not in llm_data or attempt == settings.LLM_PARSE_RETRIES:
+                    return llm_data
+                self.parse_stats.record_retry()
+        except Exception as e:
+            return _chunk_failure(e)
+
+    async def _aextract_chunk(
+        self, clean_text: str, fields: list[str]
+    ) -> dict[str, Any]:
+        try:
+            cache_key, llm_data = self._cache_lookup(clean_text, fields)
+            if llm_data is not None:
+                return llm_data
+            request = self._chat_request(clean_text, fields)
+            state = _loop_state()
+            for attempt in range(settings.LLM_PARSE_RETRIES + 1):
+                async with state.semaphore(self.extraction_model):
+                    if settings.LLM_STREAMING:
+                        content = await self._astream_chat(state.client, request)
+                    else:
+                        response = await state.client.chat(**request)
+                        content = response["message"]["content"]
+                llm_data = self._finalize(content, cache_key)
+                if "error" not in llm_data or attempt == settings.LLM_PARSE_RETRIES:
+                    return llm_data
+                self.parse_stats.record_retry()
+        except Exception as e:
+            return _chunk_failure(e)
+
+    def _stream_chat(self, request: dict[str, Any]) -> str:
+        """
+        Stream the response and stop as soon as the top-level JSON object
+        closes or the token budget is spent
+        """
+        started = time.perf_counter()
+        scanner = IncrementalJSONObject()
+        tokens, first_field, done = 0, None, False
+        stream = self.client.chat(**request, stream=True)
+        try:
+            for part in stream:
+                tokens += 1
+                done = part.get("done", False)
+                scanner.feed(part["message"]["content"])
+                if first_field is None and scanner.fields_completed:
+                    first_field = time.perf_counter() - started
+                if scanner.complete or tokens >= settings.LLM_MAX_TOKENS:
+                    break
+        finally:
+            # Closing the stream drops the connection, which ends generation
+            stream.close()
+        self.stream_metrics.record(
+            tokens, first_field, time.perf_counter() - started, scanner, done
+        )
+        return scanner.text
+
+    async def _astream_chat(
+        self, client: ollama.AsyncClient, request: dict[str, Any]
+    ) -> str:
+        started = time.perf_counter()
+        scanner = IncrementalJSONObject()
+        tokens, first_field, done = 0, None, False
+        stream = await client.chat(**request, stream=True)
+        try:
+            async for part in stream:
+                tokens += 1
+                done = part.get("done", False)
+                scanner.feed(part["message"]["content"])
+                if first_field is None and scanner.fields_completed:
+                    first_field = time.perf_counter() - started
+                if scanner.complete or tokens >= settings.LLM_MAX_TOKENS:
+                    break
+        finally:
+            await stream.aclose()
+        self.stream_metrics.record(
+            tokens, first_field, time.perf_counter() - started, scanner, done
+        )
+        return scanner.text
+
+    def _in_flight_limit(self) -> int:
+        return settings.LLM_MAX_IN_FLIGHT_PER_MODEL.get(
+            self.extraction_model, settings.LLM_MAX_IN_FLIGHT
+        )
+
+    def _chunks(self, clean_text: str) -> tuple[list[str], bool]:
+        """The chunks to extract, and whether text past the limit was dropped"""
+        if not settings.LLM_CHUNKED_EXTRACTION:
+            chunks = [clean_text[: settings.LLM_CHUNK_CHARS]]
+            truncated = len(clean_text) > settings.LLM_CHUNK_CHARS
+        else:
+            chunks = chunk_sections(clean_text, settings.LLM_CHUNK_CHARS)
+            truncated = len(chunks) > settings.LLM_MAX_CHUNKS
+            chunks = chunks[: settings.LLM_MAX_CHUNKS] or [clean_text]
+        if truncated:
+            logger.warning(
+                f"Resume of {len(clean_text)} characters truncated to "
+                f"{sum(len(chunk) for chunk in chunks)} for extraction"
+            )
+            self.parse_stats.record_truncation()
+        return chunks, truncated
+
+    def _mark_truncated(
+        self, result: dict[str, Any], truncated: bool
+    ) -> dict[str, Any]:
+        """Flag results extracted from only part of the resume"""
+        if truncated and "error" not in result:
+            result["truncated"] = True
+        return result
+
+    def _reduce_chunks(self, results: list[dict[str, Any]]) -> dict[str, Any]:
+        """
+        Merge per-chunk extractions in document order: scalar fields take the
+        first real value, skills and education are unioned, and experience
+        takes the largest figure since each chunk may restate the total.
+        """
+        succeeded = [r for r in results if "error" not in r]
+        if not succeeded:
+            return next((r for r in results if r.get("retryable")), results[0])
+
+        merged: dict[str, Any] = {}
+        for field in ("name", "email", "phone", "location"):
+            placeholder = self.FIELD_EXAMPLES[field].strip('"')
+            for result in succeeded:
+                value = result.get(field)
+                if isinstance(value, str) and value.strip() and value != placeholder:
+                    merged[field] = value.strip()
+                    break
+
+        skills: dict[str, str] = {}
+        education: dict[tuple[str, str], dict] = {}
+        for result in succeeded:
+            for skill in result.get("skills") or []:
+                if isinstance(skill, str) and skill.strip():
+                    skills.setdefault(skill.strip().lower(), skill.strip())
+            for entry in result.get("education") or []:
+                key = (
+                    str(entry.get("degree", "")).strip().lower(),
+                    str(entry.get("institute", "")).strip().lower(),
+                )
+                if any(key):
+                    education.setdefault(key, entry)
+
+        merged["skills"] = list(skills.values())
+        merged["education"] = list(education.values())
+        merged["experience_years"] = max(
+            r.get("experience_years", 0) for r in succeeded
+        )
+        return merged
+
+    async def aextract_many(self, texts: list[str]) -> list[dict[str, Any]]:
+        """Run extract_entities concurrently over many resumes, preserving order"""
+        return await asyncio.gather(*(self.aextract_entities(t) for t in texts))
+
+    def _compact(self, text: str) -> str:
+        if self.compactor is None:
+            return text
+        result = self.compactor.compact(text)
+        logger.debug(
+            f"Prompt compaction: {result.tokens_before} -> {result.tokens_after} "
+            f"tokens ({result.saved_ratio:.0%} saved)"
+        )
+        return result.text
+
+    def _plan(self, text: str) -> tuple[dict[str, Any], list[str]]:
+        """Run the fast path and list the fields still needed from the LLM"""
+        if self.fast_extractor is None:
+            return {}, list(self.FIELD_EXAMPLES)
+
+        fast = self.fast_extractor.extract(text)
+        fields = [field for field in self.FIELD_EXAMPLES if field not in fast]
+        few_skills = len(fast.get("skills", [])) < settings.FAST_PATH_MIN_SKILLS
+        if few_skills and "skills" not in fields:
+            # Too few taxonomy hits to trust; let the LLM add to them
+            fields.append("skills")
+        # Phone and location are optional, so alone they are not worth an LLM call
+        if set(fields) <= {"phone", "location"}:
+            return fast, []
+        return fast, fields
+
+    def _merge(
+        self, fast: dict[str, Any], llm_data: dict[str, Any], mode: str | None = None
+    ) -> dict[str, Any]:
+        """Combine LLM output with fast-path fields, which take precedence"""
+        merged = {**llm_data, **fast}
+        seen = {skill.lower() for skill in fast.get("skills", [])}
+        merged["skills"] = list(fast.get("skills", [])) + [
+            skill
+            for skill in llm_data.get("skills") or []
+            if isinstance(skill, str) and skill.lower() not in seen
+        ]
+        merged.setdefault("experience_years", 0)
+        merged.setdefault("education", [])
+
+        # Validate required fields
+        if not merged.get("name") or not merged.get("email"):
+            return {"error": "Missing required fields (name/email)"}
+
+        if mode is None and not llm_data:
+            mode = "fast_path"
+        elif mode is None:
+            mode = "hybrid" if fast else "llm"
+        merged["extraction_mode"] = mode
+        self.mode_counts[merged["extraction_mode"]] += 1
+        return merged
+
+    def _degraded(
+        self, fast: dict[str, Any], error: str, details: dict | None = None
+    ) -> dict[str, Any]:
+        """Fall back to fast-path fields when the LLM is unavailable or fails"""
+        if fast.get("name") and fast.get("email"):
+            logger.warning(f"Using fast-path extraction only: {error}")
+            return self._merge(fast, {}, mode="degraded")
+        return {**(details or {}), "error": error}
+
+    def _cache_lookup(
+        self, clean_text: str, fields: list[str]
+    ) -> tuple[str | None, dict | None]:
+        if self.cache is None:
+            return None, None
+        cache_key = self.cache.make_key(
+            self.extraction_model,
+            f"{self.PROMPT_VERSION}:{'+'.join(fields)}",
+            clean_text,
+        )
+        return cache_key, self.cache.get(cache_key)
+
+    def _build_prompt(self, clean_text: str, fields: list[str]) -> str:
+        structure = ",\n".join(
+            f'  "{field}": {self.FIELD_EXAMPLES[field]}' for field in fields
+        )
+        return self.EXTRACTION_PROMPT.format(
+            structure=f"{{\n{structure}\n}}", text=clean_text
+        )
+
+    def _chat_request(self, clean_text: str, fields: list[str]) -> dict[str, Any]:
+        return {
+            "model": self.extraction_model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": self._build_prompt(clean_text, fields),
+                }
+            ],
+            "options": {"timeout": 300, "num_predict": settings.LLM_MAX_TOKENS},
+            "keep_alive": settings.OLLAMA_KEEP_ALIVE,
+            # Constrain decoding to the requested subset of ResumeExtraction
+            "format": (
+                _output_schema(tuple(fields))
+                if settings.LLM_STRUCTURED_OUTPUT
+                else None
+            ),
+        }
+
+    def _finalize(self, content: str, cache_key: str | None) -> dict[str, Any]:
+        # Strict parse first; the regex repair path is only a fallback
+        parsed_data = self._parse_structured(content)
+        if parsed_data is not None:
+            self.parse_stats.record("strict")
+        else:
+            parsed_data = self._parse_llm_response(content)
+            self.parse_stats.record("failed" if "error" in parsed_data else "repaired")
+
+        if "education" in parsed_data:
+            if isinstance(parsed_data["education"], list):
+                parsed_data["education"] = [
+                    e if isinstance(e, dict) else {"degree": str(e)}
+                    for e in parsed_data["education"]
+                ]
+
+        # Only successful extractions are worth reusing
+        if cache_key is not None and "error" not in parsed_data:
+            self.cache.set(cache_key, parsed_data)
+        return parsed_data
 
     def _sanitize_input(self, text: str) -> str:
         """Clean problematic characters from input text"""
@@ -81,6 +600,23 @@ Resume content: {text}"""
             .replace("\t", " ")  # Replace tabs
         )
 
+    def _parse_structured(self, content: str) -> dict[str, Any] | None:
+        """Strictly parse schema-constrained output; None if it does not conform"""
+        try:
+            data = json.loads(content)
+            if not isinstance(data, dict):
+                return None
+            extraction = ResumeExtraction.model_validate(data)
+        except ValueError:
+            return None
+
+        parsed = extraction.model_dump(
+            include=set(data) & set(ResumeExtraction.model_fields)
+        )
+        if "experience_years" in parsed:
+            parsed["experience_years"] = max(0, parsed["experience_years"])
+        return parsed
+
     def _parse_llm_response(self, raw_response: str) -> dict[str, Any]:
         """Parse and validate LLM JSON response"""
         json_str = ""
@@ -116,10 +652,6 @@ Resume content: {text}"""
             else:
                 parsed["experience_years"] = 0
 
-            # Validate required fields
-            if not parsed.get("name") or not parsed.get("email"):
-                return {"error": "Missing required fields (name/email)"}
-
             return parsed
 
         except ValueError as e:
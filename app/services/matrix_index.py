@@ -0,0 +1,293 @@
+import fcntl
+import logging
+import os
+import shutil
+import threading
+import time
+from collections.abc import Iterable
+from contextlib import contextmanager
+from typing import Any
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.chunk_scores import aggregate_chunk_scores
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return (matrix / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def quantize(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantization: vectors ~= quantized * scales"""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales = np.maximum(scales, 1e-12).astype(np.float32)
+    quantized = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return quantized, scales
+
+
+class MatrixIndex:
+    """
+    Brute-force cosine search over an int8-quantized copy of every resume
+    vector, with an exact float32 rerank of the best candidates.
+
+    Rows live in append-only files memory-mapped by every worker process,
+    so the OS page cache holds a single shared copy. A resume indexed again
+    gets rows with a newer generation, which shadow the old ones. Rebuilds
+    write a new directory and switch CURRENT, so readers never see
+    truncated files.
+    """
+
+    # name -> (dtype, values per row)
+    COLUMNS = {
+        "quantized": (np.int8, None),
+        "scales": (np.float32, 1),
+        "vectors": (np.float32, None),
+        "resume_ids": (np.int64, 1),
+        "generations": (np.int64, 1),
+    }
+
+    def __init__(
+        self,
+        path: str = settings.MATRIX_INDEX_PATH,
+        dimensions: int = settings.EMBEDDING_DIMENSIONS,
+        rerank_factor: int = settings.MATRIX_RERANK_FACTOR,
+        block_rows: int = settings.MATRIX_BLOCK_ROWS,
+        refresh_interval: float = settings.MATRIX_REFRESH_INTERVAL,
+    ):
+        self.path = path
+        self.dimensions = dimensions
+        self.rerank_factor = rerank_factor
+        self.block_rows = block_rows
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._generation_dir: str | None = None
+        self._rows = 0
+        self._arrays: dict[str, np.ndarray] = {}
+        self._alive = np.empty(0, dtype=bool)
+        self._checked_at = 0.0
+
+    def add(self, resume_ids: list[int], embeddings: np.ndarray):
+        """Append one row per vector; resume_ids may repeat for chunks"""
+        self.add_batches([(np.asarray(resume_ids), embeddings)])
+
+    def add_batches(self, batches: Iterable[tuple[np.ndarray, np.ndarray]]):
+        """
+        Append batches under one generation, so a resume whose chunks span
+        batches is not shadowed by its own rows
+        """
+        batches = [(ids, vectors) for ids, vectors in batches if len(ids)]
+        if not batches:
+            return
+        with self._write_lock():
+            directory = self._current_dir(create=True)
+            generation = self._next_generation(directory)
+            for resume_ids, embeddings in batches:
+                vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+                self._append(directory, resume_ids, vectors, generation)
+        self.refresh(force=True)
+
+    def rebuild(self, batches: Iterable[tuple[np.ndarray, np.ndarray]]) -> int:
+        """Replace the whole index, e.g. from VectorStore.resume_embeddings()"""
+        rows = 0
+        with self._write_lock():
+            old = self._current_dir()
+            directory = os.path.join(self.path, f"gen-{time.time_ns()}")
+            os.makedirs(directory)
+            for resume_ids, embeddings in batches:
+                self._append(
+                    directory,
+                    resume_ids,
+                    _normalize(np.asarray(embeddings, dtype=np.float32)),
+                    generation=0,
+                )
+                rows += len(resume_ids)
+            self._set_current(directory)
+            # Mapped pages of unlinked files stay valid for existing readers
+            if old:
+                shutil.rmtree(old, ignore_errors=True)
+        self.refresh(force=True)
+        logger.info(f"Rebuilt matrix index with {rows} rows")
+        return rows
+
+    def search(
+        self, query_embedding: list[float], limit: int = 10
+    ) -> list[dict[str, Any]]:
+        """Top resumes as {resume_id, score}, chunk scores aggregated per resume"""
+        self.refresh()
+        with self._lock:
+            rows, arrays, alive = self._rows, self._arrays, self._alive
+        if not rows or not alive.any():
+            return []
+
+        query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+        approximate = np.empty(rows, dtype=np.float32)
+        quantized, scales = arrays["quantized"], arrays["scales"]
+        # Dequantize block by block so memory stays bounded
+        for start in range(0, rows, self.block_rows):
+            stop = min(start + self.block_rows, rows)
+            block = quantized[start:stop].astype(np.float32) @ query
+            approximate[start:stop] = block * scales[start:stop]
+        approximate[~alive] = -np.inf
+
+        depth = limit * self.rerank_factor
+        if settings.INDEX_SECTION_CHUNKS:
+            depth *= settings.CHUNK_SEARCH_OVERFETCH
+        depth = min(depth, int(alive.sum()))
+        candidates = np.argpartition(-approximate, depth - 1)[:depth]
+        candidates = np.sort(candidates)  # Sequential reads from the mmap
+
+        # Exact rerank of the shortlist against the float vectors
+        exact = arrays["vectors"][candidates] @ query
+        resume_ids, scores, _ = aggregate_chunk_scores(
+            arrays["resume_ids"][candidates],
+            exact,
+            settings.CHUNK_SCORE_AGGREGATION,
+            settings.CHUNK_SCORE_TOP_K,
+        )
+        return [
+            {"resume_id": str(resume_id), "score": float(score)}
+            for resume_id, score in zip(resume_ids[:limit], scores[:limit])
+        ]
+
+    def vectors(self) -> tuple[np.ndarray, np.ndarray]:
+        """Live (resume id, normalized float vector) rows, for benchmarks"""
+        self.refresh(force=True)
+        with self._lock:
+            if not self._rows:
+                return np.empty(0, np.int64), np.empty((0, self.dimensions))
+            alive = self._alive
+            return (
+                self._arrays["resume_ids"][alive],
+                self._arrays["vectors"][alive],
+            )
+
+    def refresh(self, force: bool = False):
+        """Map rows appended (or a rebuild switched in) since the last check"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return
+        self._checked_at = now
+        directory = self._current_dir()
+        if directory is None or not os.path.isdir(directory):
+            return
+        rows = self._row_count(directory)
+        if directory == self._generation_dir and rows == self._rows:
+            return
+
+        try:
+            arrays = {name: self._map(directory, name, rows) for name in self.COLUMNS}
+        except FileNotFoundError:
+            # Replaced by a rebuild while mapping; the next refresh retries
+            self._checked_at = 0.0
+            return
+        alive = self._alive_rows(arrays["resume_ids"], arrays["generations"])
+        with self._lock:
+            self._generation_dir, self._rows = directory, rows
+            self._arrays, self._alive = arrays, alive
+
+    def _alive_rows(self, resume_ids: np.ndarray, generations: np.ndarray):
+        """A row is live if it carries its resume's newest generation"""
+        if not len(resume_ids):
+            return np.empty(0, dtype=bool)
+        order = np.lexsort((generations, resume_ids))
+        sorted_ids = resume_ids[order]
+        last = np.r_[sorted_ids[1:] != sorted_ids[:-1], True]
+        newest = generations[order][last]
+        position = np.searchsorted(sorted_ids[last], resume_ids)
+        return generations == newest[position]
+
+    def _append(self, directory: str, resume_ids, vectors: np.ndarray, generation: int):
+        self._truncate_to_committed(directory)
+        quantized, scales = quantize(vectors)
+        columns = {
+            "quantized": quantized,
+            "scales": scales,
+            "vectors": vectors,
+            "resume_ids": np.asarray(resume_ids, dtype=np.int64),
+            "generations": np.full(len(vectors), generation, dtype=np.int64),
+        }
+        # resume_ids/generations last: the row count is the shortest file
+        for name in self.COLUMNS:
+            with open(os.path.join(directory, f"{name}.bin"), "ab") as f:
+                f.write(np.ascontiguousarray(columns[name]).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _truncate_to_committed(self, directory: str):
+        """
+        Drop rows an interrupted append left in only some column files, so
+        the next append lines up again; caller must hold the write lock
+        """
+        rows = self._row_count(directory)
+        for name in self.COLUMNS:
+            file_path = os.path.join(directory, f"{name}.bin")
+            committed = rows * self._row_bytes(name)
+            if os.path.exists(file_path) and os.path.getsize(file_path) > committed:
+                logger.warning(f"Truncating uncommitted rows from {file_path}")
+                os.truncate(file_path, committed)
+
+    def _next_generation(self, directory: str) -> int:
+        rows = self._row_count(directory)
+        if not rows:
+            return 1
+        generations = self._map(directory, "generations", rows)
+        return int(generations[-1]) + 1
+
+    def _row_bytes(self, name: str) -> int:
+        dtype, width = self.COLUMNS[name]
+        return np.dtype(dtype).itemsize * (width or self.dimensions)
+
+    def _row_count(self, directory: str) -> int:
+        counts = []
+        for name in self.COLUMNS:
+            file_path = os.path.join(directory, f"{name}.bin")
+            size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+            counts.append(size // self._row_bytes(name))
+        return min(counts)
+
+    def _map(self, directory: str, name: str, rows: int) -> np.ndarray:
+        dtype, width = self.COLUMNS[name]
+        shape = (rows,) if width == 1 else (rows, self.dimensions)
+        if not rows:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(
+            os.path.join(directory, f"{name}.bin"), dtype=dtype, mode="r", shape=shape
+        )
+
+    def _current_dir(self, create: bool = False) -> str | None:
+        try:
+            with open(os.path.join(self.path, CURRENT_FILE)) as f:
+                return os.path.join(self.path, f.read().strip())
+        except FileNotFoundError:
+            if not create:
+                return None
+        directory = os.path.join(self.path, f"gen-{time.time_ns()}")
+        os.makedirs(directory)
+        self._set_current(directory)
+        return directory
+
+    def _set_current(self, directory: str):
+        tmp_path = os.path.join(self.path, f"{CURRENT_FILE}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(os.path.basename(directory))
+        os.replace(tmp_path, os.path.join(self.path, CURRENT_FILE))
+
+    @contextmanager
+    def _write_lock(self):
+        """Serialises appends and rebuilds across processes"""
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+matrix_index = MatrixIndex()
@@ -1,43 +1,134 @@
-import os
-import tempfile
-from typing import Optional
+import io
+import logging
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO
 
 import docx2txt
 import pypdf
 
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Separates PDF pages in extracted text so per-page boilerplate can be found
+PAGE_BREAK = "\f"
+
+# One lazily created pool per size, shared by parsers in this process
+_page_pools: dict[int, ProcessPoolExecutor] = {}
+
+
+def _get_page_pool(workers: int) -> ProcessPoolExecutor:
+    if workers < 1:
+        raise ValueError(f"Page pool needs at least one worker, got {workers}")
+    if workers not in _page_pools:
+        _page_pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _page_pools[workers]
+
+
+def _reset_page_pool(workers: int):
+    """Drop a broken pool so the next parallel extraction starts a new one"""
+    pool = _page_pools.pop(workers, None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_page_range(data: bytes, start: int, stop: int) -> list[str]:
+    """Process pool worker: extract text for pages [start, stop)"""
+    reader = pypdf.PdfReader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
+
 
 class ResumeParser:
-    def extract_text_from_bytes(self, file_bytes: bytes, extension: str) -> str:
+    """
+    Extracts plain text from resume files held in memory. Nothing is written
+    to disk; large PDFs can optionally be split across a process pool.
+    """
+
+    def __init__(
+        self,
+        parallel_workers: int | None = None,
+        parallel_min_pages: int | None = None,
+    ):
+        self.parallel_workers = (
+            settings.PDF_PARALLEL_WORKERS
+            if parallel_workers is None
+            else parallel_workers
+        )
+        self.parallel_min_pages = (
+            settings.PDF_PARALLEL_MIN_PAGES
+            if parallel_min_pages is None
+            else parallel_min_pages
+        )
+
+    def extract_text_from_bytes(
+        self, file_bytes: bytes | memoryview, extension: str
+    ) -> str:
         """Extract text from file bytes based on file extension"""
-        with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as temp_file:
-            temp_file.write(file_bytes)
-            temp_file_path = temp_file.name
+        return self.extract_text_from_stream(io.BytesIO(file_bytes), extension)
+
+    def extract_text_from_stream(self, stream: BinaryIO, extension: str) -> str:
+        """Extract text from a seekable stream (e.g. a GridFS download stream)"""
+        if extension == ".pdf":
+            return self.extract_text_from_pdf(stream)
+        elif extension == ".docx":
+            return self.extract_text_from_docx(stream)
+        else:
+            raise ValueError("Unsupported file format")
 
+    def iter_pdf_pages(self, source: str | BinaryIO) -> Iterator[str]:
+        """Yield the text of each PDF page in order, one page at a time"""
         try:
-            if extension == ".pdf":
-                return self.extract_text_from_pdf(temp_file_path)
-            elif extension == ".docx":
-                return self.extract_text_from_docx(temp_file_path)
-            else:
-                raise ValueError("Unsupported file format")
-        finally:
-            os.remove(temp_file_path)
+            reader = pypdf.PdfReader(source)
+            for page in reader.pages:
+                yield page.extract_text()
+        except Exception as e:
+            raise RuntimeError(f"Error extracting PDF text: {str(e)}")
 
-    def extract_text_from_pdf(self, file_path: str) -> str:
-        """Extract text from PDF files"""
-        text = ""
+    def extract_text_from_pdf(self, source: str | BinaryIO) -> str:
+        """Extract text from a PDF path or stream"""
         try:
-            with open(file_path, "rb") as file:
-                pdf_reader = pypdf.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            return text
+            reader = pypdf.PdfReader(source)
+            page_count = len(reader.pages)
+            if self.parallel_workers > 1 and page_count >= self.parallel_min_pages:
+                pages = self._extract_pages_parallel(reader, page_count)
+            else:
+                pages = (page.extract_text() for page in reader.pages)
+            return PAGE_BREAK.join(f"{page}\n" for page in pages)
         except Exception as e:
             raise RuntimeError(f"Error extracting PDF text: {str(e)}")
 
-    def extract_text_from_docx(self, file_path: str) -> str:
-        """Extract text from DOCX files"""
+    def extract_text_from_docx(self, source: str | BinaryIO) -> str:
+        """Extract text from a DOCX path or stream"""
         try:
-            return docx2txt.process(file_path)
+            return docx2txt.process(source)
         except Exception as e:
             raise RuntimeError(f"Error extracting DOCX text: {str(e)}")
+
+    def _extract_pages_parallel(
+        self, reader: pypdf.PdfReader, page_count: int
+    ) -> list[str]:
+        """Split the page range into one contiguous slice per worker"""
+        stream = reader.stream
+        stream.seek(0)
+        data = stream.read()
+
+        workers = min(self.parallel_workers, page_count)
+        step = -(-page_count // workers)
+        ranges = [(i, min(i + step, page_count)) for i in range(0, page_count, step)]
+        try:
+            pool = _get_page_pool(self.parallel_workers)
+            futures = [
+                pool.submit(_extract_page_range, data, start, stop)
+                for start, stop in ranges
+            ]
+            return [text for future in futures for text in future.result()]
+        except BrokenProcessPool as e:
+            _reset_page_pool(self.parallel_workers)
+            logger.warning(f"PDF page pool broke, extracting sequentially: {str(e)}")
+            return [page.extract_text() for page in reader.pages]
+        except Exception as e:
+            # Daemonic worker processes (e.g. Celery prefork) cannot fork a pool
+            logger.warning(f"Parallel PDF extraction unavailable: {str(e)}")
+            return [page.extract_text() for page in reader.pages]
@@ -0,0 +1,307 @@
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ReturnDocument
+
+from app.core.config import settings
+from app.services.matrix_index import matrix_index
+from app.services.sparse_index import sparse_index
+from app.services.vector_store import get_vector_store
+
+logger = logging.getLogger(__name__)
+
+PENDING_PROJECTION = {
+    "extracted_text": 1,
+    "parsed_data": 1,
+    "resume_id": 1,
+    "candidate_id": 1,
+}
+CLAIM_FIELDS = {"index_claim": "", "index_claimed_at": ""}
+
+
+class ResumeIndexer:
+    """
+    Buffers resumes waiting for the vector store and writes them with one
+    upsert per batch. The Mongo document is flagged `index_pending` before it
+    enters the buffer, so anything lost with a worker is picked up by the
+    next flush. Every flush claims the documents it writes, so concurrent
+    flushes never write (or fail) the same resume.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.INDEX_BATCH_SIZE,
+        flush_interval: float = settings.INDEX_FLUSH_INTERVAL,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: dict[str, dict] = {}
+        self._oldest: float | None = None
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+        # Called with the resume ids of every batch written
+        self.listeners: list[Callable[[list[int]], None]] = []
+
+    def enqueue(self, mongo_collection, doc: dict) -> bool:
+        """Queue one resume; returns True if this call flushed the buffer"""
+        mongo_collection.update_one(
+            {"_id": doc["_id"]},
+            {
+                "$set": {
+                    "index_pending": True,
+                    "index_queued_at": datetime.now(timezone.utc),
+                }
+            },
+        )
+        with self._lock:
+            self._buffer[str(doc["_id"])] = doc
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+                self._schedule_flush(mongo_collection)
+            due = (
+                len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._oldest >= self.flush_interval
+            )
+        if due:
+            self.flush(mongo_collection)
+        return due
+
+    def flush(self, mongo_collection) -> int:
+        """Upsert everything buffered in this process that is still unclaimed"""
+        with self._lock:
+            buffered = dict(self._buffer)
+            self._buffer.clear()
+            self._oldest = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not buffered:
+            return 0
+
+        token, claimed = self._claim(
+            mongo_collection,
+            {"_id": {"$in": [doc["_id"] for doc in buffered.values()]}},
+            len(buffered),
+            {"_id": 1},
+        )
+        docs = [buffered[str(doc["_id"])] for doc in claimed]
+        try:
+            for start in range(0, len(docs), self.batch_size):
+                self._write_batch(
+                    mongo_collection, docs[start : start + self.batch_size]
+                )
+        except Exception:
+            # Still flagged in Mongo; released so flush_pending retries them
+            mongo_collection.update_many(
+                {"_id": {"$in": [doc["_id"] for doc in docs]}, "index_claim": token},
+                {"$unset": CLAIM_FIELDS},
+            )
+            logger.warning(f"Index flush failed, {len(docs)} resumes left pending")
+            raise
+        return len(docs)
+
+    def _schedule_flush(self, mongo_collection):
+        """
+        Flush a partial batch once it is flush_interval old, even if nothing
+        else is enqueued; caller must hold the lock
+        """
+        self._timer = threading.Timer(
+            self.flush_interval, self._flush_on_timer, args=(mongo_collection,)
+        )
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_on_timer(self, mongo_collection):
+        try:
+            self.flush(mongo_collection)
+        except Exception as e:
+            logger.warning(f"Timed index flush failed: {str(e)}")
+
+    def flush_pending(self, mongo_collection, limit: int | None = None) -> int:
+        """
+        Drain the durable queue: resumes flagged `index_pending` by any
+        process, including ones that died before flushing their buffer.
+        A failing batch is retried one resume at a time so a single bad
+        document cannot hold the rest back.
+        """
+        try:
+            self.flush(mongo_collection)
+        except Exception as e:
+            logger.warning(f"Buffered index flush failed: {str(e)}")
+
+        # Failures are requeued behind this cutoff and wait for the next run
+        started_at = datetime.now(timezone.utc)
+        flushed = 0
+        while limit is None or flushed < limit:
+            token, docs = self._claim(
+                mongo_collection,
+                {"index_queued_at": {"$lte": started_at}},
+                self.batch_size,
+                PENDING_PROJECTION,
+            )
+            if not docs:
+                break
+            try:
+                self._write_batch(mongo_collection, docs)
+                flushed += len(docs)
+            except Exception as e:
+                logger.warning(
+                    f"Index batch of {len(docs)} failed, retrying one by one: {e}"
+                )
+                flushed += self._write_each(mongo_collection, docs, token)
+        return flushed
+
+    def _claim(
+        self, mongo_collection, query: dict, limit: int, projection: dict
+    ) -> tuple[str, list[dict]]:
+        """
+        Atomically claim up to `limit` pending resumes matching `query` under
+        a fresh token. Claims older than INDEX_CLAIM_TIMEOUT are considered
+        abandoned and can be re-claimed.
+        """
+        token = uuid.uuid4().hex
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=settings.INDEX_CLAIM_TIMEOUT)
+        claimed = []
+        for _ in range(limit):
+            doc = mongo_collection.find_one_and_update(
+                {
+                    **query,
+                    "index_pending": True,
+                    "$or": [
+                        {"index_claimed_at": None},
+                        {"index_claimed_at": {"$lt": stale}},
+                    ],
+                },
+                {"$set": {"index_claim": token, "index_claimed_at": now}},
+                projection=projection,
+                sort=[("index_queued_at", 1)],
+            )
+            if not doc:
+                break
+            claimed.append(doc)
+        return token, claimed
+
+    def requeue(self, mongo_collection, query: dict | None = None) -> int:
+        """
+        Flag persisted resumes (all of them by default) for indexing again,
+        e.g. after switching EMBEDDING_MODEL; flush_pending then rebuilds
+        their entries from Mongo
+        """
+        result = mongo_collection.update_many(
+            {
+                **(query or {}),
+                "resume_id": {"$exists": True},
+                "extracted_text": {"$exists": True},
+            },
+            {
+                "$set": {
+                    "index_pending": True,
+                    "index_queued_at": datetime.now(timezone.utc),
+                },
+                "$unset": {"index_attempts": "", "index_failed": "", **CLAIM_FIELDS},
+            },
+        )
+        return result.modified_count
+
+    def _write_each(self, mongo_collection, docs: list[dict], token: str) -> int:
+        written = 0
+        for doc in docs:
+            try:
+                self._write_batch(mongo_collection, [doc])
+                written += 1
+            except Exception as e:
+                self._record_failure(mongo_collection, doc, e, token)
+        return written
+
+    def _record_failure(
+        self, mongo_collection, doc: dict, error: Exception, token: str
+    ):
+        """
+        Requeue a resume, or give up on it after INDEX_MAX_ATTEMPTS. Nothing
+        is recorded if the claim was lost, e.g. to a flush that wrote it.
+        """
+        updated = mongo_collection.find_one_and_update(
+            {"_id": doc["_id"], "index_claim": token},
+            {
+                "$inc": {"index_attempts": 1},
+                "$set": {"index_queued_at": datetime.now(timezone.utc)},
+                "$unset": CLAIM_FIELDS,
+            },
+            projection={"index_attempts": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if updated is None:
+            return
+        attempts = updated.get("index_attempts", 0)
+        if attempts < settings.INDEX_MAX_ATTEMPTS:
+            logger.warning(
+                f"Indexing resume {doc['_id']} failed "
+                f"(attempt {attempts}/{settings.INDEX_MAX_ATTEMPTS}): {error}"
+            )
+            return
+
+        logger.error(f"Giving up indexing resume {doc['_id']}: {error}")
+        mongo_collection.update_one(
+            {"_id": doc["_id"]},
+            {
+                "$set": {"index_failed": True, "error": f"Indexing failed: {error}"},
+                "$unset": {"index_pending": "", "index_queued_at": ""},
+            },
+        )
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def _write_batch(self, mongo_collection, docs: list[dict]):
+        if not docs:
+            return
+        started = time.perf_counter()
+        store = get_vector_store()
+        store.upsert_resumes(docs)
+        if settings.MATRIX_SEARCH:
+            # Stored vectors, so the matrix matches the store chunk for chunk
+            matrix_index.add_batches(
+                store.resume_embeddings([doc["resume_id"] for doc in docs])
+            )
+        if settings.HYBRID_SEARCH:
+            sparse_index.add(
+                [doc["resume_id"] for doc in docs],
+                [doc["extracted_text"] for doc in docs],
+            )
+
+        mongo_collection.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in docs]}},
+            {
+                "$set": {"indexed": True, "processed": True, "error": None},
+                "$unset": {
+                    "index_pending": "",
+                    "index_queued_at": "",
+                    "index_attempts": "",
+                    "index_failed": "",
+                    **CLAIM_FIELDS,
+                },
+            },
+        )
+        # Written now, so a later buffered flush must not upsert them again
+        with self._lock:
+            for doc in docs:
+                self._buffer.pop(str(doc["_id"]), None)
+        resume_ids = [doc["resume_id"] for doc in docs]
+        for listener in self.listeners:
+            try:
+                listener(resume_ids)
+            except Exception as e:
+                logger.warning(f"Index listener failed: {str(e)}")
+        logger.info(
+            f"Indexed {len(docs)} resumes in "
+            f"{(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+
+
+resume_indexer = ResumeIndexer()
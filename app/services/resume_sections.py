@@ -0,0 +1,99 @@
+import re
+
+# Lower-cased headings that start a new resume section
+SECTION_HEADINGS = {
+    "summary",
+    "professional summary",
+    "objective",
+    "profile",
+    "about me",
+    "experience",
+    "work experience",
+    "professional experience",
+    "employment",
+    "employment history",
+    "work history",
+    "education",
+    "academic background",
+    "skills",
+    "technical skills",
+    "core competencies",
+    "projects",
+    "personal projects",
+    "certifications",
+    "certificates",
+    "publications",
+    "awards",
+    "achievements",
+    "languages",
+    "interests",
+    "hobbies",
+    "volunteering",
+    "volunteer experience",
+    "references",
+}
+
+HEADING_CLEAN_RE = re.compile(r"[^a-z ]+")
+
+
+def is_section_heading(line: str) -> bool:
+    stripped = line.strip()
+    if not stripped or len(stripped) > 40:
+        return False
+    normalized = " ".join(HEADING_CLEAN_RE.sub(" ", stripped.lower()).split())
+    return normalized in SECTION_HEADINGS
+
+
+def split_sections(text: str) -> list[tuple[str, str]]:
+    """
+    Split resume text into (heading, body) pairs in document order. Text
+    before the first recognised heading is returned under "header".
+    """
+    sections: list[tuple[str, list[str]]] = [("header", [])]
+    for line in text.splitlines():
+        if is_section_heading(line):
+            sections.append((line.strip().rstrip(":").lower(), []))
+        else:
+            sections[-1][1].append(line)
+    return [
+        (heading, "\n".join(lines).strip())
+        for heading, lines in sections
+        if heading != "header" or "".join(lines).strip()
+    ]
+
+
+def _split_long(text: str, max_chars: int) -> list[str]:
+    """Break an oversized section on line boundaries, hard-splitting long lines"""
+    pieces, current = [], ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:max_chars])
+            line = line[max_chars:]
+        if len(current) + len(line) > max_chars:
+            pieces.append(current)
+            current = ""
+        current += line
+    if current.strip():
+        pieces.append(current)
+    return pieces
+
+
+def chunk_sections(text: str, max_chars: int) -> list[str]:
+    """
+    Pack consecutive sections into chunks of at most max_chars, keeping each
+    section's heading with its body so every chunk is self-describing.
+    """
+    chunks, current = [], ""
+    for heading, body in split_sections(text):
+        block = body if heading == "header" else f"{heading.upper()}\n{body}"
+        for piece in _split_long(block, max_chars):
+            if current and len(current) + len(piece) + 2 > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{piece}" if current else piece
+    if current.strip():
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,129 @@
+import hashlib
+import io
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from bson import ObjectId
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.mongo_client import get_resume_bucket, get_resume_collection
+
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds settings.MAX_UPLOAD_SIZE while streaming"""
+
+
+@dataclass
+class StoredFile:
+    file_id: ObjectId
+    size: int
+    content_hash: str
+
+
+class _Fingerprint:
+    """Running SHA-256 and size of a stream, enforcing the upload size limit"""
+
+    def __init__(self):
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def update(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > settings.MAX_UPLOAD_SIZE:
+            raise UploadTooLargeError(
+                f"File exceeds the {settings.MAX_UPLOAD_SIZE} byte upload limit"
+            )
+        self.sha256.update(chunk)
+
+
+class _GridFSWriter:
+    """Chunked GridFS writer that fingerprints and size-checks as it goes"""
+
+    def __init__(self, filename: str):
+        self.stream = get_resume_bucket().open_upload_stream(filename)
+        self.fingerprint = _Fingerprint()
+
+    def write(self, chunk: bytes):
+        self.fingerprint.update(chunk)
+        self.stream.write(chunk)
+
+    def close(self) -> StoredFile:
+        self.stream.close()
+        return StoredFile(
+            file_id=self.stream._id,
+            size=self.fingerprint.size,
+            content_hash=self.fingerprint.sha256.hexdigest(),
+        )
+
+    def abort(self):
+        self.stream.abort()
+
+
+async def hash_upload(upload: UploadFile) -> str:
+    """
+    SHA-256 an UploadFile in chunks and rewind it, so duplicates can be
+    detected before anything is written to GridFS
+    """
+    fingerprint = _Fingerprint()
+    while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+        fingerprint.update(chunk)
+    await upload.seek(0)
+    return fingerprint.sha256.hexdigest()
+
+
+def hash_stream(stream: BinaryIO) -> str:
+    """SHA-256 a synchronous, non-rewindable file-like object in chunks"""
+    fingerprint = _Fingerprint()
+    while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+        fingerprint.update(chunk)
+    return fingerprint.sha256.hexdigest()
+
+
+def find_by_content_hash(content_hash: str, projection: dict | None = None):
+    """Return the resume document already holding this exact file, if any"""
+    return get_resume_collection().find_one({"content_hash": content_hash}, projection)
+
+
+async def store_upload(upload: UploadFile, filename: str | None = None) -> StoredFile:
+    """
+    Stream an UploadFile into GridFS without buffering it in memory. GridFS
+    calls are blocking, so they run in the threadpool, off the event loop.
+    """
+    writer = _GridFSWriter(filename or upload.filename)
+    try:
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            await run_in_threadpool(writer.write, chunk)
+    except BaseException:
+        await run_in_threadpool(writer.abort)
+        raise
+    return await run_in_threadpool(writer.close)
+
+
+def store_stream(stream: BinaryIO, filename: str) -> StoredFile:
+    """Stream a synchronous file-like object (e.g. a ZIP entry) into GridFS"""
+    writer = _GridFSWriter(filename)
+    try:
+        while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+            writer.write(chunk)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
+
+
+def open_resume_blob(doc: dict) -> BinaryIO:
+    """Open a seekable read stream over a resume document's file contents"""
+    if doc.get("file_id"):
+        return get_resume_bucket().open_download_stream(doc["file_id"])
+    if doc.get("raw_data"):
+        # Documents uploaded before GridFS storage embed the bytes directly
+        return io.BytesIO(doc["raw_data"])
+    raise ValueError("No resume data found in MongoDB")
+
+
+def delete_resume_blob(file_id: ObjectId):
+    get_resume_bucket().delete(file_id)
@@ -1,28 +1,77 @@
-import json
+import logging
+import re
 
+import json5
 import ollama
 
 from app.core.config import settings
+from app.schemas.job import SkillList
+from app.services.llm_parser import ParseStats
+
+logger = logging.getLogger(__name__)
+
+SKILL_SCHEMA = SkillList.model_json_schema()
 
 
 class SkillExtractor:
+    PROMPT = """Extract technical skills from this text:
+                    {text}
+                    Return ONLY JSON of the form {{"skills": ["skill1", "skill2"]}}."""
+
     def __init__(self):
         self.model = settings.EXTRACTION_MODEL
+        self.client = ollama.Client(host=settings.OLLAMA_HOST)
+        self.parse_stats = ParseStats()
 
     def extract_skills(self, text: str) -> list[str]:
         """Extract skills from job description text"""
+        for attempt in range(settings.LLM_PARSE_RETRIES + 1):
+            try:
+                response = self.client.chat(
+                    model=self.model,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": self.PROMPT.format(text=text[:3000]),
+                        }
+                    ],
+                    format=SKILL_SCHEMA if settings.LLM_STRUCTURED_OUTPUT else None,
+                    keep_alive=settings.OLLAMA_KEEP_ALIVE,
+                )
+            except Exception as e:
+                logger.error(f"Skill extraction error: {str(e)}")
+                return []
+
+            skills = self._parse_skills(response["message"]["content"])
+            if skills is not None:
+                return skills
+            if attempt < settings.LLM_PARSE_RETRIES:
+                self.parse_stats.record_retry()
+        return []
+
+    def _parse_skills(self, content: str) -> list[str] | None:
+        """Strict schema parse first, then recover an array or object from text"""
         try:
-            response = ollama.chat(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": f"""Extract technical skills as a JSON array from this text:
-                    {text[:3000]}
-                    Return ONLY the array without additional formatting.""",
-                    }
-                ],
-            )
-            return json.loads(response["message"]["content"])
-        except Exception as e:
-            return []
+            skills = SkillList.model_validate_json(content).skills
+            self.parse_stats.record("strict")
+            return skills
+        except ValueError:
+            pass
+
+        for pattern in (r"\[[\s\S]*\]", r"\{[\s\S]*\}"):
+            match = re.search(pattern, content)
+            if not match:
+                continue
+            try:
+                data = json5.loads(match.group())
+            except ValueError:
+                continue
+            if isinstance(data, dict):
+                data = data.get("skills")
+            if isinstance(data, list):
+                self.parse_stats.record("repaired")
+                return [str(skill).strip() for skill in data if str(skill).strip()]
+
+        logger.warning(f"Could not parse skills from LLM output: {content[:200]}")
+        self.parse_stats.record("failed")
+        return None
@@ -0,0 +1,314 @@
+import fcntl
+import glob
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Keeps skill tokens like c++, c#, node.js and ci/cd's parts intact
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+MAX_TF = np.iinfo(np.uint16).max
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+@dataclass
+class _Segment:
+    """
+    Immutable CSR postings for a batch of documents: sorted terms, offsets
+    into the postings, and doc indices / term frequencies as flat arrays.
+    """
+
+    path: str
+    terms: np.ndarray
+    offsets: np.ndarray
+    doc_indices: np.ndarray
+    tfs: np.ndarray
+    resume_ids: np.ndarray
+    lengths: np.ndarray
+    doc_offset: int = 0
+
+    def postings(self, term: str) -> tuple[np.ndarray, np.ndarray] | None:
+        position = np.searchsorted(self.terms, term)
+        if position == len(self.terms) or self.terms[position] != term:
+            return None
+        start, stop = self.offsets[position], self.offsets[position + 1]
+        return (
+            self.doc_indices[start:stop].astype(np.int64) + self.doc_offset,
+            self.tfs[start:stop],
+        )
+
+
+def build_segment(resume_ids: list[int], texts: list[str]) -> dict[str, np.ndarray]:
+    postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+    lengths = []
+    for doc_index, text in enumerate(texts):
+        counts = Counter(tokenize(text))
+        lengths.append(sum(counts.values()))
+        for term, tf in counts.items():
+            postings[term].append((doc_index, min(tf, MAX_TF)))
+
+    terms = sorted(postings)
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(postings[term]) for term in terms])
+    return {
+        "terms": np.array(terms, dtype=str),
+        "offsets": offsets,
+        "doc_indices": np.fromiter(
+            (d for term in terms for d, _ in postings[term]), np.uint32, offsets[-1]
+        ),
+        "tfs": np.fromiter(
+            (tf for term in terms for _, tf in postings[term]), np.uint16, offsets[-1]
+        ),
+        "resume_ids": np.asarray(resume_ids, dtype=np.int64),
+        "lengths": np.asarray(lengths, dtype=np.uint32),
+    }
+
+
+class SparseIndex:
+    """
+    BM25 inverted index over resume text, persisted as a directory of
+    immutable segment files. Indexing writes a new segment per batch; every
+    process picks up new segments on its next query. A resume indexed again
+    lives in a newer segment and shadows its older copy until compaction.
+    Segments are merged tiered: only the smallest adjacent run is rewritten,
+    so bulk imports do not rewrite the whole corpus on every batch.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.SPARSE_INDEX_PATH,
+        k1: float = settings.BM25_K1,
+        b: float = settings.BM25_B,
+        refresh_interval: float = settings.SPARSE_INDEX_REFRESH_INTERVAL,
+        max_segments: int = settings.SPARSE_INDEX_MAX_SEGMENTS,
+        merge_factor: int = settings.SPARSE_INDEX_MERGE_FACTOR,
+        compact_ratio: float = settings.SPARSE_INDEX_COMPACT_RATIO,
+    ):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.refresh_interval = refresh_interval
+        self.max_segments = max_segments
+        self.merge_factor = max(merge_factor, 2)
+        self.compact_ratio = compact_ratio
+        self._lock = threading.Lock()
+        self._segments: list[_Segment] = []
+        self._resume_ids = np.empty(0, dtype=np.int64)
+        self._lengths = np.empty(0, dtype=np.float32)
+        self._alive = np.empty(0, dtype=bool)
+        self._checked_at = 0.0
+
+    def add(self, resume_ids: list[int], texts: list[str]):
+        """Persist one segment for a batch of resumes"""
+        if not resume_ids:
+            return
+        segment = build_segment(resume_ids, texts)
+        with self._write_lock():
+            name = f"{time.time_ns():020d}-{os.getpid()}.npz"
+            self._save(os.path.join(self.path, name), segment)
+            files = self._segment_files()
+            if len(files) > self.max_segments:
+                self._merge(files)
+        self.refresh(force=True)
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[int, float]]:
+        """Top resumes by BM25 as (resume_id, score), best first"""
+        self.refresh()
+        terms = set(tokenize(query))
+        with self._lock:
+            segments, alive = self._segments, self._alive
+            resume_ids, lengths = self._resume_ids, self._lengths
+        live = int(alive.sum())
+        if not terms or not live:
+            return []
+
+        avg_length = float(lengths[alive].mean()) or 1.0
+        scores = np.zeros(len(resume_ids), dtype=np.float32)
+        for term in terms:
+            found = [p for p in (s.postings(term) for s in segments) if p is not None]
+            if not found:
+                continue
+            docs = np.concatenate([p[0] for p in found])
+            tfs = np.concatenate([p[1] for p in found]).astype(np.float32)
+            keep = alive[docs]
+            docs, tfs = docs[keep], tfs[keep]
+            if not len(docs):
+                continue
+            idf = math.log(1 + (live - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[docs] / avg_length)
+            # Doc indices are unique per term, so plain fancy-index adds work
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        matched = matched[np.argsort(-scores[matched])]
+        return [(int(resume_ids[i]), float(scores[i])) for i in matched]
+
+    def refresh(self, force: bool = False):
+        """Load segments written since the last check, by any process"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return
+        self._checked_at = now
+        files = self._segment_files()
+        with self._lock:
+            loaded = [segment.path for segment in self._segments]
+        # Compaction replaced files we hold; start over
+        if loaded != files[: len(loaded)]:
+            loaded = []
+        try:
+            new = [self._load(path) for path in files[len(loaded) :]]
+        except FileNotFoundError:
+            # Compacted away while listing; the next refresh reloads
+            self._checked_at = 0.0
+            return
+        if not new and len(loaded) == len(self._segments):
+            return
+        with self._lock:
+            segments = (self._segments if loaded else []) + new
+            self._install(segments)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "segments": len(self._segments),
+                "documents": int(self._alive.sum()),
+                "postings": sum(len(s.doc_indices) for s in self._segments),
+            }
+
+    def _install(self, segments: list[_Segment]):
+        """Rebuild the global doc arrays; caller must hold the lock"""
+        offset = 0
+        for segment in segments:
+            segment.doc_offset = offset
+            offset += len(segment.resume_ids)
+        resume_ids = np.concatenate(
+            [s.resume_ids for s in segments] or [np.empty(0, np.int64)]
+        )
+        # The newest copy of each resume wins
+        _, last = np.unique(resume_ids[::-1], return_index=True)
+        alive = np.zeros(len(resume_ids), dtype=bool)
+        alive[len(resume_ids) - 1 - last] = True
+
+        self._segments = segments
+        self._resume_ids = resume_ids
+        self._lengths = np.concatenate(
+            [s.lengths for s in segments] or [np.empty(0, np.uint32)]
+        ).astype(np.float32)
+        self._alive = alive
+
+    def _merge(self, files: list[str]):
+        """
+        Merge the adjacent run of segments holding the fewest documents, or
+        every segment once enough documents are shadowed to be worth dropping
+        """
+        resume_ids = [self._load_resume_ids(path) for path in files]
+        total = sum(len(ids) for ids in resume_ids)
+        unique = len(np.unique(np.concatenate(resume_ids))) if total else 0
+        if total and 1 - unique / total >= self.compact_ratio:
+            self._compact(files)
+            return
+        width = min(self.merge_factor, len(files))
+        sizes = np.array([len(ids) for ids in resume_ids])
+        totals = np.convolve(sizes, np.ones(width, dtype=np.int64), mode="valid")
+        start = int(np.argmin(totals))
+        self._compact(files[start : start + width])
+
+    def _compact(self, files: list[str]):
+        """
+        Merge adjacent segments into one, dropping documents they shadow
+        among themselves. The result replaces the newest of them in place,
+        keeping its position in the segment order that decides which copy
+        of a resume wins.
+        """
+        segments = [self._load(path) for path in files]
+        merged = SparseIndex(self.path)
+        merged._install(segments)
+        vocabulary = np.unique(np.concatenate([s.terms for s in segments]))
+
+        term_ids, docs, tfs, resume_ids, lengths = [], [], [], [], []
+        base = 0
+        for segment in segments:
+            count = len(segment.resume_ids)
+            alive = merged._alive[segment.doc_offset : segment.doc_offset + count]
+            # Surviving documents are renumbered densely in segment order
+            remap = np.cumsum(alive) - 1 + base
+            posting_terms = np.repeat(
+                np.searchsorted(vocabulary, segment.terms).astype(np.int32),
+                np.diff(segment.offsets),
+            )
+            keep = alive[segment.doc_indices]
+            term_ids.append(posting_terms[keep])
+            docs.append(remap[segment.doc_indices[keep]].astype(np.uint32))
+            tfs.append(segment.tfs[keep])
+            resume_ids.append(segment.resume_ids[alive])
+            lengths.append(segment.lengths[alive])
+            base += int(alive.sum())
+
+        term_ids, docs, tfs = (np.concatenate(a) for a in (term_ids, docs, tfs))
+        order = np.lexsort((docs, term_ids))
+        term_ids, docs, tfs = term_ids[order], docs[order], tfs[order]
+        used, counts = np.unique(term_ids, return_counts=True)
+        offsets = np.zeros(len(used) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(counts)
+
+        self._save(
+            files[-1],
+            {
+                "terms": vocabulary[used],
+                "offsets": offsets,
+                "doc_indices": docs,
+                "tfs": tfs,
+                "resume_ids": np.concatenate(resume_ids),
+                "lengths": np.concatenate(lengths),
+            },
+        )
+        for path in files[:-1]:
+            os.remove(path)
+        logger.info(f"Merged {len(files)} sparse index segments into one")
+
+    def _segment_files(self) -> list[str]:
+        return sorted(glob.glob(os.path.join(self.path, "*.npz")))
+
+    @contextmanager
+    def _write_lock(self):
+        """Serialises segment writes and compaction across processes"""
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _save(self, path: str, segment: dict[str, np.ndarray]):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **segment)
+        os.replace(tmp_path, path)
+
+    def _load_resume_ids(self, path: str) -> np.ndarray:
+        with np.load(path, allow_pickle=False) as data:
+            return data["resume_ids"]
+
+    def _load(self, path: str) -> _Segment:
+        with np.load(path, allow_pickle=False) as data:
+            return _Segment(path=path, **{key: data[key] for key in data.files})
+
+
+sparse_index = SparseIndex()
@@ -0,0 +1,193 @@
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.services.pdf_parser import PAGE_BREAK
+from app.services.resume_sections import is_section_heading, split_sections
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+# "Page 2" / "Page 2 of 3" lines are dropped anywhere; bare numbers like
+# "2" or "2/3" only at a page edge, where they cannot be resume content
+PAGE_LABEL_RE = re.compile(r"^page\s*\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.IGNORECASE)
+PAGE_NUMBER_RE = re.compile(r"^\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.IGNORECASE)
+HYPHEN_END_RE = re.compile(r"\w-$")
+# A hyphenated line this close to the widest line was wrapped by the layout,
+# so its hyphen is a soft break; shorter ones end in a real compound
+FULL_LINE_RATIO = 0.85
+# Contact details sit on their own lines and must never be merged
+CONTACT_RE = re.compile(
+    r"[\w.+-]+@[\w-]+\.[\w.-]+|https?://|www\.|linkedin\.com|github\.com"
+    r"|\+?\d[\d\s().-]{7,}\d"
+)
+SPACE_RUN_RE = re.compile(r"[ \t\u00a0]+")
+BLANK_RUN_RE = re.compile(r"\n{3,}")
+DIGITS_RE = re.compile(r"\d+")
+# Lines ending like this are complete; anything else may continue below
+LINE_END_RE = re.compile(r"[.!?:;|•]$")
+BULLET_RE = re.compile(r"^[•\-*●▪◦]")
+
+# Header/footer candidates are taken from this many lines at each page edge
+PAGE_EDGE_LINES = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap tokenizer-free estimate: words and punctuation marks"""
+    return len(TOKEN_RE.findall(text))
+
+
+@dataclass
+class CompactionResult:
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def saved_ratio(self) -> float:
+        if not self.tokens_before:
+            return 0.0
+        return 1 - self.tokens_after / self.tokens_before
+
+
+class TextCompactor:
+    """
+    Strips PDF extraction artifacts from resume text before it is put into
+    an LLM prompt: repeated page headers/footers, page numbers, hyphenation
+    breaks, hard-wrapped lines, whitespace runs and non-content sections.
+    """
+
+    def __init__(self, drop_sections: list[str] | None = None):
+        self.drop_sections = {
+            s.lower()
+            for s in (
+                settings.COMPACTION_DROP_SECTIONS
+                if drop_sections is None
+                else drop_sections
+            )
+        }
+        self._lock = threading.Lock()
+        self.totals = {"documents": 0, "tokens_before": 0, "tokens_after": 0}
+
+    def compact(self, text: str) -> CompactionResult:
+        tokens_before = estimate_tokens(text)
+
+        pages = [self._normalize_whitespace(page) for page in text.split(PAGE_BREAK)]
+        pages = self._strip_page_boilerplate(pages)
+        compacted = "\n".join(pages)
+        compacted = self._join_hyphen_breaks(compacted)
+        compacted = self._merge_broken_lines(compacted)
+        compacted = self._drop_sections(compacted)
+        compacted = BLANK_RUN_RE.sub("\n\n", compacted).strip()
+
+        result = CompactionResult(compacted, tokens_before, estimate_tokens(compacted))
+        with self._lock:
+            self.totals["documents"] += 1
+            self.totals["tokens_before"] += result.tokens_before
+            self.totals["tokens_after"] += result.tokens_after
+        return result
+
+    def summary(self) -> dict[str, float]:
+        with self._lock:
+            totals = dict(self.totals)
+        before = totals["tokens_before"]
+        totals["saved_ratio"] = 1 - totals["tokens_after"] / before if before else 0.0
+        return totals
+
+    def _normalize_whitespace(self, text: str) -> str:
+        lines = (SPACE_RUN_RE.sub(" ", line).strip() for line in text.splitlines())
+        return "\n".join(lines)
+
+    def _strip_page_boilerplate(self, pages: list[str]) -> list[str]:
+        """Drop page numbers and edge lines repeated on most pages"""
+        page_lines = [page.splitlines() for page in pages]
+        repeated: set[str] = set()
+        if len(pages) > 1:
+            seen: Counter[str] = Counter()
+            for lines in page_lines:
+                content = [line for line in lines if line]
+                edges = content[:PAGE_EDGE_LINES] + content[-PAGE_EDGE_LINES:]
+                seen.update({DIGITS_RE.sub("#", line) for line in edges})
+            threshold = max(2, (len(pages) + 1) // 2)
+            repeated = {line for line, count in seen.items() if count >= threshold}
+
+        # The first occurrence stays: page one's header usually holds contacts
+        kept_pages, emitted = [], set()
+        for lines in page_lines:
+            content = [i for i, line in enumerate(lines) if line]
+            page_edges = (
+                {content[0], content[-1]} if content and len(pages) > 1 else set()
+            )
+            kept = []
+            for i, line in enumerate(lines):
+                key = DIGITS_RE.sub("#", line)
+                if PAGE_LABEL_RE.match(line) or key in emitted:
+                    continue
+                if i in page_edges and PAGE_NUMBER_RE.match(line):
+                    continue
+                if key in repeated:
+                    emitted.add(key)
+                kept.append(line)
+            kept_pages.append("\n".join(kept))
+        return kept_pages
+
+    def _join_hyphen_breaks(self, text: str) -> str:
+        """
+        Re-join words split across lines: "imple-\nmentation" loses its
+        hyphen, while "large-\nscale" from a short line keeps it
+        """
+        lines = text.split("\n")
+        width = max((len(line) for line in lines), default=0)
+        joined: list[str] = []
+        for line in lines:
+            previous = joined[-1] if joined else ""
+            if previous and HYPHEN_END_RE.search(previous) and line[:1].islower():
+                soft = (
+                    len(previous) >= width * FULL_LINE_RATIO
+                    and "-" not in line.split(" ", 1)[0]
+                )
+                joined[-1] = (previous[:-1] if soft else previous) + line
+            else:
+                joined.append(line)
+        return "\n".join(joined)
+
+    def _merge_broken_lines(self, text: str) -> str:
+        """
+        Re-join lines that were hard-wrapped mid-sentence. The header block
+        before the first section (name, contacts) is left line by line, as
+        are contact lines anywhere, since the fast path reads them by line.
+        """
+        merged: list[str] = []
+        in_header = True
+        for line in text.split("\n"):
+            if in_header and is_section_heading(line):
+                in_header = False
+            previous = merged[-1] if merged else ""
+            if (
+                previous
+                and line
+                and not in_header
+                and line[0].islower()
+                and not LINE_END_RE.search(previous)
+                and not BULLET_RE.match(line)
+                and not is_section_heading(previous)
+                and not is_section_heading(line)
+                and not CONTACT_RE.search(previous)
+                and not CONTACT_RE.search(line)
+            ):
+                merged[-1] = f"{previous} {line}"
+            else:
+                merged.append(line)
+        return "\n".join(merged)
+
+    def _drop_sections(self, text: str) -> str:
+        if not self.drop_sections:
+            return text
+        sections = split_sections(text)
+        if not any(heading in self.drop_sections for heading, _ in sections):
+            return text
+        return "\n\n".join(
+            body if heading == "header" else f"{heading.upper()}\n{body}"
+            for heading, body in sections
+            if heading not in self.drop_sections
+        )
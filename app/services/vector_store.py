@@ -0,0 +1,867 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.db.postgres_client import SessionLocal
+from app.models.resume import Candidate, Resume
+from app.services.chunk_scores import aggregate_chunk_scores
+from app.services.embeddings import embedding_function
+from app.services.resume_sections import chunk_sections
+
+
+def normalize_term(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def skill_key(skill: str) -> str:
+    """Chroma metadata cannot hold lists, so each skill is its own flag"""
+    return f"skill:{normalize_term(skill)}"
+
+
+@dataclass
+class SearchFilters:
+    """Structured filters pushed down into the vector store query"""
+
+    min_experience: float | None = None
+    max_experience: float | None = None
+    location: str | None = None
+    skills: list[str] = field(default_factory=list)
+    # Only each candidate's most recent resume
+    active_only: bool = False
+
+    @property
+    def is_empty(self) -> bool:
+        return self.to_chroma_where() is None
+
+    def to_chroma_where(self) -> dict[str, Any] | None:
+        conditions: list[dict[str, Any]] = []
+        if self.min_experience is not None:
+            conditions.append({"experience": {"$gte": self.min_experience}})
+        if self.max_experience is not None:
+            conditions.append({"experience": {"$lte": self.max_experience}})
+        if self.location:
+            conditions.append({"location": normalize_term(self.location)})
+        conditions += [{skill_key(skill): True} for skill in self.skills]
+        if self.active_only:
+            conditions.append({"active": True})
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def resume_metadata(doc: dict, active: bool = True) -> dict[str, Any]:
+    """Filterable fields for one resume, taken from its parsed data"""
+    parsed = doc.get("parsed_data") or {}
+    metadata: dict[str, Any] = {
+        "resume_id": doc["resume_id"],
+        "candidate_id": doc["candidate_id"],
+        "active": active,
+    }
+    experience = parsed.get("experience_years")
+    if isinstance(experience, (int, float)) and not isinstance(experience, bool):
+        metadata["experience"] = float(experience)
+    if isinstance(parsed.get("location"), str) and parsed["location"].strip():
+        metadata["location"] = normalize_term(parsed["location"])
+    for skill in parsed.get("skills") or []:
+        if isinstance(skill, str) and skill.strip():
+            metadata[skill_key(skill)] = True
+    return metadata
+
+
+def latest_resume_ids(docs: list[dict]) -> set[int]:
+    """
+    The newest resume of each candidate in a batch, taken from Postgres so
+    re-indexing an older resume cannot deactivate a newer one
+    """
+    candidate_ids = {doc["candidate_id"] for doc in docs}
+    db = SessionLocal()
+    try:
+        latest = dict(
+            db.query(Resume.candidate_id, func.max(Resume.id))
+            .filter(Resume.candidate_id.in_(candidate_ids))
+            .group_by(Resume.candidate_id)
+            .all()
+        )
+    finally:
+        db.close()
+    for doc in docs:
+        candidate_id = doc["candidate_id"]
+        latest[candidate_id] = max(latest.get(candidate_id, 0), doc["resume_id"])
+    return set(latest.values())
+
+
+# pgvector's default and maximum hnsw.ef_search
+HNSW_DEFAULT_EF_SEARCH = 40
+HNSW_MAX_EF_SEARCH = 1000
+
+
+def chunk_fetch_size(limit: int) -> int:
+    """Entries fetched for `limit` resumes before any widening"""
+    if settings.INDEX_SECTION_CHUNKS:
+        return limit * settings.CHUNK_SEARCH_OVERFETCH
+    return limit
+
+
+def resume_documents(
+    doc: dict, active: bool = True
+) -> list[tuple[str, str, dict[str, Any]]]:
+    """(id, text, metadata) entries to index for one processed resume"""
+    metadata = resume_metadata(doc, active)
+    text = doc["extracted_text"]
+    if not settings.INDEX_SECTION_CHUNKS:
+        return [(str(doc["resume_id"]), text, metadata)]
+    chunks = chunk_sections(text, settings.INDEX_CHUNK_CHARS) or [text]
+    return [
+        (f"{doc['resume_id']}:{number}", chunk, {**metadata, "chunk": number})
+        for number, chunk in enumerate(chunks)
+    ]
+
+
+def resume_id_from_entry(entry_id: str) -> int:
+    """Entry ids are "<resume_id>" or "<resume_id>:<chunk>" """
+    return int(entry_id.split(":", 1)[0])
+
+
+def hydrate_hits(
+    db: Session, hits: list[dict[str, Any]]
+) -> list[tuple[float, Candidate, Resume]]:
+    """Load the Resume and Candidate rows for ranked hits, keeping hit order"""
+    return hydrate_hit_lists(db, [hits])[0]
+
+
+def hydrate_hit_lists(
+    db: Session, hit_lists: list[list[dict[str, Any]]]
+) -> list[list[tuple[float, Candidate, Resume]]]:
+    """hydrate_hits for several rankings with a single IN query"""
+    resume_ids = {int(hit["resume_id"]) for hits in hit_lists for hit in hits}
+    if not resume_ids:
+        return [[] for _ in hit_lists]
+    resumes = (
+        db.query(Resume)
+        .options(joinedload(Resume.candidate))
+        .filter(Resume.id.in_(resume_ids))
+        .all()
+    )
+    resume_map = {r.id: r for r in resumes}
+    return [
+        [
+            (hit["score"], resume.candidate, resume)
+            for hit in hits
+            if (resume := resume_map.get(int(hit["resume_id"]))) is not None
+        ]
+        for hits in hit_lists
+    ]
+
+
+class VectorStore(ABC):
+    """
+    Where resume embeddings live. `search` returns one hit per resume as
+    {resume_id, score, metadata, content}, or just {resume_id, score} when
+    include_content is False; `rank` returns hydrated
+    (score, Candidate, Resume) rows for a job's query embedding.
+    """
+
+    @abstractmethod
+    def upsert_resumes(self, docs: list[dict]): ...
+
+    @abstractmethod
+    def search(
+        self,
+        query: str | None = None,
+        limit: int = 10,
+        query_embedding: list[float] | None = None,
+        filters: SearchFilters | None = None,
+        include_content: bool = True,
+    ) -> list[dict[str, Any]]: ...
+
+    @abstractmethod
+    def search_many(
+        self,
+        query_embeddings: list[list[float]],
+        limit: int = 10,
+        filters: SearchFilters | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """{resume_id, score} hits for each query embedding, in one round trip"""
+
+    @abstractmethod
+    def rank(
+        self,
+        db: Session,
+        query_embedding: list[float],
+        limit: int,
+        filters: SearchFilters | None = None,
+    ) -> list[tuple[float, Candidate, Resume]]: ...
+
+    @abstractmethod
+    def resume_embeddings(
+        self, resume_ids: list[int] | None = None, batch_size: int = 1000
+    ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """
+        Stored vectors in batches of (resume id per row, float32 matrix);
+        a resume indexed as chunks has one row per chunk.
+        """
+
+    @abstractmethod
+    def resume_contents(self, resume_ids: list[int]) -> dict[int, dict[str, Any]]:
+        """{metadata, content} of each resume's first chunk, as in search hits"""
+
+    @abstractmethod
+    def upsert_jobs(self, job_ids: list[int], embeddings: list[list[float]]):
+        """Add or replace the query embeddings of active jobs"""
+
+    @abstractmethod
+    def delete_jobs(self, job_ids: list[int]): ...
+
+    @abstractmethod
+    def search_jobs(
+        self, query_embeddings: list[list[float]], limit: int = 10
+    ) -> list[tuple[int, float]]:
+        """
+        Best indexed jobs as (job_id, score) for a resume given as one vector
+        per chunk; each job scores by its best matching chunk.
+        """
+
+
+class ChromaVectorStore(VectorStore):
+    """Embedded ChromaDB collection; hits are joined to Postgres afterwards"""
+
+    def __init__(self):
+        from app.db.chroma_client import chroma_client
+
+        self.collection = chroma_client.get_collection()
+        self.job_collection = chroma_client.get_job_collection()
+
+    def upsert_resumes(self, docs: list[dict]):
+        latest = latest_resume_ids(docs)
+        entries = [
+            entry
+            for doc in docs
+            for entry in resume_documents(doc, doc["resume_id"] in latest)
+        ]
+        try:
+            # Chunk counts change when a resume is re-indexed; drop the old set
+            self.collection.delete(
+                where={"resume_id": {"$in": [doc["resume_id"] for doc in docs]}}
+            )
+            self.collection.upsert(
+                ids=[entry[0] for entry in entries],
+                documents=[entry[1] for entry in entries],
+                metadatas=[entry[2] for entry in entries],
+            )
+            # Older resumes of these candidates are no longer active
+            superseded = self.collection.get(
+                where={
+                    "$and": [
+                        {"candidate_id": {"$in": [d["candidate_id"] for d in docs]}},
+                        {"resume_id": {"$nin": list(latest)}},
+                        {"active": True},
+                    ]
+                },
+                include=[],
+            )["ids"]
+            if superseded:
+                self.collection.update(
+                    ids=superseded, metadatas=[{"active": False}] * len(superseded)
+                )
+        except Exception as e:
+            raise RuntimeError(f"ChromaDB error: {str(e)}")
+
+    def search(
+        self,
+        query: str | None = None,
+        limit: int = 10,
+        query_embedding: list[float] | None = None,
+        filters: SearchFilters | None = None,
+        include_content: bool = True,
+    ) -> list[dict[str, Any]]:
+        # A precomputed embedding skips embedding the query text
+        if query_embedding is not None:
+            target = {"query_embeddings": [query_embedding]}
+        else:
+            target = {"query_texts": [query]}
+        # IDs always come back; text and metadata only when asked for
+        include = ["distances"]
+        if include_content:
+            include += ["documents", "metadatas"]
+        results = self._query(
+            limit,
+            **target,
+            where=filters.to_chroma_where() if filters else None,
+            include=include,
+        )
+        return self._query_results(results, 0, limit, include_content)
+
+    def search_many(
+        self,
+        query_embeddings: list[list[float]],
+        limit: int = 10,
+        filters: SearchFilters | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        if not query_embeddings:
+            return []
+        # Chroma runs every query embedding in the same call
+        results = self._query(
+            limit,
+            query_embeddings=query_embeddings,
+            where=filters.to_chroma_where() if filters else None,
+            include=["distances"],
+        )
+        return [
+            self._query_results(results, index, limit, include_content=False)
+            for index in range(len(query_embeddings))
+        ]
+
+    def rank(
+        self,
+        db: Session,
+        query_embedding: list[float],
+        limit: int,
+        filters: SearchFilters | None = None,
+    ) -> list[tuple[float, Candidate, Resume]]:
+        # Filters are applied inside Chroma, so the top `limit` hits are final
+        vector_results = self.search(
+            query_embedding=query_embedding,
+            limit=limit,
+            filters=filters,
+            include_content=False,
+        )
+        return hydrate_hits(db, vector_results)
+
+    def resume_embeddings(
+        self, resume_ids: list[int] | None = None, batch_size: int = 1000
+    ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        if resume_ids is not None and not resume_ids:
+            return
+        where = {"resume_id": {"$in": resume_ids}} if resume_ids else None
+        offset = 0
+        while True:
+            batch = self.collection.get(
+                where=where, include=["embeddings"], limit=batch_size, offset=offset
+            )
+            if not batch["ids"]:
+                return
+            yield (
+                np.array([resume_id_from_entry(i) for i in batch["ids"]]),
+                np.asarray(batch["embeddings"], dtype=np.float32),
+            )
+            offset += len(batch["ids"])
+
+    def resume_contents(self, resume_ids: list[int]) -> dict[int, dict[str, Any]]:
+        if not resume_ids:
+            return {}
+        batch = self.collection.get(
+            where={"resume_id": {"$in": [int(r) for r in resume_ids]}},
+            include=["documents", "metadatas"],
+        )
+        entries = sorted(
+            zip(batch["metadatas"], batch["documents"]),
+            key=lambda entry: entry[0].get("chunk", 0),
+        )
+        contents: dict[int, dict[str, Any]] = {}
+        for metadata, document in entries:
+            contents.setdefault(
+                metadata["resume_id"], {"metadata": metadata, "content": document}
+            )
+        return contents
+
+    def upsert_jobs(self, job_ids: list[int], embeddings: list[list[float]]):
+        if job_ids:
+            self.job_collection.upsert(
+                ids=[str(job_id) for job_id in job_ids], embeddings=embeddings
+            )
+
+    def delete_jobs(self, job_ids: list[int]):
+        if job_ids:
+            self.job_collection.delete(ids=[str(job_id) for job_id in job_ids])
+
+    def search_jobs(
+        self, query_embeddings: list[list[float]], limit: int = 10
+    ) -> list[tuple[int, float]]:
+        count = self.job_collection.count()
+        if not query_embeddings or not count:
+            return []
+        # Every chunk in one query; the best `limit` jobs per chunk suffice
+        results = self.job_collection.query(
+            query_embeddings=query_embeddings,
+            n_results=min(limit, count),
+            include=["distances"],
+        )
+        best: dict[int, float] = {}
+        for ids, distances in zip(results["ids"], results["distances"]):
+            for job_id, distance in zip(ids, distances):
+                best[int(job_id)] = max(best.get(int(job_id), -1.0), 1 - distance)
+        return sorted(best.items(), key=lambda pair: pair[1], reverse=True)[:limit]
+
+    def _query(self, limit: int, **query) -> dict[str, Any]:
+        """
+        Query enough chunks for `limit` resumes per query embedding. Section
+        chunks are fetched several per resume; when one resume's chunks crowd
+        out the others, the fetch is doubled until every query has `limit`
+        resumes or the collection runs out.
+        """
+        n_results = chunk_fetch_size(limit)
+        while True:
+            results = self.collection.query(n_results=n_results, **query)
+            if not settings.INDEX_SECTION_CHUNKS or not any(
+                len(ids) == n_results
+                and len({resume_id_from_entry(i) for i in ids}) < limit
+                for ids in results["ids"]
+            ):
+                return results
+            n_results *= 2
+
+    def _query_results(
+        self, chroma_results, index: int, limit: int, include_content: bool
+    ) -> list[dict[str, Any]]:
+        """Hits of the index-th query embedding in a Chroma query result"""
+        if not chroma_results or not chroma_results["ids"][index]:
+            return []
+        if settings.INDEX_SECTION_CHUNKS:
+            return self._aggregate_results(chroma_results, index, include_content)[
+                :limit
+            ]
+        return self._format_results(chroma_results, index, include_content)
+
+    def _aggregate_results(
+        self, chroma_results, index: int, include_content: bool
+    ) -> list[dict[str, Any]]:
+        """One result per resume, scored from its matching chunks"""
+        entry_ids = chroma_results["ids"][index]
+        resume_ids = np.array([resume_id_from_entry(i) for i in entry_ids])
+        scores = 1 - np.asarray(chroma_results["distances"][index], dtype=np.float32)
+        ids, aggregated, best = aggregate_chunk_scores(
+            resume_ids,
+            scores,
+            settings.CHUNK_SCORE_AGGREGATION,
+            settings.CHUNK_SCORE_TOP_K,
+        )
+        results = []
+        for resume_id, score, chunk in zip(ids, aggregated, best):
+            result = {"resume_id": str(resume_id), "score": float(score)}
+            if include_content:
+                result["metadata"] = chroma_results["metadatas"][index][chunk]
+                result["content"] = chroma_results["documents"][index][chunk]
+            results.append(result)
+        return results
+
+    def _format_results(
+        self, chroma_results, index: int, include_content: bool
+    ) -> list[dict[str, Any]]:
+        formatted = []
+        for i, entry_id in enumerate(chroma_results["ids"][index]):
+            result = {
+                "resume_id": str(resume_id_from_entry(entry_id)),
+                "score": 1 - chroma_results["distances"][index][i],
+            }
+            if include_content:
+                result["metadata"] = chroma_results["metadatas"][index][i]
+                result["content"] = chroma_results["documents"][index][i]
+            formatted.append(result)
+        return formatted
+
+
+class PgVectorStore(VectorStore):
+    """
+    Embeddings in Postgres next to the Candidate/Resume rows, so ranking is
+    a single statement: ANN search, per-resume aggregation, joins and limit.
+    """
+
+    def __init__(self):
+        from app.models.job_embedding import JobEmbedding
+        from app.models.resume_embedding import ResumeEmbedding
+
+        self.model = ResumeEmbedding
+        self.job_model = JobEmbedding
+
+    def upsert_resumes(self, docs: list[dict]):
+        latest = latest_resume_ids(docs)
+        entries = [
+            entry
+            for doc in docs
+            for entry in resume_documents(doc, doc["resume_id"] in latest)
+        ]
+        embeddings = embedding_function([entry[1] for entry in entries])
+        db = SessionLocal()
+        try:
+            db.query(self.model).filter(
+                self.model.resume_id.in_([doc["resume_id"] for doc in docs])
+            ).delete(synchronize_session=False)
+            db.add_all(
+                self.model(
+                    id=entry_id,
+                    resume_id=metadata["resume_id"],
+                    candidate_id=metadata["candidate_id"],
+                    chunk=metadata.get("chunk", 0),
+                    content=text,
+                    embedding=embedding,
+                    experience=metadata.get("experience"),
+                    location=metadata.get("location"),
+                    skills=[
+                        key.split(":", 1)[1]
+                        for key in metadata
+                        if key.startswith("skill:")
+                    ],
+                    active=metadata["active"],
+                )
+                for (entry_id, text, metadata), embedding in zip(entries, embeddings)
+            )
+            # Older resumes of these candidates are no longer active
+            db.query(self.model).filter(
+                self.model.candidate_id.in_([doc["candidate_id"] for doc in docs]),
+                self.model.resume_id.notin_(list(latest)),
+                self.model.active.is_(True),
+            ).update({"active": False}, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise RuntimeError(f"pgvector error: {str(e)}")
+        finally:
+            db.close()
+
+    def search(
+        self,
+        query: str | None = None,
+        limit: int = 10,
+        query_embedding: list[float] | None = None,
+        filters: SearchFilters | None = None,
+        include_content: bool = True,
+    ) -> list[dict[str, Any]]:
+        if query_embedding is None:
+            query_embedding = embedding_function([query])[0]
+        db = SessionLocal()
+        try:
+            n_results = chunk_fetch_size(limit)
+            while True:
+                self._prepare_ann(db, n_results, filters)
+                hits = self._hits(query_embedding, n_results, filters, include_content)
+                hits = hits.subquery()
+                rows = db.execute(
+                    select(hits)
+                    .where(hits.c.rank == 1)
+                    .order_by(hits.c.score.desc())
+                    .limit(limit)
+                ).all()
+                if not self._should_widen(db, [len(rows)], limit, n_results, filters):
+                    break
+                n_results *= 2
+        finally:
+            db.close()
+
+        results = []
+        for row in rows:
+            result = {"resume_id": str(row.resume_id), "score": float(row.score)}
+            if include_content:
+                result["metadata"] = {
+                    "resume_id": row.resume_id,
+                    "candidate_id": row.candidate_id,
+                }
+                result["content"] = row.content
+            results.append(result)
+        return results
+
+    def rank(
+        self,
+        db: Session,
+        query_embedding: list[float],
+        limit: int,
+        filters: SearchFilters | None = None,
+    ) -> list[tuple[float, Candidate, Resume]]:
+        aggregate = func.max if settings.CHUNK_SCORE_AGGREGATION == "max" else func.avg
+        n_results = chunk_fetch_size(limit)
+        while True:
+            self._prepare_ann(db, n_results, filters)
+            hits = self._hits(query_embedding, n_results, filters).subquery()
+            scores = (
+                select(hits.c.resume_id, aggregate(hits.c.score).label("score"))
+                .where(hits.c.rank <= settings.CHUNK_SCORE_TOP_K)
+                .group_by(hits.c.resume_id)
+                .subquery()
+            )
+            rows = (
+                db.query(scores.c.score, Candidate, Resume)
+                .select_from(scores)
+                .join(Resume, Resume.id == scores.c.resume_id)
+                .join(Candidate, Candidate.id == Resume.candidate_id)
+                .order_by(scores.c.score.desc())
+                .limit(limit)
+                .all()
+            )
+            if not self._should_widen(db, [len(rows)], limit, n_results, filters):
+                break
+            n_results *= 2
+        return [(float(score), candidate, resume) for score, candidate, resume in rows]
+
+    def search_many(
+        self,
+        query_embeddings: list[list[float]],
+        limit: int = 10,
+        filters: SearchFilters | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        if not query_embeddings:
+            return []
+        db = SessionLocal()
+        try:
+            n_results = chunk_fetch_size(limit)
+            while True:
+                self._prepare_ann(db, n_results, filters)
+                results = self._search_many(
+                    db, query_embeddings, limit, n_results, filters
+                )
+                counts = [len(hits) for hits in results]
+                if not self._should_widen(db, counts, limit, n_results, filters):
+                    return results
+                n_results *= 2
+        finally:
+            db.close()
+
+    def _search_many(
+        self,
+        db: Session,
+        query_embeddings: list[list[float]],
+        limit: int,
+        n_results: int,
+        filters: SearchFilters | None,
+    ) -> list[list[dict[str, Any]]]:
+        # Every query's ANN search in one statement, tagged with its position
+        per_query = [
+            self._hits(embedding, n_results, filters).subquery()
+            for embedding in query_embeddings
+        ]
+        hits = union_all(
+            *(
+                select(literal(index).label("query"), *hits.c)
+                for index, hits in enumerate(per_query)
+            )
+        ).subquery()
+        aggregate = func.max if settings.CHUNK_SCORE_AGGREGATION == "max" else func.avg
+        scores = (
+            select(
+                hits.c.query,
+                hits.c.resume_id,
+                aggregate(hits.c.score).label("score"),
+            )
+            .where(hits.c.rank <= settings.CHUNK_SCORE_TOP_K)
+            .group_by(hits.c.query, hits.c.resume_id)
+            .subquery()
+        )
+        position = (
+            func.row_number()
+            .over(partition_by=scores.c.query, order_by=scores.c.score.desc())
+            .label("position")
+        )
+        ranked = select(scores, position).subquery()
+        rows = db.execute(
+            select(ranked)
+            .where(ranked.c.position <= limit)
+            .order_by(ranked.c.query, ranked.c.position)
+        ).all()
+
+        results = [[] for _ in query_embeddings]
+        for row in rows:
+            results[row.query].append(
+                {"resume_id": str(row.resume_id), "score": float(row.score)}
+            )
+        return results
+
+    def resume_embeddings(
+        self, resume_ids: list[int] | None = None, batch_size: int = 1000
+    ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        if resume_ids is not None and not resume_ids:
+            return
+        query = select(self.model.resume_id, self.model.embedding)
+        if resume_ids:
+            query = query.where(self.model.resume_id.in_(resume_ids))
+        db = SessionLocal()
+        try:
+            result = db.execute(query.execution_options(yield_per=batch_size))
+            for rows in result.partitions():
+                yield (
+                    np.array([row.resume_id for row in rows]),
+                    np.asarray([row.embedding for row in rows], dtype=np.float32),
+                )
+        finally:
+            db.close()
+
+    def resume_contents(self, resume_ids: list[int]) -> dict[int, dict[str, Any]]:
+        if not resume_ids:
+            return {}
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(
+                    self.model.resume_id, self.model.candidate_id, self.model.content
+                )
+                .where(self.model.resume_id.in_([int(r) for r in resume_ids]))
+                .order_by(self.model.resume_id, self.model.chunk)
+                .distinct(self.model.resume_id)
+            ).all()
+        finally:
+            db.close()
+        return {
+            row.resume_id: {
+                "metadata": {
+                    "resume_id": row.resume_id,
+                    "candidate_id": row.candidate_id,
+                },
+                "content": row.content,
+            }
+            for row in rows
+        }
+
+    def upsert_jobs(self, job_ids: list[int], embeddings: list[list[float]]):
+        if not job_ids:
+            return
+        statement = insert(self.job_model).values(
+            [
+                {"job_id": job_id, "embedding": embedding}
+                for job_id, embedding in zip(job_ids, embeddings)
+            ]
+        )
+        db = SessionLocal()
+        try:
+            db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["job_id"],
+                    set_={"embedding": statement.excluded.embedding},
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def delete_jobs(self, job_ids: list[int]):
+        if not job_ids:
+            return
+        db = SessionLocal()
+        try:
+            db.query(self.job_model).filter(self.job_model.job_id.in_(job_ids)).delete(
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def search_jobs(
+        self, query_embeddings: list[list[float]], limit: int = 10
+    ) -> list[tuple[int, float]]:
+        if not query_embeddings:
+            return []
+        per_chunk = []
+        for embedding in query_embeddings:
+            distance = self.job_model.embedding.cosine_distance(embedding)
+            per_chunk.append(
+                select(self.job_model.job_id, (1 - distance).label("score"))
+                .order_by(distance)
+                .limit(limit)
+                .subquery()
+            )
+        hits = union_all(*(select(*chunk.c) for chunk in per_chunk)).subquery()
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(hits.c.job_id, func.max(hits.c.score).label("score"))
+                .group_by(hits.c.job_id)
+                .order_by(func.max(hits.c.score).desc())
+                .limit(limit)
+            ).all()
+        finally:
+            db.close()
+        return [(row.job_id, float(row.score)) for row in rows]
+
+    def _uses_ann(self, n_results: int, filters: SearchFilters | None) -> bool:
+        """
+        HNSW filters after the scan, so a filtered query could come back
+        short; those, and fetches wider than ef_search allows, scan exactly
+        """
+        return not self._conditions(filters) and n_results <= HNSW_MAX_EF_SEARCH
+
+    def _prepare_ann(self, db: Session, n_results: int, filters: SearchFilters | None):
+        """An HNSW scan returns at most hnsw.ef_search rows (40 by default)"""
+        if self._uses_ann(n_results, filters) and n_results > HNSW_DEFAULT_EF_SEARCH:
+            db.execute(select(func.set_config("hnsw.ef_search", str(n_results), True)))
+
+    def _should_widen(
+        self,
+        db: Session,
+        counts: list[int],
+        limit: int,
+        n_results: int,
+        filters: SearchFilters | None,
+    ) -> bool:
+        """True if a query came back short and more chunks could match"""
+        if all(count >= limit for count in counts):
+            return False
+        matching = (
+            db.query(func.count(self.model.id))
+            .filter(*self._conditions(filters))
+            .scalar()
+        )
+        return matching > n_results
+
+    def _hits(
+        self,
+        query_embedding: list[float],
+        n_results: int,
+        filters: SearchFilters | None = None,
+        include_content: bool = False,
+    ):
+        """Nearest matching chunks by cosine distance, ranked within their resume"""
+        distance = self.model.embedding.cosine_distance(query_embedding)
+        columns = [self.model.resume_id, (1 - distance).label("score")]
+        if include_content:
+            columns += [self.model.candidate_id, self.model.content]
+        # Ordering by an expression the index cannot serve forces an exact scan
+        order = distance if self._uses_ann(n_results, filters) else distance + 0
+        nearest = (
+            select(*columns)
+            .where(*self._conditions(filters))
+            .order_by(order)
+            .limit(n_results)
+            .subquery()
+        )
+        return select(
+            nearest,
+            func.row_number()
+            .over(partition_by=nearest.c.resume_id, order_by=nearest.c.score.desc())
+            .label("rank"),
+        )
+
+    def _conditions(self, filters: SearchFilters | None) -> list:
+        if filters is None:
+            return []
+        conditions = []
+        if filters.min_experience is not None:
+            conditions.append(self.model.experience >= filters.min_experience)
+        if filters.max_experience is not None:
+            conditions.append(self.model.experience <= filters.max_experience)
+        if filters.location:
+            conditions.append(self.model.location == normalize_term(filters.location))
+        if filters.skills:
+            conditions.append(
+                self.model.skills.contains([normalize_term(s) for s in filters.skills])
+            )
+        if filters.active_only:
+            conditions.append(self.model.active.is_(True))
+        return conditions
+
+
+VECTOR_STORES = {"chroma": ChromaVectorStore, "pgvector": PgVectorStore}
+
+_vector_store: VectorStore | None = None
+
+
+def get_vector_store() -> VectorStore:
+    """The configured store, built on first use"""
+    global _vector_store
+    if _vector_store is None:
+        if settings.VECTOR_STORE not in VECTOR_STORES:
+            raise ValueError(f"Unknown VECTOR_STORE: {settings.VECTOR_STORE}")
+        _vector_store = VECTOR_STORES[settings.VECTOR_STORE]()
+    return _vector_store
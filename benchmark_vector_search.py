@@ -0,0 +1,109 @@
+"""
+Recall and latency of the quantized matrix index against Chroma.
+
+Ground truth is an exact float32 scan over every stored vector. Queries
+are active job embeddings, topped up with perturbed resume vectors.
+
+    python benchmark_vector_search.py --queries 200 --limit 10
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.db import get_db_session
+from app.services.job_rankings import active_job_embeddings
+from app.services.matrix_index import matrix_index
+from app.services.vector_store import ChromaVectorStore, aggregate_chunk_scores
+
+
+def exact_top_k(
+    resume_ids: np.ndarray, vectors: np.ndarray, query: np.ndarray, k: int
+) -> set[str]:
+    ids, _, _ = aggregate_chunk_scores(
+        resume_ids,
+        vectors @ (query / np.linalg.norm(query)),
+        settings.CHUNK_SCORE_AGGREGATION,
+        settings.CHUNK_SCORE_TOP_K,
+    )
+    return {str(resume_id) for resume_id in ids[:k]}
+
+
+def sample_queries(vectors: np.ndarray, count: int, seed: int) -> np.ndarray:
+    db = get_db_session()
+    try:
+        _, jobs = active_job_embeddings(db)
+    finally:
+        db.close()
+    queries = list(jobs[:count])
+    rng = np.random.default_rng(seed)
+    if len(queries) < count:
+        rows = rng.choice(len(vectors), count - len(queries))
+        noise = rng.normal(0, 0.05, (len(rows), vectors.shape[1]))
+        queries += list(vectors[rows] + noise.astype(np.float32))
+    return np.asarray(queries, dtype=np.float32)
+
+
+def run(search, queries: np.ndarray, truth: list[set[str]], k: int) -> dict:
+    latencies, recalls = [], []
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        hits = search(query.tolist(), k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        found = {hit["resume_id"] for hit in hits}
+        recalls.append(len(found & expected) / max(len(expected), 1))
+    return {
+        "recall": float(np.mean(recalls)),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--rebuild", action="store_true", help="Reload the matrix index first"
+    )
+    args = parser.parse_args()
+
+    chroma = ChromaVectorStore()
+    if args.rebuild:
+        matrix_index.rebuild(chroma.resume_embeddings())
+    resume_ids, vectors = matrix_index.vectors()
+    if not len(resume_ids):
+        raise SystemExit("Matrix index is empty; run with --rebuild")
+    vectors = np.asarray(vectors)
+
+    queries = sample_queries(vectors, args.queries, args.seed)
+    truth = [exact_top_k(resume_ids, vectors, q, args.limit) for q in queries]
+    # Warm both engines before timing
+    chroma.search(query_embedding=queries[0].tolist(), include_content=False)
+    matrix_index.search(queries[0].tolist())
+
+    engines = {
+        "chroma": lambda q, k: chroma.search(
+            query_embedding=q, limit=k, include_content=False
+        ),
+        "matrix": matrix_index.search,
+    }
+    print(
+        f"{len(np.unique(resume_ids))} resumes, {len(resume_ids)} vectors, "
+        f"{len(queries)} queries, recall@{args.limit}"
+    )
+    for name, search in engines.items():
+        result = run(search, queries, truth, args.limit)
+        print(
+            f"{name:8} recall {result['recall']:.3f}  "
+            f"p50 {result['p50_ms']:.2f}ms  p95 {result['p95_ms']:.2f}ms  "
+            f"p99 {result['p99_ms']:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
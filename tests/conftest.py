@@ -0,0 +1,11 @@
+import os
+
+# Settings has required fields without defaults; the unit tests never connect
+for name, value in {
+    "FIREBASE_API_KEY": "test",
+    "FIREBASE_PROJECT_ID": "test",
+    "MONGO_URI": "mongodb://localhost:27017",
+    "MONGO_DB_NAME": "resume_screener_test",
+    "MONGO_RESUME_COLLECTION": "resumes",
+}.items():
+    os.environ.setdefault(name, value)
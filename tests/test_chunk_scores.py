@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from app.services.chunk_scores import aggregate_chunk_scores
+
+
+def reference(resume_ids, scores, method, top_k):
+    """Per-resume aggregation written as a plain loop"""
+    grouped = {}
+    for resume_id, score in zip(resume_ids, scores):
+        grouped.setdefault(int(resume_id), []).append(float(score))
+    result = {}
+    for resume_id, values in grouped.items():
+        values.sort(reverse=True)
+        if method == "max":
+            result[resume_id] = values[0]
+        else:
+            result[resume_id] = sum(values[:top_k]) / min(len(values), top_k)
+    return result
+
+
+def test_max_takes_each_resumes_best_chunk():
+    resume_ids = np.array([7, 3, 7, 3, 9])
+    scores = np.array([0.2, 0.9, 0.8, 0.1, 0.5], dtype=np.float32)
+
+    ids, aggregated, best = aggregate_chunk_scores(resume_ids, scores, "max")
+
+    assert ids.tolist() == [3, 7, 9]
+    np.testing.assert_allclose(aggregated, [0.9, 0.8, 0.5])
+    # Index of the chunk that produced each score, in the input order
+    assert best.tolist() == [1, 2, 4]
+
+
+def test_topk_mean_averages_the_best_k_chunks():
+    resume_ids = np.array([1, 1, 1, 1, 2, 2])
+    scores = np.array([0.9, 0.1, 0.6, 0.3, 0.7, 0.65], dtype=np.float32)
+
+    ids, aggregated, _ = aggregate_chunk_scores(resume_ids, scores, "topk_mean", 2)
+
+    assert ids.tolist() == [1, 2]
+    np.testing.assert_allclose(aggregated, [0.75, 0.675], rtol=1e-6)
+
+
+def test_topk_mean_with_fewer_chunks_than_k_uses_what_exists():
+    ids, aggregated, _ = aggregate_chunk_scores(
+        np.array([4, 5, 5]), np.array([0.4, 0.9, 0.5]), "topk_mean", 3
+    )
+
+    assert ids.tolist() == [5, 4]
+    np.testing.assert_allclose(aggregated, [0.7, 0.4])
+
+
+def test_max_and_topk_mean_can_rank_differently():
+    # Resume 1 has one strong chunk, resume 2 several good ones
+    resume_ids = np.array([1, 1, 1, 2, 2, 2])
+    scores = np.array([0.95, 0.1, 0.1, 0.8, 0.8, 0.8])
+
+    by_max, _, _ = aggregate_chunk_scores(resume_ids, scores, "max")
+    by_mean, _, _ = aggregate_chunk_scores(resume_ids, scores, "topk_mean", 3)
+
+    assert by_max.tolist() == [1, 2]
+    assert by_mean.tolist() == [2, 1]
+
+
+@pytest.mark.parametrize("method", ["max", "topk_mean"])
+def test_matches_a_loop_on_random_input(method):
+    rng = np.random.default_rng(0)
+    resume_ids = rng.integers(0, 50, 1000)
+    scores = rng.random(1000).astype(np.float32)
+
+    ids, aggregated, best = aggregate_chunk_scores(resume_ids, scores, method, 3)
+
+    expected = reference(resume_ids, scores, method, 3)
+    assert sorted(ids.tolist()) == sorted(expected)
+    np.testing.assert_allclose(aggregated, [expected[int(i)] for i in ids], rtol=1e-5)
+    assert np.all(np.diff(aggregated) <= 0)
+    assert np.all(resume_ids[best] == ids)
@@ -0,0 +1,115 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.services.matrix_index import MatrixIndex, quantize
+
+DIMENSIONS = 32
+
+
+def normalized(matrix):
+    return matrix / np.linalg.norm(matrix, axis=-1, keepdims=True)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return MatrixIndex(
+        path=str(tmp_path / "matrix"),
+        dimensions=DIMENSIONS,
+        rerank_factor=4,
+        block_rows=64,
+        refresh_interval=0.0,
+    )
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(7)
+    return np.arange(1, 401), rng.normal(size=(400, DIMENSIONS)).astype(np.float32)
+
+
+def exact_top_k(resume_ids, vectors, query, k):
+    scores = normalized(vectors) @ normalized(query)
+    order = np.argsort(-scores)[:k]
+    return [int(resume_ids[i]) for i in order], scores[order]
+
+
+def test_quantize_round_trip_is_close():
+    vectors = normalized(np.random.default_rng(1).normal(size=(50, DIMENSIONS)))
+
+    quantized, scales = quantize(vectors)
+
+    assert quantized.dtype == np.int8
+    np.testing.assert_allclose(quantized * scales[:, None], vectors, atol=0.01)
+
+
+def test_search_matches_exact_cosine_top_k(index, corpus):
+    resume_ids, vectors = corpus
+    index.add(resume_ids.tolist(), vectors)
+    queries = np.random.default_rng(11).normal(size=(20, DIMENSIONS))
+
+    recalls = []
+    for query in queries:
+        expected, expected_scores = exact_top_k(resume_ids, vectors, query, 10)
+        hits = index.search(query.tolist(), limit=10)
+        found = [int(hit["resume_id"]) for hit in hits]
+        recalls.append(len(set(found) & set(expected)) / 10)
+        # Returned scores come from the float32 rerank, not the int8 pass
+        exact = dict(zip(expected, expected_scores))
+        for hit in hits:
+            if int(hit["resume_id"]) in exact:
+                assert hit["score"] == pytest.approx(exact[int(hit["resume_id"])], 1e-5)
+
+    assert np.mean(recalls) >= 0.95
+
+
+def test_reindexed_resume_shadows_its_old_rows(index, corpus):
+    resume_ids, vectors = corpus
+    index.add(resume_ids.tolist(), vectors)
+    query = vectors[0]
+
+    # Resume 1 moves away from the query it used to match best
+    index.add([1], -vectors[:1])
+
+    hits = index.search(query.tolist(), limit=5)
+    assert "1" not in [hit["resume_id"] for hit in hits]
+    live_ids, _ = index.vectors()
+    assert np.count_nonzero(live_ids == 1) == 1
+
+
+def test_append_after_partial_write_keeps_columns_aligned(index, corpus):
+    resume_ids, vectors = corpus
+    index.add(resume_ids[:100].tolist(), vectors[:100])
+
+    # An append interrupted after the first two column files
+    directory = index._current_dir()
+    for name, extra in (("quantized", DIMENSIONS * 3), ("scales", 4 * 2)):
+        with open(os.path.join(directory, f"{name}.bin"), "ab") as f:
+            f.write(b"\x01" * extra)
+
+    index.add(resume_ids[100:200].tolist(), vectors[100:200])
+
+    for name in MatrixIndex.COLUMNS:
+        size = os.path.getsize(os.path.join(directory, f"{name}.bin"))
+        assert size == 200 * index._row_bytes(name)
+    live_ids, live_vectors = index.vectors()
+    order = np.argsort(live_ids)
+    np.testing.assert_array_equal(live_ids[order], resume_ids[:200])
+    np.testing.assert_allclose(
+        np.asarray(live_vectors)[order], normalized(vectors[:200]), atol=1e-6
+    )
+    hit = index.search(vectors[150].tolist(), limit=1)[0]
+    assert hit["resume_id"] == "151"
+    assert hit["score"] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_rebuild_replaces_every_row(index, corpus):
+    resume_ids, vectors = corpus
+    index.add(resume_ids.tolist(), vectors)
+
+    rows = index.rebuild([(resume_ids[:10], vectors[:10])])
+
+    assert rows == 10
+    live_ids, _ = index.vectors()
+    assert sorted(live_ids.tolist()) == list(range(1, 11))
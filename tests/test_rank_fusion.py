@@ -0,0 +1,13 @@
+import pytest
+
+from app.services.rank_fusion import reciprocal_rank_fusion
+
+
+def test_ids_in_both_rankings_rank_first():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]], k=60)
+    assert [item for item, _ in fused] == ["c", "a", "b", "d"]
+    assert dict(fused)["c"] == pytest.approx(1 / 63 + 1 / 61)
+
+
+def test_empty_rankings():
+    assert reciprocal_rank_fusion([[], []]) == []
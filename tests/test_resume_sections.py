@@ -0,0 +1,64 @@
+from app.services.resume_sections import (
+    chunk_sections,
+    is_section_heading,
+    split_sections,
+)
+
+RESUME = """Jane Doe
+jane@example.com
+
+EXPERIENCE
+Backend engineer at Acme, 2019 - 2023
+
+Education:
+B.Tech, Example University
+
+Technical Skills
+Python, SQL
+"""
+
+
+def test_is_section_heading_normalizes_case_and_punctuation():
+    assert is_section_heading("EXPERIENCE")
+    assert is_section_heading("  Education: ")
+    assert is_section_heading("-- Work History --")
+    assert not is_section_heading("Backend engineer at Acme")
+    assert not is_section_heading("")
+    # Long lines are content even if they start like a heading
+    assert not is_section_heading("Skills " + "x" * 40)
+
+
+def test_split_sections_keeps_document_order_and_header():
+    sections = split_sections(RESUME)
+
+    assert [heading for heading, _ in sections] == [
+        "header",
+        "experience",
+        "education",
+        "technical skills",
+    ]
+    assert sections[0][1] == "Jane Doe\njane@example.com"
+    assert sections[2][1] == "B.Tech, Example University"
+
+
+def test_split_sections_without_header_text():
+    sections = split_sections("Skills\nPython\n")
+
+    assert sections == [("skills", "Python")]
+
+
+def test_chunk_sections_respects_limit_and_keeps_headings():
+    text = "\n\n".join(f"Projects\n{'word ' * 60}" for _ in range(5))
+
+    chunks = chunk_sections(text, 400)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 400 for chunk in chunks)
+    assert all(chunk.startswith("PROJECTS") for chunk in chunks)
+
+
+def test_chunk_sections_hard_splits_overlong_lines():
+    chunks = chunk_sections("x" * 1000, 300)
+
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    assert "".join(chunks) == "x" * 1000
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from app.services.sparse_index import SparseIndex, tokenize
+
+WORDS = "python java sql docker kubernetes react django flask aws spark".split()
+
+
+@pytest.fixture
+def index(tmp_path):
+    return SparseIndex(
+        path=str(tmp_path / "sparse"),
+        refresh_interval=0.0,
+        max_segments=4,
+        merge_factor=2,
+        compact_ratio=0.5,
+    )
+
+
+def random_texts(count, seed=3):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(3, 30))) for _ in range(count)]
+
+
+def test_tokenize_keeps_skill_tokens():
+    assert tokenize("C++, C#, Node.js and CI/CD.") == [
+        "c++",
+        "c#",
+        "node.js",
+        "and",
+        "ci",
+        "cd",
+    ]
+
+
+def test_bm25_orders_by_term_frequency_and_rarity(index):
+    index.add(
+        [1, 2, 3],
+        ["python python python sql", "python sql sql", "java kubernetes"],
+    )
+    assert [resume_id for resume_id, _ in index.search("python")] == [1, 2]
+    # kubernetes is rarer than sql, so it outweighs one sql match
+    assert index.search("sql kubernetes")[0][0] == 3
+    assert index.search("haskell") == []
+
+
+def test_reindexed_resume_shadows_older_copy(index):
+    index.add([1, 2], ["python developer", "java developer"])
+    index.add([1], ["rust developer"])
+    assert index.search("python") == []
+    assert [resume_id for resume_id, _ in index.search("rust")] == [1]
+    assert index.stats()["documents"] == 2
+
+
+def test_merging_segments_keeps_results(tmp_path, index):
+    texts = random_texts(120)
+    reference = SparseIndex(path=str(tmp_path / "reference"), max_segments=1000)
+    for start in range(0, 120, 10):
+        resume_ids = list(range(start, start + 10))
+        batch = texts[start : start + 10]
+        index.add(resume_ids, batch)
+        reference.add(resume_ids, batch)
+    # Re-index a few resumes so merges have shadowed copies to drop
+    index.add([5, 50], ["haskell python", "haskell"])
+    reference.add([5, 50], ["haskell python", "haskell"])
+
+    assert index.stats()["segments"] <= index.max_segments
+    assert reference.stats()["segments"] == 13
+    for query in ["python sql", "docker aws spark", "haskell", "react"]:
+        got, expected = index.search(query, 20), reference.search(query, 20)
+        assert [r for r, _ in got] == [r for r, _ in expected]
+        assert [s for _, s in got] == pytest.approx([s for _, s in expected])
+
+
+def test_full_compaction_once_mostly_shadowed(index):
+    for _ in range(index.max_segments + 1):
+        index.add([1, 2], ["python", "java"])
+    assert index.stats() == {"segments": 1, "documents": 2, "postings": 2}
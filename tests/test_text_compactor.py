@@ -0,0 +1,35 @@
+from app.services.fast_extractor import FastExtractor
+from app.services.text_compactor import TextCompactor
+
+
+def compact(text: str) -> str:
+    return TextCompactor([]).compact(text).text
+
+
+def test_header_lines_are_not_merged():
+    text = compact("Jane Doe\njane.doe@gmail.com\nExperience\nBuilt systems")
+    assert text.startswith("Jane Doe\njane.doe@gmail.com\n")
+    assert FastExtractor().extract(text).get("name") == "Jane Doe"
+
+
+def test_contact_lines_are_not_merged():
+    text = compact("JANE DOE\njane@x.io | (415) 555-1234")
+    assert text == "JANE DOE\njane@x.io | (415) 555-1234"
+
+
+def test_wrapped_sentences_are_merged():
+    text = compact("Experience\nBuilt the billing service\nand its reporting jobs")
+    assert text == "Experience\nBuilt the billing service and its reporting jobs"
+
+
+def test_short_hyphenated_line_keeps_compound():
+    text = compact(
+        "Experience\n" + "a" * 60 + "\nBuilt large-\nscale and end-\nto-end tools"
+    )
+    assert "large-scale" in text
+    assert "end-to-end" in text
+
+
+def test_full_width_hyphen_break_is_joined():
+    text = compact("Experience\n" + "Led the " + "x" * 50 + " imple-\nmentation")
+    assert "implementation" in text